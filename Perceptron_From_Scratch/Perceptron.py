@@ -1,12 +1,74 @@
-lines = []
+import json
+import struct
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-class Perceptron:
-  def __init__(self, num_inputs=3, weights=[1,1,1]):
+import numpy as np
+
+try:
+  import scipy.sparse as sp
+except ImportError:  # SciPy is only needed for CSR inputs
+  sp = None
+
+VARIANTS = ('standard', 'pocket', 'averaged')
+
+# Model file layout: a 64-byte header (magic, format version, model kind,
+# weight rows, weight columns, length of the JSON class list), the float32
+# weights in row-major order, then the JSON class list (multiclass only).
+# The header size keeps the weights aligned for read-only memory mapping.
+MODEL_MAGIC = b'PCPT'
+MODEL_VERSION = 1
+HEADER = struct.Struct('<4sHHIIQ')
+HEADER_SIZE = 64
+KIND_BINARY, KIND_MULTICLASS = 0, 1
+
+# --- Convergence statistics ---
+# Shared by Perceptron and MulticlassPerceptron: self.training_stats holds
+# epochs run, mistakes and seconds per epoch, the mistakes of the returned
+# weights (array-based paths), whether they separate the data and why
+# training stopped.
+class _TrainingStats:
+  def _start_stats(self):
+    self.training_stats = {'epochs': 0, 'errors': [], 'epoch_times': [], 'final_errors': None,
+                           'converged': False, 'stop_reason': None}
+    return self.training_stats
+
+  def _record_epoch(self, stats, errors, epoch_start):
+    stats['epochs'] += 1
+    stats['errors'].append(int(errors))
+    stats['epoch_times'].append(time.perf_counter() - epoch_start)
+
+  def _out_of_budget(self, stats, start, max_epochs, time_budget):
+    if max_epochs is not None and stats['epochs'] >= max_epochs:
+      stats['stop_reason'] = 'max_epochs'
+      return True
+    if time_budget is not None and time.perf_counter() - start >= time_budget:
+      stats['stop_reason'] = 'time_budget'
+      return True
+    return False
+
+
+class Perceptron(_TrainingStats):
+  def __init__(self, num_inputs=3, weights=None):
     self.num_inputs = num_inputs
-    self.weights = weights
+    # A fresh list per instance; a shared default list would be mutated by training
+    self.weights = [1] * num_inputs if weights is None else weights
+    # Decision-boundary snapshots are opt-in, see record_boundaries()
+    self.boundary_history = None
+    self.boundary_callbacks = []
+    self.boundary_every = 1
+    self.epoch = 0
+    self.training_stats = None
 
+  # `inputs` is a sequence of num_inputs values, or a sparse
+  # {index: value} dict holding only the non-zero features.
   def weighted_sum(self, inputs):
     weighted_sum = 0
+    if isinstance(inputs, dict):
+      for i, value in inputs.items():
+        weighted_sum += self.weights[i]*value
+      return weighted_sum
     for i in range(self.num_inputs):
       weighted_sum += self.weights[i]*inputs[i]
     return weighted_sum
@@ -17,9 +79,17 @@ class Perceptron:
     if weighted_sum < 0:
       return -1
 
-  def training(self, training_set):
+  # max_epochs / time_budget (seconds) bound the run on non-separable data;
+  # None keeps the original run-until-separated behaviour.
+  def training(self, training_set, max_epochs=None, time_budget=None):
+    self._ensure_writable()
+    stats = self._start_stats()
+    start = time.perf_counter()
     foundLine = False
     while not foundLine:
+      if self._out_of_budget(stats, start, max_epochs, time_budget):
+        break
+      epoch_start = time.perf_counter()
       total_error = 0
       for inputs in training_set:
         prediction = self.activation(self.weighted_sum(inputs))
@@ -29,11 +99,399 @@ class Perceptron:
         for i in range(self.num_inputs):
           self.weights[i] += error*inputs[i]
 
-      slope = -self.weights[0]/self.weights[1]
-      intercept = -self.weights[2]/self.weights[1]
-      y1 = (slope * 0) + intercept
-      y2 = (slope * 50) + intercept
-      lines.append([[0,50], [y1, y2]])
+      self._record_epoch(stats, total_error // 2, epoch_start)
+      self._epoch_done()
 
       if total_error == 0:
         foundLine = True
+        stats['converged'] = True
+        stats['stop_reason'] = 'converged'
+    return stats
+
+  # --- Sparse per-sample training ---
+  # `samples` is a list of (features, label) pairs where features is an
+  # {index: value} dict or an (indices, values) pair. Scoring and updates only
+  # touch the non-zero features, so each step costs O(nnz), not O(num_inputs).
+  def training_sparse(self, samples, max_epochs=None, time_budget=None):
+    samples = [(_sparse_items(features), label) for features, label in samples]
+    if not isinstance(self.weights, np.ndarray):
+      self.weights = self._weight_array(np.float64)
+    self._ensure_writable()
+    w = self.weights
+    stats = self._start_stats()
+    start = time.perf_counter()
+    while not self._out_of_budget(stats, start, max_epochs, time_budget):
+      epoch_start = time.perf_counter()
+      mistakes = 0
+      for (indices, values), actual in samples:
+        prediction = 1 if np.dot(w[indices], values) >= 0 else -1
+        if prediction != actual:
+          w[indices] += (actual - prediction) * values
+          mistakes += 1
+      self._record_epoch(stats, mistakes, epoch_start)
+      self._epoch_done()
+      if mistakes == 0:
+        stats['converged'] = True
+        stats['stop_reason'] = 'converged'
+        break
+    return stats
+
+  # --- NumPy-backed training ---
+  # X is an (n_samples, num_inputs) array or SciPy sparse matrix (converted
+  # to CSR) and y holds the +1/-1 labels.
+  # Each epoch scores the whole set with one matrix-vector product and only
+  # the misclassified rows contribute to the weight update.
+  #
+  # variant='pocket' keeps the weights with the fewest mistakes seen,
+  # variant='averaged' returns the mean of the weights over all epochs
+  # unless the last weights make fewer mistakes. Both give usable weights
+  # when the data is not linearly separable; once a pass is mistake-free
+  # the separating weights are returned as they are.
+  def fit(self, X, y, max_epochs=1000, time_budget=None, variant='standard'):
+    X = _as_float_array(X)
+    y = np.asarray(y, dtype=X.dtype)
+    w = self._weight_array(X.dtype)
+    self._train_loop(w, lambda w: _batch_update(w, X, y),
+                     lambda w: _count_errors(w, X, y),
+                     max_epochs, time_budget, variant)
+    return self
+
+  # --- Streaming / out-of-core training ---
+  # `batches` is either a callable returning a fresh iterator of
+  # (X_chunk, y_chunk) pairs for every pass, or a re-iterable such as a list.
+  # One-shot iterators (generators) would be empty from the second pass on,
+  # so they raise TypeError, and a pass without any samples raises ValueError.
+  # Only one chunk is resident at a time; training stops after a pass
+  # without mistakes, after max_epochs passes or once time_budget runs out.
+  # Pocket error counts are the mistakes made during a pass, which moves the
+  # weights chunk by chunk, so they are an estimate for the pass's weights.
+  def fit_batches(self, batches, max_epochs=10, dtype=np.float64, time_budget=None, variant='standard'):
+    if not callable(batches) and iter(batches) is batches:
+      raise TypeError("batches must be re-iterable or a callable returning a fresh iterator, "
+                      "not a one-shot iterator")
+
+    def chunks():
+      seen = 0
+      for X_chunk, y_chunk in (batches() if callable(batches) else batches):
+        seen += len(y_chunk)
+        yield _as_float_array(X_chunk, dtype), np.asarray(y_chunk, dtype=dtype)
+      if seen == 0:
+        raise ValueError("a pass over batches produced no samples")
+
+    def run_epoch(w):
+      return sum(_batch_update(w, X_chunk, y_chunk) for X_chunk, y_chunk in chunks())
+
+    def count_errors(w):
+      return sum(_count_errors(w, X_chunk, y_chunk) for X_chunk, y_chunk in chunks())
+
+    self._train_loop(self._weight_array(dtype), run_epoch, count_errors,
+                     max_epochs, time_budget, variant)
+    return self
+
+  def fit_npy(self, x_path, y_path, batch_size=65536, max_epochs=10, time_budget=None, variant='standard'):
+    X = np.load(x_path, mmap_mode='r')
+    dtype = X.dtype if np.issubdtype(X.dtype, np.floating) else np.float64
+    return self.fit_batches(npy_batches(x_path, y_path, batch_size), max_epochs, dtype,
+                            time_budget, variant)
+
+  # Shared epoch loop of the array-based paths. run_epoch(w) updates w in
+  # place and returns the number of mistakes; count_errors(w) only scores.
+  def _train_loop(self, w, run_epoch, count_errors, max_epochs, time_budget, variant):
+    if variant not in VARIANTS:
+      raise ValueError(f"variant must be one of {VARIANTS}")
+    self.weights = w
+    stats = self._start_stats()
+    start = time.perf_counter()
+    best_w, best_errors = None, None
+    w_sum, n_sum = np.zeros_like(w), 0
+
+    while not self._out_of_budget(stats, start, max_epochs, time_budget):
+      epoch_start = time.perf_counter()
+      w_before = w.copy() if variant == 'pocket' else None
+      errors = run_epoch(w)
+      if variant == 'pocket' and (best_errors is None or errors < best_errors):
+        best_w, best_errors = w_before, errors
+      if variant == 'averaged':
+        w_sum += w
+        n_sum += 1
+      self._record_epoch(stats, errors, epoch_start)
+      self._epoch_done()
+      if errors == 0:
+        stats['converged'] = True
+        stats['stop_reason'] = 'converged'
+        break
+
+    if stats['converged']:
+      stats['final_errors'] = 0
+      return stats
+    final_errors = count_errors(w)
+    if variant == 'pocket' and best_w is not None and final_errors > best_errors:
+      w[:] = best_w
+      final_errors = count_errors(w)
+    if variant == 'averaged' and n_sum:
+      w_avg = w_sum / n_sum
+      avg_errors = count_errors(w_avg)
+      if avg_errors <= final_errors:
+        w[:] = w_avg
+        final_errors = avg_errors
+    # Describe the weights actually returned, not the last pass
+    stats['final_errors'] = final_errors
+    stats['converged'] = final_errors == 0
+    return stats
+
+  # --- Decision-boundary snapshots ---
+  # Keep the last `capacity` boundaries, one every `every` epochs, in
+  # self.boundary_history. Each entry is [[0, 50], [y1, y2]] as plotted in
+  # the original exercise.
+  def record_boundaries(self, capacity=1000, every=1):
+    self.boundary_history = deque(maxlen=capacity)
+    self.boundary_every = every
+
+  def stop_recording(self):
+    self.boundary_history = None
+
+  # callback(epoch, line) is called with the same sampling interval
+  def add_boundary_callback(self, callback):
+    self.boundary_callbacks.append(callback)
+
+  def remove_boundary_callback(self, callback):
+    self.boundary_callbacks.remove(callback)
+
+  # Line through the first two inputs with the third weight as bias, or None
+  # while the boundary is vertical (weights[1] == 0).
+  def boundary_line(self, x1=0, x2=50):
+    if self.weights[1] == 0:
+      return None
+    slope = -self.weights[0]/self.weights[1]
+    intercept = -self.weights[2]/self.weights[1]
+    y1 = (slope * x1) + intercept
+    y2 = (slope * x2) + intercept
+    return [[x1, x2], [float(y1), float(y2)]]
+
+  def _epoch_done(self):
+    self.epoch += 1
+    # Nothing is listening: skip the slope/intercept computation entirely
+    if self.boundary_history is None and not self.boundary_callbacks:
+      return
+    if self.epoch % self.boundary_every:
+      return
+    line = self.boundary_line()
+    if line is None:
+      return
+    if self.boundary_history is not None:
+      self.boundary_history.append(line)
+    for callback in self.boundary_callbacks:
+      callback(self.epoch, line)
+
+  # Weights loaded with mmap=True are a read-only memory map; training in
+  # place needs a private copy.
+  def _ensure_writable(self):
+    if isinstance(self.weights, np.ndarray) and not self.weights.flags.writeable:
+      self.weights = np.array(self.weights[:self.num_inputs], dtype=np.float64)
+
+  def _weight_array(self, dtype):
+    return np.array(self.weights[:self.num_inputs], dtype=dtype, order='C')
+
+  def predict(self, X):
+    if not _is_sparse(X):
+      X = np.asarray(X)
+    return np.where(X @ np.asarray(self.weights) >= 0, 1, -1)
+
+  # --- Saving / loading ---
+  def save(self, path):
+    _write_model(path, KIND_BINARY, np.asarray(self.weights[:self.num_inputs]).reshape(1, -1))
+
+  # With mmap=True the weights are a read-only float32 memory map shared
+  # between processes through the page cache; every training method trains
+  # on a private copy.
+  @classmethod
+  def load(cls, path, mmap=True):
+    kind, weights, classes = _read_model(path, mmap)
+    if kind != KIND_BINARY:
+      raise ValueError(f"{path} is not a binary Perceptron model")
+    return cls(weights.shape[1], weights[0])
+
+
+# --- One-vs-rest multiclass ---
+# K binary perceptrons, one per class, stored as the rows of a single
+# (K, num_inputs) weight matrix. predict() returns the class whose row scores
+# highest. With n_jobs=None all classes are trained together: one
+# (n, num_inputs) x (num_inputs, K) product per epoch and a single update for
+# every class's misclassified rows. With n_jobs > 1 each class is trained as
+# a separate binary Perceptron in a process pool. Either way training_stats
+# is one dict; the parallel path adds the per-class dicts under 'classes'.
+class MulticlassPerceptron(_TrainingStats):
+  def __init__(self, num_inputs, classes=None):
+    self.num_inputs = num_inputs
+    self.classes = None if classes is None else np.asarray(classes)
+    self.weights = None
+    self.training_stats = None
+
+  def fit(self, X, y, max_epochs=1000, time_budget=None, n_jobs=None):
+    X = _as_float_array(X)
+    y = np.asarray(y)
+    if self.classes is None:
+      self.classes = np.unique(y)
+    # T[i, k] is +1 when sample i belongs to class k, -1 otherwise
+    T = np.where(y[:, None] == self.classes[None, :], 1, -1).astype(X.dtype)
+    if n_jobs is not None and n_jobs > 1:
+      self._fit_parallel(X, T, max_epochs, time_budget, n_jobs)
+    else:
+      self._fit_matrix(X, T, max_epochs, time_budget)
+    return self
+
+  def _fit_matrix(self, X, T, max_epochs, time_budget):
+    W = np.zeros((len(self.classes), self.num_inputs), dtype=X.dtype)
+    self.weights = W
+    stats = self._start_stats()
+    start = time.perf_counter()
+    while not self._out_of_budget(stats, start, max_epochs, time_budget):
+      epoch_start = time.perf_counter()
+      P = np.where(X @ W.T >= 0, 1, -1).astype(X.dtype)
+      errors = np.count_nonzero(P != T)
+      if errors:
+        # Correct entries have a zero coefficient, so no rows of X are copied
+        W += (T - P).T @ X
+      self._record_epoch(stats, errors, epoch_start)
+      if errors == 0:
+        stats['converged'] = True
+        stats['stop_reason'] = 'converged'
+        break
+    if not stats['converged']:
+      stats['final_errors'] = int(np.count_nonzero(np.where(X @ W.T >= 0, 1, -1) != T))
+      stats['converged'] = stats['final_errors'] == 0
+    else:
+      stats['final_errors'] = 0
+
+  # X is sent to each worker once through the pool initializer; jobs only
+  # carry one class's target column.
+  def _fit_parallel(self, X, T, max_epochs, time_budget, n_jobs):
+    jobs = [(T[:, k], self.num_inputs, max_epochs, time_budget) for k in range(len(self.classes))]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_set_training_matrix, initargs=(X,)) as pool:
+      results = list(pool.map(_fit_one_class, jobs))
+    self.weights = np.vstack([w for w, stats in results])
+    per_class = [stats for w, stats in results]
+    # Same shape as the matrix path: epochs of the longest class, mistakes
+    # summed over the classes per epoch
+    stats = self._start_stats()
+    stats['epochs'] = max(s['epochs'] for s in per_class)
+    for e in range(stats['epochs']):
+      stats['errors'].append(sum(s['errors'][e] for s in per_class if e < len(s['errors'])))
+      stats['epoch_times'].append(max(s['epoch_times'][e] for s in per_class if e < len(s['epoch_times'])))
+    stats['final_errors'] = sum(s['final_errors'] for s in per_class)
+    stats['converged'] = all(s['converged'] for s in per_class)
+    reasons = [s['stop_reason'] for s in per_class if s['stop_reason'] != 'converged']
+    stats['stop_reason'] = reasons[0] if reasons else 'converged'
+    stats['classes'] = per_class
+
+  def decision_function(self, X):
+    if _is_sparse(X):
+      return np.asarray(X @ self.weights.T)
+    return np.asarray(X) @ self.weights.T
+
+  def predict(self, X):
+    return self.classes[np.argmax(self.decision_function(X), axis=1)]
+
+  def save(self, path):
+    _write_model(path, KIND_MULTICLASS, self.weights, self.classes.tolist())
+
+  @classmethod
+  def load(cls, path, mmap=True):
+    kind, weights, classes = _read_model(path, mmap)
+    if kind != KIND_MULTICLASS:
+      raise ValueError(f"{path} is not a MulticlassPerceptron model")
+    model = cls(weights.shape[1], classes)
+    model.weights = weights
+    return model
+
+
+_TRAINING_X = None
+
+def _set_training_matrix(X):
+  global _TRAINING_X
+  _TRAINING_X = X
+
+def _fit_one_class(job):
+  t, num_inputs, max_epochs, time_budget = job
+  p = Perceptron(num_inputs, [0.0] * num_inputs)
+  p.fit(_TRAINING_X, t, max_epochs, time_budget)
+  return p.weights, p.training_stats
+
+
+def _is_sparse(X):
+  return sp is not None and sp.issparse(X)
+
+# Dense inputs become C-contiguous float arrays, sparse ones float CSR.
+def _as_float_array(X, dtype=None):
+  if _is_sparse(X):
+    X = sp.csr_matrix(X)
+    if dtype is None:
+      dtype = X.dtype if np.issubdtype(X.dtype, np.floating) else np.float64
+    return X.astype(dtype, copy=False)
+  X = np.asarray(X, dtype=dtype)
+  if not np.issubdtype(X.dtype, np.floating):
+    X = X.astype(np.float64)
+  return np.ascontiguousarray(X)
+
+def _sparse_items(features):
+  if isinstance(features, dict):
+    indices, values = list(features.keys()), list(features.values())
+  else:
+    indices, values = features
+  return np.asarray(indices, dtype=np.intp), np.asarray(values, dtype=np.float64)
+
+# One perceptron step over a block of rows: score the block with a single
+# matrix-vector product and update `w` in place from the misclassified rows
+# (for dense blocks, one sequential vector-matrix product over the block).
+# Returns the number of mistakes.
+def _batch_update(w, X, y):
+  predictions = np.where(X @ w >= 0, 1, -1).astype(w.dtype)
+  wrong = np.flatnonzero(predictions != y)
+  if len(wrong) and _is_sparse(X):
+    # Scatter-add over the stored entries of the wrong rows: O(nnz)
+    rows = X[wrong]
+    errors = np.repeat(y[wrong] - predictions[wrong], np.diff(rows.indptr))
+    np.add.at(w, rows.indices, errors * rows.data)
+  elif len(wrong):
+    # Correct rows have a zero coefficient, so no misclassified rows are copied
+    w += (y - predictions) @ X
+  return len(wrong)
+
+def _count_errors(w, X, y):
+  return int(np.count_nonzero(np.where(X @ w >= 0, 1, -1) != y))
+
+# Chunked reader over a pair of .npy files opened as read-only memory maps.
+# Returns a callable so every training pass starts from the first chunk.
+def npy_batches(x_path, y_path, batch_size=65536):
+  def batches():
+    X = np.load(x_path, mmap_mode='r')
+    y = np.load(y_path, mmap_mode='r')
+    if len(X) != len(y):
+      raise ValueError("X and y have different lengths")
+    for start in range(0, len(X), batch_size):
+      yield X[start:start + batch_size], y[start:start + batch_size]
+  return batches
+
+def _write_model(path, kind, weights, classes=None):
+  weights = np.ascontiguousarray(weights, dtype='<f4')
+  blob = b'' if classes is None else json.dumps(classes).encode('utf-8')
+  header = HEADER.pack(MODEL_MAGIC, MODEL_VERSION, kind, weights.shape[0], weights.shape[1], len(blob))
+  with open(path, 'wb') as f:
+    f.write(header.ljust(HEADER_SIZE, b'\0'))
+    f.write(weights.tobytes())
+    f.write(blob)
+
+def _read_model(path, mmap=True):
+  with open(path, 'rb') as f:
+    magic, version, kind, rows, cols, blob_len = HEADER.unpack(f.read(HEADER.size))
+    if magic != MODEL_MAGIC:
+      raise ValueError(f"{path} is not a Perceptron model file")
+    if version != MODEL_VERSION:
+      raise ValueError(f"Unsupported model format version {version}")
+    f.seek(HEADER_SIZE + rows * cols * 4)
+    classes = json.loads(f.read(blob_len)) if blob_len else None
+  if mmap:
+    weights = np.memmap(path, dtype='<f4', mode='r', offset=HEADER_SIZE, shape=(rows, cols))
+  else:
+    weights = np.fromfile(path, dtype='<f4', count=rows * cols, offset=HEADER_SIZE).reshape(rows, cols)
+  return kind, weights, classes
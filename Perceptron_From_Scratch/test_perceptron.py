@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from Perceptron import MulticlassPerceptron, Perceptron
+
+
+def _separable(n=200, seed=0):
+  rng = np.random.default_rng(seed)
+  X = np.column_stack([rng.uniform(0, 50, (n, 2)), np.ones(n)])
+  y = np.where(X[:, 1] > X[:, 0] + 5, 1, -1)
+  return X, y
+
+
+def test_load_then_train_round_trip(tmp_path):
+  X, y = _separable()
+  path = tmp_path / 'binary.pcpt'
+  Perceptron(3, [0.0, 0.0, 0.0]).fit(X, y, max_epochs=5).save(path)
+  samples = {tuple(row): label for row, label in zip(X[:20].tolist(), y[:20].tolist())}
+  sparse = [({0: row[0], 1: row[1], 2: row[2]}, label) for row, label in zip(X.tolist(), y.tolist())]
+
+  for train in (lambda p: p.fit(X, y, max_epochs=50),
+                lambda p: p.training(samples, max_epochs=50),
+                lambda p: p.training_sparse(sparse, max_epochs=50)):
+    model = Perceptron.load(path)
+    mapped = model.weights
+    train(model)
+    assert model.weights is not mapped
+    assert not mapped.flags.writeable
+    assert model.training_stats['epochs'] > 0
+
+  reloaded = Perceptron.load(path, mmap=False)
+  np.testing.assert_array_equal(reloaded.weights, Perceptron.load(path).weights)
+
+
+def test_multiclass_load_then_train(tmp_path):
+  X, y = _separable()
+  labels = np.where(y > 0, 'a', 'b')
+  path = tmp_path / 'multi.pcpt'
+  MulticlassPerceptron(3).fit(X, labels, max_epochs=5).save(path)
+  model = MulticlassPerceptron.load(path)
+  model.fit(X, labels, max_epochs=50)
+  assert list(model.classes) == ['a', 'b']
+  assert model.predict(X).shape == (len(X),)
+
+
+def test_multiclass_parallel_matches_matrix():
+  X, y = _separable(300, seed=1)
+  labels = np.where(X[:, 0] > 30, 2, np.where(y > 0, 1, 0))
+  matrix = MulticlassPerceptron(3).fit(X, labels, max_epochs=20)
+  parallel = MulticlassPerceptron(3).fit(X, labels, max_epochs=20, n_jobs=2)
+  np.testing.assert_allclose(parallel.weights, matrix.weights)
+  assert matrix.training_stats['epochs'] == 20
+  assert parallel.training_stats['epochs'] == 20
+  assert parallel.training_stats['errors'] == matrix.training_stats['errors']
+  assert [s['epochs'] for s in parallel.training_stats['classes']] == [20, 20, 20]
+
+
+def test_fit_batches_rejects_one_shot_iterator():
+  X, y = _separable()
+  generator = ((X[i:i + 50], y[i:i + 50]) for i in range(0, len(X), 50))
+  with pytest.raises(TypeError):
+    Perceptron(3, [0.0, 0.0, 0.0]).fit_batches(generator)
+
+  def chunks():
+    return ((X[i:i + 50], y[i:i + 50]) for i in range(0, len(X), 50))
+  p = Perceptron(3, [0.0, 0.0, 0.0]).fit_batches(chunks, max_epochs=3)
+  assert p.training_stats['epochs'] == 3
+  assert all(errors > 0 for errors in p.training_stats['errors'])
+
+  with pytest.raises(ValueError):
+    Perceptron(3, [0.0, 0.0, 0.0]).fit_batches(lambda: iter(()))
+
+
+def test_variants_keep_separating_weights():
+  X, y = _separable()
+  margin = np.abs(X[:, 1] - X[:, 0] - 5) > 2
+  X, y = X[margin], y[margin]
+  for variant in ('standard', 'pocket', 'averaged'):
+    p = Perceptron(3, [0.0, 0.0, 0.0]).fit(X, y, max_epochs=1000, variant=variant)
+    assert p.training_stats['converged']
+    assert p.training_stats['final_errors'] == 0
+    assert np.count_nonzero(np.where(X @ p.weights >= 0, 1, -1) != y) == 0
+
+
+def test_stats_describe_returned_weights():
+  X, y = _separable()
+  y = y.copy()
+  y[:10] *= -1
+  for variant in ('standard', 'pocket', 'averaged'):
+    p = Perceptron(3, [0.0, 0.0, 0.0]).fit(X, y, max_epochs=20, variant=variant)
+    errors = np.count_nonzero(np.where(X @ p.weights >= 0, 1, -1) != y)
+    assert p.training_stats['final_errors'] == errors
+    assert not p.training_stats['converged']
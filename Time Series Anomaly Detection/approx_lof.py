@@ -0,0 +1,233 @@
+"""
+Approximate Local Outlier Factor over a sorted 1-D index.
+
+``Local Outlier Factor.ipynb`` fits ``LocalOutlierFactor(n_neighbors=3000)``
+on the single ``value`` column, which costs O(N * k) distance work on top of
+the neighbour search. In one dimension the k nearest neighbours of a point are
+always a contiguous run of the sorted values, so:
+
+* the neighbourhood of every point is found by a vectorized binary search over
+  the sorted index (O(log k) per point, no tree, no distance matrix);
+* the mean local reachability density of a neighbourhood is a difference of
+  two prefix sums (O(1) per point, exact);
+* only the mean reachability distance needs the individual neighbours; it is
+  estimated from ``sample`` evenly spaced neighbours of the run (exact when
+  ``sample >= n_neighbors``).
+
+Fitting is O(N log N) for the sort plus O(N * sample). New points can be
+scored against the fitted set (``score_samples``) or inserted into it
+(``insert``), which only recomputes the neighbourhood band around them.
+
+Scores follow scikit-learn's sign convention: ``negative_outlier_factor_``
+is -LOF, and ``predict`` returns -1 for outliers and 1 for inliers.
+"""
+import sys
+
+import numpy as np
+
+N_NEIGHBORS = 3000
+CONTAMINATION = 0.001
+SAMPLE = 64
+# Rows per vectorized block when evaluating sampled reachability distances
+BLOCK_ROWS = 65536
+
+
+class ApproxLOF:
+    """
+    LOF on 1-D values with sorted-index neighbourhoods.
+
+    Args:
+        n_neighbors (int): Neighbourhood size k. Defaults to 3000.
+        contamination (float): Fraction of the fitted points flagged as
+            outliers; sets ``offset_``. Defaults to 0.001.
+        sample (int): Neighbours per point used for the mean reachability
+            distance. Defaults to 64.
+    """
+
+    def __init__(self, n_neighbors=N_NEIGHBORS, contamination=CONTAMINATION, sample=SAMPLE):
+        self.n_neighbors = n_neighbors
+        self.contamination = contamination
+        self.sample = sample
+        self._sorted = np.empty(0)
+        self._order = np.empty(0, dtype=np.intp)   # sorted position -> insertion index
+        self._kdist = np.empty(0)
+        self._lrd = np.empty(0)
+        self._lrd_cumsum = np.zeros(1)
+        self.offset_ = None
+
+    def __len__(self):
+        return len(self._sorted)
+
+    # --- Fitting ---
+    def fit(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) <= self.n_neighbors:
+            raise ValueError("Need more points than n_neighbors")
+        self._order = np.argsort(values, kind="stable")
+        self._sorted = values[self._order]
+        everything = np.arange(len(values))
+        self._kdist = self._fitted_kdist(everything)
+        self._lrd = self._fitted_lrd(everything)
+        self._lrd_cumsum = np.concatenate(([0.0], np.cumsum(self._lrd)))
+        self.offset_ = np.percentile(self.negative_outlier_factor_, 100 * self.contamination)
+        return self
+
+    def fit_predict(self, values):
+        """Fits and labels the fitted points (-1 outlier, 1 inlier), as sklearn."""
+        self.fit(values)
+        return np.where(self.negative_outlier_factor_ < self.offset_, -1, 1)
+
+    @property
+    def negative_outlier_factor_(self):
+        """-LOF of every fitted/inserted point, in insertion order."""
+        positions = np.arange(len(self._sorted))
+        lof = self._neighbour_lrd(positions, *self._fitted_windows(positions),
+                                  exclude_self=True) / self._lrd
+        scores = np.empty(len(lof))
+        scores[self._order] = -lof
+        return scores
+
+    # --- Scoring new points ---
+    def score_samples(self, values):
+        """-LOF of new points against the fitted set, without inserting them."""
+        x = np.asarray(values, dtype=np.float64).ravel()
+        k = self.n_neighbors
+        n = len(self._sorted)
+        p = np.searchsorted(self._sorted, x)
+        start, _ = _knn_windows(self._sorted, x, np.maximum(0, p - k), np.minimum(p, n - k), k)
+        lrd = self._lrd_from_windows(x, start, k, None)
+        return -self._neighbour_lrd(None, start, k, exclude_self=False) / lrd
+
+    def predict(self, values):
+        return np.where(self.score_samples(values) < self.offset_, -1, 1)
+
+    # --- Incremental insertion ---
+    def insert(self, values):
+        """
+        Adds points to the fitted set without refitting it.
+
+        Only the k-distances and densities of points whose neighbourhood can
+        contain a new point (a 2k band around each insert position in sorted
+        order) are recomputed; the rest of the index is kept. Large batches
+        spread over the whole value range touch most of the index, so for
+        those ``fit`` on the combined data costs about the same.
+        """
+        x = np.asarray(values, dtype=np.float64).ravel()
+        if len(x) == 0:
+            return self
+        if len(self._sorted) == 0:
+            return self.fit(x)
+        k = self.n_neighbors
+        n_old = len(self._sorted)
+        order = np.argsort(x, kind="stable")
+        x = x[order]
+        at = np.searchsorted(self._sorted, x, side="right")
+        self._sorted = np.insert(self._sorted, at, x)
+        self._order = np.insert(self._order, at, n_old + order)
+        self._kdist = np.insert(self._kdist, at, 0.0)
+        self._lrd = np.insert(self._lrd, at, 0.0)
+        new_pos = at + np.arange(len(x))
+
+        # k-distance can change within k positions of a new point, the
+        # densities within 2k (their neighbours' k-distances changed)
+        n = len(self._sorted)
+        kd_band = _band(new_pos, k, n)
+        self._kdist[kd_band] = self._fitted_kdist(kd_band)
+        lrd_band = _band(new_pos, 2 * k, n)
+        self._lrd[lrd_band] = self._fitted_lrd(lrd_band)
+        self._lrd_cumsum = np.concatenate(([0.0], np.cumsum(self._lrd)))
+        return self
+
+    # --- Internals on the sorted index ---
+    def _fitted_windows(self, positions):
+        """Start of the (k + 1)-wide run holding each point and its k neighbours."""
+        k = self.n_neighbors
+        n = len(self._sorted)
+        lo = np.maximum(0, positions - k)
+        hi = np.minimum(positions, n - k - 1)
+        start, _ = _knn_windows(self._sorted, self._sorted[positions], lo, hi, k + 1)
+        return start, k + 1
+
+    def _fitted_kdist(self, positions):
+        start, width = self._fitted_windows(positions)
+        s, x = self._sorted, self._sorted[positions]
+        return np.maximum(x - s[start], s[start + width - 1] - x)
+
+    def _fitted_lrd(self, positions):
+        start, width = self._fitted_windows(positions)
+        return self._lrd_from_windows(self._sorted[positions], start, width, positions)
+
+    def _lrd_from_windows(self, x, start, width, self_pos):
+        """
+        Local reachability density 1 / mean(max(kdist_j, |x - s_j|)).
+
+        ``self_pos`` is the point's own sorted position inside its run (fitted
+        points) or None (new points).
+        """
+        m = min(self.sample, width)
+        offsets = np.unique(np.round(np.linspace(0, width - 1, m)).astype(np.intp))
+        lrd = np.empty(len(x))
+        rows = max(1, BLOCK_ROWS // len(offsets))
+        for b in range(0, len(x), rows):
+            sl = slice(b, b + rows)
+            j = start[sl, None] + offsets
+            reach = np.maximum(self._kdist[j], np.abs(x[sl, None] - self._sorted[j]))
+            if self_pos is None:
+                mean = reach.mean(axis=1)
+            else:
+                keep = j != self_pos[sl, None]
+                mean = (reach * keep).sum(axis=1) / np.maximum(keep.sum(axis=1), 1)
+            lrd[sl] = 1.0 / (mean + 1e-10)
+        return lrd
+
+    def _neighbour_lrd(self, positions, start, width, exclude_self):
+        """Exact mean density of each run's neighbours, from prefix sums."""
+        total = self._lrd_cumsum[start + width] - self._lrd_cumsum[start]
+        if exclude_self:
+            total = total - self._lrd[positions]
+        return total / self.n_neighbors
+
+
+def _knn_windows(s, x, lo, hi, width):
+    """
+    Vectorized search for the ``width``-long run of ``s`` closest to each ``x``.
+
+    A run starting at l has radius max(x - s[l], s[l + width - 1] - x); the
+    left term falls and the right term rises with l, so the best start is at
+    their crossing, found by binary search between ``lo`` and ``hi``.
+
+    Returns:
+        tuple: (run starts, radii), the radius being the k-distance.
+    """
+    lo, hi = lo.copy(), hi.copy()
+    first = lo.copy()
+    while True:
+        active = lo < hi
+        if not active.any():
+            break
+        mid = (lo + hi) // 2
+        right_wins = s[mid + width - 1] - x >= x - s[mid]
+        hi = np.where(active & right_wins, mid, hi)
+        lo = np.where(active & ~right_wins, mid + 1, lo)
+    radius = np.maximum(x - s[lo], s[lo + width - 1] - x)
+    # The crossing can sit between lo - 1 and lo
+    prev = np.maximum(lo - 1, first)
+    prev_radius = np.maximum(x - s[prev], s[prev + width - 1] - x)
+    better = prev_radius < radius
+    return np.where(better, prev, lo), np.where(better, prev_radius, radius)
+
+
+def _band(positions, radius, n):
+    """Sorted positions within ``radius`` of any of ``positions``."""
+    marks = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(marks, np.maximum(positions - radius, 0), 1)
+    np.add.at(marks, np.minimum(positions + radius + 1, n), -1)
+    return np.flatnonzero(np.cumsum(marks[:-1]) > 0)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "nyc_taxi.csv"
+    values = np.loadtxt(path, delimiter=",", skiprows=1, usecols=1)
+    labels = ApproxLOF().fit_predict(values)
+    for i in np.flatnonzero(labels == -1):
+        print(f"{i},{values[i]:g}")
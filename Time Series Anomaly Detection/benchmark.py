@@ -0,0 +1,399 @@
+"""
+Benchmark harness for the anomaly detectors.
+
+Runs every detector on ``nyc_taxi.csv`` and/or synthetic series and writes a
+comparison table of cost and accuracy:
+
+    python benchmark.py                           # nyc_taxi.csv only
+    python benchmark.py --sizes 1e6 1e7 1e8       # plus synthetic series
+    python benchmark.py --detectors cusum lof --out results.csv
+
+Columns:
+
+* ``fit_s`` / ``score_s``: wall-clock seconds of the fit and scoring steps,
+  ``throughput`` = points / score_s;
+* ``peak_mb``: peak traced allocation (``tracemalloc``) over fit + score,
+  measured in a second run so tracing does not slow the timed one;
+* ``precision`` / ``recall`` / ``f1`` against labelled anomaly windows:
+  precision is the fraction of flagged points inside a window, recall the
+  fraction of windows with at least one flagged point.
+
+``nyc_taxi.csv`` uses the NAB labelled windows (NYC marathon, Thanksgiving,
+Christmas, New Year, January 2015 blizzard). Synthetic series have daily and
+weekly seasonality plus injected spikes, dips and level shifts; above
+``MEMMAP_POINTS`` they are generated chunk-wise into a memory-mapped ``.npy``
+in a temporary directory.
+
+Detectors whose dependency (scikit-learn, TensorFlow) is missing, or whose
+``max_points`` is below the series length, are reported as skipped; a
+detector that raises is reported as failed and the run goes on.
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from approx_lof import ApproxLOF
+from cusum import detect_changes
+from feature_store import load
+from isolation_forest import StreamingIsolationForest
+from one_class_svm import ApproxOneClassSVM
+from rolling_zscore import RollingRobustZScore
+
+# NAB labelled anomaly windows for nyc_taxi.csv
+NYC_WINDOWS = [
+    ("2014-10-30 15:30:00", "2014-11-03 22:30:00"),
+    ("2014-11-25 12:00:00", "2014-11-29 19:00:00"),
+    ("2014-12-23 11:30:00", "2014-12-27 18:30:00"),
+    ("2014-12-29 21:30:00", "2015-01-03 04:30:00"),
+    ("2015-01-24 20:30:00", "2015-01-29 03:30:00"),
+]
+# Fraction flagged by the score-based detectors (notebooks use 0.0005-0.01)
+CONTAMINATION = 0.001
+# Synthetic series longer than this are written to a memory map
+MEMMAP_POINTS = 10_000_000
+SYNTHETIC_CHUNK = 5_000_000
+COLUMNS = ["dataset", "detector", "points", "fit_s", "score_s", "throughput",
+           "peak_mb", "flags", "precision", "recall", "f1", "note"]
+
+
+# --- Detectors ---
+# Each detector has fit(values) and flags(values) -> sorted flagged indices.
+class ZScoreAdapter:
+    name = "zscore"
+    max_points = 10_000_000   # pure-Python streaming loop
+
+    def fit(self, values):
+        self.detector = RollingRobustZScore()
+
+    def flags(self, values):
+        det = self.detector
+        return np.array([i for i, v in enumerate(values) if det.is_anomaly(det.update(v))], dtype=np.intp)
+
+
+class CusumAdapter:
+    name = "cusum"
+    max_points = None
+
+    def fit(self, values):
+        pass
+
+    def flags(self, values):
+        return detect_changes(values)[0]
+
+
+class LOFAdapter:
+    name = "lof"
+    max_points = 100_000_000
+
+    def fit(self, values):
+        self.model = ApproxLOF(n_neighbors=min(3000, len(values) // 4),
+                               contamination=CONTAMINATION).fit(values)
+
+    def flags(self, values):
+        return np.flatnonzero(self.model.negative_outlier_factor_ < self.model.offset_)
+
+
+class IsolationForestAdapter:
+    name = "isolation_forest"
+    max_points = 1_000_000
+
+    def fit(self, values):
+        from sklearn.ensemble import IsolationForest
+        self.model = IsolationForest(n_estimators=500, contamination=CONTAMINATION,
+                                     max_features=0.8, max_samples=min(len(values), 4096))
+        self.model.fit(np.asarray(values).reshape(-1, 1))
+
+    def flags(self, values):
+        return np.flatnonzero(self.model.predict(np.asarray(values).reshape(-1, 1)) == -1)
+
+
+class StreamingIsolationForestAdapter:
+    name = "iforest_stream"
+    max_points = 10_000_000
+
+    def fit(self, values):
+        self.model = StreamingIsolationForest(contamination=CONTAMINATION, max_features=0.8,
+                                              n_jobs=os.cpu_count() or 1, seed=0).fit(values)
+
+    def flags(self, values):
+        return np.flatnonzero(self.model.evaluate(values)[1] == -1)
+
+
+class OneClassSVMAdapter:
+    name = "ocsvm"
+    max_points = 20_000       # kernel SVM, quadratic in the points
+
+    def fit(self, values):
+        from sklearn.svm import OneClassSVM
+        self.model = OneClassSVM(kernel="rbf", nu=0.95, gamma="scale")
+        self.model.fit(np.asarray(values).reshape(-1, 1))
+
+    def flags(self, values):
+        scores = self.model.decision_function(np.asarray(values).reshape(-1, 1))
+        return _lowest(scores, CONTAMINATION)
+
+
+class ApproxOneClassSVMAdapter:
+    name = "ocsvm_approx"
+    max_points = 100_000_000
+
+    def fit(self, values):
+        self.model = ApproxOneClassSVM(seed=0).fit(values, epochs=1)
+
+    def flags(self, values):
+        return _lowest(self.model.decision_function(values), CONTAMINATION)
+
+
+class AutoEncoderAdapter:
+    name = "autoencoder"
+    max_points = 1_000_000
+    epochs = 5
+
+    def fit(self, values):
+        from keras.layers import Dense, Input
+        from keras.models import Model
+        x = _scaled(values)[:, None]
+        inputs = Input(shape=(1,))
+        outputs = Dense(1, activation="relu")(Dense(10, activation="relu")(inputs))
+        self.model = Model(inputs=inputs, outputs=outputs)
+        self.model.compile(optimizer="adam", loss="mse")
+        self.model.fit(x, x, epochs=self.epochs, batch_size=256, verbose=0)
+
+    def flags(self, values):
+        x = _scaled(values)[:, None]
+        error = np.square(x - self.model.predict(x, batch_size=65536, verbose=0)).ravel()
+        return _highest(error, CONTAMINATION)
+
+
+class LSTMAdapter:
+    name = "lstm"
+    max_points = 1_000_000
+    epochs = 5
+    seq_length = 20
+
+    def fit(self, values):
+        from keras.layers import LSTM, Dense
+        from keras.models import Sequential
+        from sequences import batch_count, lstm_batches
+        x = _scaled(values)
+        self.model = Sequential([LSTM(50, activation="relu", input_shape=(self.seq_length, 1)), Dense(1)])
+        self.model.compile(optimizer="adam", loss="mse")
+        self.model.fit(lstm_batches(x, self.seq_length, 256, epochs=self.epochs),
+                       steps_per_epoch=batch_count(len(x), self.seq_length, 256),
+                       epochs=self.epochs, verbose=0)
+
+    def flags(self, values):
+        from sequences import predict_windows, sliding_windows
+        x = _scaled(values)
+        error = np.abs(predict_windows(self.model, x, self.seq_length).ravel()
+                       - sliding_windows(x, self.seq_length)[1].ravel())
+        return _highest(error, CONTAMINATION) + self.seq_length
+
+
+DETECTORS = {d.name: d for d in (ZScoreAdapter, CusumAdapter, LOFAdapter, IsolationForestAdapter,
+                                 StreamingIsolationForestAdapter,
+                                 OneClassSVMAdapter, ApproxOneClassSVMAdapter, AutoEncoderAdapter,
+                                 LSTMAdapter)}
+
+
+def _scaled(values):
+    """Min-max scaling to [0, 1] as in the neural-network notebooks."""
+    x = np.asarray(values, dtype=np.float32)
+    lo, hi = x.min(), x.max()
+    return (x - lo) / (hi - lo) if hi > lo else x - lo
+
+
+def _lowest(scores, fraction):
+    return np.sort(np.argsort(scores)[:max(1, int(len(scores) * fraction))])
+
+
+def _highest(scores, fraction):
+    return np.sort(np.argsort(scores)[-max(1, int(len(scores) * fraction)):])
+
+
+# --- Datasets ---
+def nyc_taxi():
+    """Returns (values, windows) for nyc_taxi.csv with NAB window row ranges."""
+    data = load()
+    bounds = np.array(NYC_WINDOWS, dtype="datetime64[s]")
+    starts = np.searchsorted(data.timestamp, bounds[:, 0], side="left")
+    ends = np.searchsorted(data.timestamp, bounds[:, 1], side="right")
+    return np.asarray(data.value), np.stack([starts, ends], axis=1)
+
+
+def synthetic_series(n, seed=0, path=None, period=48):
+    """
+    Seasonal series with injected anomalies.
+
+    Args:
+        n (int): Number of points.
+        seed (int, optional): Random seed.
+        path (str, optional): Write to a memory-mapped ``.npy`` here instead of
+            returning an in-memory array.
+        period (int, optional): Points per day (48 = 30-minute data).
+
+    Returns:
+        tuple: (values (n,) float64, windows (m, 2) [start, end) row ranges).
+
+    Raises:
+        ValueError: If ``n`` is shorter than two anomaly slots (one period).
+    """
+    if n // (period // 2) < 2:
+        raise ValueError(f"synthetic series needs at least {2 * (period // 2)} points, got {n}")
+    rng = np.random.default_rng(seed)
+    if path is None:
+        values = np.empty(n)
+    else:
+        values = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(n,))
+    for start in range(0, n, SYNTHETIC_CHUNK):
+        t = np.arange(start, min(n, start + SYNTHETIC_CHUNK), dtype=np.float64)
+        values[start:start + len(t)] = (15000 + 6000 * np.sin(2 * np.pi * t / period)
+                                        + 2000 * np.sin(2 * np.pi * t / (7 * period))
+                                        + rng.normal(0, 800, len(t)))
+
+    # About one anomaly per 20 days of data, at least five, at most one per slot
+    width = period // 2
+    slots = n // width - 1
+    count = min(max(5, n // (20 * period)), slots)
+    starts = np.sort(rng.choice(slots, count, replace=False)) * width + width // 2
+    kinds = rng.integers(0, 3, count)
+    for s, kind in zip(starts, kinds):
+        if kind == 0:
+            values[s:s + 3] += 12000                     # spike
+        elif kind == 1:
+            values[s:s + 3] -= 12000                     # dip
+        else:
+            values[s:s + width] += 6000                  # level shift
+    windows = np.stack([np.maximum(starts - width // 2, 0), np.minimum(starts + width, n)], axis=1)
+    if path is not None:
+        values.flush()
+    return values, windows
+
+
+# --- Metrics ---
+def window_scores(flagged, windows):
+    """
+    Precision, recall and F1 of flagged indices against [start, end) windows.
+
+    Returns:
+        tuple: (precision, recall, f1).
+    """
+    flagged = np.asarray(flagged, dtype=np.intp)
+    windows = windows[np.argsort(windows[:, 0])]
+    # Window each flag falls into (or -1), via the last window starting at or before it
+    w = np.searchsorted(windows[:, 0], flagged, side="right") - 1
+    inside = (w >= 0) & (flagged < windows[np.maximum(w, 0), 1])
+    precision = inside.mean() if len(flagged) else 0.0
+    recall = len(np.unique(w[inside])) / len(windows) if len(windows) else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return float(precision), float(recall), float(f1)
+
+
+# --- Runner ---
+def run_one(detector_cls, values, windows, measure_memory=True):
+    """Fits and scores one detector and returns its table row (without dataset)."""
+    row = {"detector": detector_cls.name, "points": len(values)}
+    if detector_cls.max_points is not None and len(values) > detector_cls.max_points:
+        row["note"] = f"skipped: over max_points {detector_cls.max_points:g}"
+        return row
+    detector = detector_cls()
+    try:
+        t0 = time.perf_counter()
+        detector.fit(values)
+        t1 = time.perf_counter()
+        flagged = detector.flags(values)
+        t2 = time.perf_counter()
+    except ImportError as e:
+        row["note"] = f"skipped: {e.name or e} not installed"
+        return row
+    except Exception as e:
+        row["note"] = f"failed: {type(e).__name__}: {e}"
+        return row
+
+    precision, recall, f1 = window_scores(flagged, windows)
+    row.update(fit_s=t1 - t0, score_s=t2 - t1, throughput=len(values) / max(t2 - t1, 1e-12),
+               flags=len(flagged), precision=precision, recall=recall, f1=f1)
+    if measure_memory:
+        detector = detector_cls()
+        tracemalloc.start()
+        try:
+            detector.fit(values)
+            detector.flags(values)
+            row["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        except Exception as e:
+            row["note"] = f"memory pass failed: {type(e).__name__}: {e}"
+        finally:
+            tracemalloc.stop()
+    return row
+
+
+def run(datasets, detectors, measure_memory=True):
+    """
+    Runs every detector on every dataset.
+
+    Args:
+        datasets (iterable): (name, values, windows) triples.
+        detectors (iterable): Detector classes.
+
+    Yields:
+        dict: One table row per dataset and detector.
+    """
+    for name, values, windows in datasets:
+        for detector_cls in detectors:
+            row = run_one(detector_cls, values, windows, measure_memory)
+            row["dataset"] = name
+            status = row.get("note") or f"F1 {row['f1']:.3f}"
+            print(f"{name} {row['detector']}: {status}", file=sys.stderr)
+            yield row
+
+
+def format_table(rows):
+    """Markdown comparison table."""
+    def cell(row, key):
+        v = row.get(key, "")
+        if isinstance(v, float):
+            return f"{v:.3g}" if key in ("throughput", "fit_s", "score_s") else f"{v:.3f}"
+        return str(v)
+    lines = ["| " + " | ".join(COLUMNS) + " |", "|" + "---|" * len(COLUMNS)]
+    lines += ["| " + " | ".join(cell(row, k) for k in COLUMNS) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the anomaly detectors")
+    parser.add_argument("--detectors", nargs="+", choices=sorted(DETECTORS), default=list(DETECTORS))
+    parser.add_argument("--sizes", nargs="*", type=float, default=[], help="synthetic series lengths, e.g. 1e6 1e7")
+    parser.add_argument("--no-nyc", action="store_true", help="skip nyc_taxi.csv")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="also write the rows as CSV here")
+    args = parser.parse_args(argv)
+
+    detectors = [DETECTORS[name] for name in args.detectors]
+    with tempfile.TemporaryDirectory() as tmp:
+        def datasets():
+            if not args.no_nyc:
+                yield ("nyc_taxi", *nyc_taxi())
+            for size in args.sizes:
+                n = int(size)
+                path = os.path.join(tmp, f"synthetic_{n}.npy") if n > MEMMAP_POINTS else None
+                yield (f"synthetic_{n}", *synthetic_series(n, args.seed, path))
+
+        rows = list(run(datasets(), detectors, not args.no_memory))
+
+    print(format_table(rows))
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Cached dataset loader and shared features for the anomaly detectors.
+
+Every notebook starts with ``pd.read_csv("nyc_taxi.csv")`` and derives its
+own features. ``load()`` parses a CSV once into column ``.npy`` files in
+``.feature_cache/<name>-<sha256 prefix>/`` next to the CSV and afterwards
+only memory-maps them, so a changed CSV gets a new cache entry and an
+unchanged one loads in milliseconds. The hash is only recomputed when the
+CSV's size or modification time differ from the ones recorded with it.
+
+Derived features are computed on first use and stored in the same cache
+directory, so they are shared between detectors and sessions:
+
+    data = load()                        # nyc_taxi.csv
+    data.value, data.timestamp           # memory-mapped columns
+    data.lag(48)                         # value one day earlier (30 min data)
+    data.rolling_mean(48), data.rolling_std(48)
+    data.hour_of_week                    # 0 = Monday 00:00
+
+pandas is used for parsing when installed, otherwise the ``csv`` module.
+"""
+import csv
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nyc_taxi.csv")
+CACHE_DIR_NAME = ".feature_cache"
+CACHE_VERSION = 1
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=8)
+def _load_cached(path, size, mtime_ns, cache_dir):
+    # size/mtime are part of the key so an edited file is hashed again
+    return Dataset(path, cache_dir)
+
+
+def load(path=DEFAULT_CSV, cache_dir=None):
+    """
+    Returns the (cached) Dataset for a ``timestamp,value`` CSV.
+
+    Repeated calls in one process return the same object while the file is
+    unchanged.
+
+    Args:
+        path (str, optional): CSV path. Defaults to ``nyc_taxi.csv`` here.
+        cache_dir (str, optional): Cache root. Defaults to ``.feature_cache``
+            next to the CSV.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    return _load_cached(path, st.st_size, st.st_mtime_ns, cache_dir)
+
+
+class Dataset:
+    """
+    Memory-mapped columns of one CSV plus lazily memoized derived features.
+
+    Args:
+        path (str): Source CSV with ``timestamp`` and ``value`` columns.
+        cache_dir (str, optional): Cache root; see ``load``.
+    """
+
+    def __init__(self, path, cache_dir=None):
+        self.path = os.path.abspath(path)
+        root = cache_dir or os.path.join(os.path.dirname(self.path), CACHE_DIR_NAME)
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        st = os.stat(self.path)
+        self._stat = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        self.key = _cached_hash(root, stem, self.path, self._stat)
+        self.directory = os.path.join(root, f"{stem}-{self.key[:16]}")
+        self._features = {}
+        if not os.path.exists(os.path.join(self.directory, "meta.json")):
+            self._build()
+        _write_json(os.path.join(root, f"{stem}.source.json"),
+                    {"source": self.path, "sha256": self.key, **self._stat})
+        self.timestamp = self._column("timestamp")   # datetime64[s]
+        self.value = self._column("value")           # float64
+
+    def __len__(self):
+        return len(self.value)
+
+    # --- Cache files ---
+    def _build(self):
+        timestamps, values = _parse_csv(self.path)
+        os.makedirs(self.directory, exist_ok=True)
+        self._save("timestamp", timestamps)
+        self._save("value", values)
+        meta = {"version": CACHE_VERSION, "source": self.path, "sha256": self.key, "rows": len(values),
+                **self._stat}
+        _write_json(os.path.join(self.directory, "meta.json"), meta)
+
+    def _file(self, name):
+        return os.path.join(self.directory, name + ".npy")
+
+    def _save(self, name, array):
+        # Written under a temporary name first so readers never see half a file
+        tmp = self._file(name + ".tmp")
+        np.save(tmp, array)
+        os.replace(tmp, self._file(name))
+
+    def _column(self, name):
+        return np.load(self._file(name), mmap_mode="r")
+
+    def feature(self, name, compute):
+        """
+        Returns a named feature, computing and caching it on first use.
+
+        Args:
+            name (str): Cache name, unique per feature and parameters.
+            compute (callable): ``compute(dataset) -> np.ndarray``.
+        """
+        if name not in self._features:
+            if not os.path.exists(self._file(name)):
+                self._save(name, np.asarray(compute(self)))
+            self._features[name] = self._column(name)
+        return self._features[name]
+
+    # --- Shared features ---
+    def lag(self, n):
+        """``value`` shifted by ``n`` rows (NaN for the first ``n``)."""
+        n = self._check_rows("lag", n, 1)
+        def compute(ds):
+            out = np.full(len(ds), np.nan)
+            out[n:] = ds.value[:len(ds) - n]
+            return out
+        return self.feature(f"lag_{n}", compute)
+
+    def rolling_mean(self, window):
+        """Trailing mean over ``window`` rows (NaN until the window is full)."""
+        window = self._check_rows("window", window, 1)
+        def compute(ds):
+            s = _window_sums(ds.value, window)
+            out = np.full(len(ds), np.nan)
+            out[window - 1:] = s / window
+            return out
+        return self.feature(f"rolling_mean_{window}", compute)
+
+    def rolling_std(self, window):
+        """Trailing sample standard deviation over ``window`` rows."""
+        window = self._check_rows("window", window, 2)
+        def compute(ds):
+            # Centred on the global mean so the sum of squares stays accurate
+            x = ds.value - ds.value.mean()
+            s, sq = _window_sums(x, window), _window_sums(x * x, window)
+            out = np.full(len(ds), np.nan)
+            out[window - 1:] = np.sqrt(np.maximum(sq - s * s / window, 0.0) / (window - 1))
+            return out
+        return self.feature(f"rolling_std_{window}", compute)
+
+    def _check_rows(self, name, n, minimum):
+        """Validates a lag / window length against the series length."""
+        if int(n) != n or not minimum <= n <= len(self):
+            raise ValueError(f"{name} must be an integer in [{minimum}, {len(self)}], got {n}")
+        return int(n)
+
+    @property
+    def hour_of_week(self):
+        """Hour index within the week, 0 = Monday 00:00 ... 167 = Sunday 23:00."""
+        def compute(ds):
+            hours = ds.timestamp.astype("datetime64[h]").view(np.int64)
+            # 1970-01-01 was a Thursday, i.e. 72 hours after Monday 00:00
+            return ((hours + 72) % 168).astype(np.int16)
+        return self.feature("hour_of_week", compute)
+
+    @property
+    def hour_of_day(self):
+        return self.feature("hour_of_day", lambda ds: (ds.hour_of_week % 24).astype(np.int8))
+
+    @property
+    def day_of_week(self):
+        return self.feature("day_of_week", lambda ds: (ds.hour_of_week // 24).astype(np.int8))
+
+
+def _cached_hash(root, stem, path, stat):
+    """
+    SHA-256 of ``path``, reusing the one recorded for it while its size and
+    modification time are unchanged.
+    """
+    try:
+        with open(os.path.join(root, f"{stem}.source.json"), encoding="utf-8") as f:
+            recorded = json.load(f)
+        if (recorded.get("source") == path and all(recorded.get(k) == v for k, v in stat.items())
+                and os.path.exists(os.path.join(root, f"{stem}-{recorded['sha256'][:16]}", "meta.json"))):
+            return recorded["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return file_hash(path)
+
+
+def _write_json(path, data):
+    # Written under a temporary name first so readers never see half a file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _window_sums(x, window):
+    """Sums of every full trailing window of ``x`` (length ``len(x) - window + 1``)."""
+    c = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    return c[window:] - c[:-window]
+
+
+def _parse_csv(path):
+    """Reads the ``timestamp`` and ``value`` columns of a CSV."""
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        frame = pd.read_csv(path, usecols=["timestamp", "value"])
+        timestamps = pd.to_datetime(frame["timestamp"]).to_numpy().astype("datetime64[s]")
+        return timestamps, frame["value"].to_numpy(dtype=np.float64)
+
+    timestamps, values = [], []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            timestamps.append(row["timestamp"])
+            values.append(float(row["value"]))
+    return np.array(timestamps, dtype="datetime64[s]"), np.array(values, dtype=np.float64)
@@ -0,0 +1,347 @@
+"""
+Isolation Forest with single-pass, parallel and incremental scoring.
+
+``Isolation Forest.ipynb`` fits ``IsolationForest(n_estimators=500)`` and then
+calls ``decision_function`` and ``predict`` on the same array, which walks
+all 500 trees twice, and any new data needs a full refit. Here:
+
+* all trees are packed into flat node arrays and evaluated together, one
+  vectorized step per tree level, for a chunk of points at a time;
+* ``evaluate`` returns the decision scores and the labels from one traversal
+  (``decision_function`` / ``predict`` are thin wrappers around it);
+* on 1-D series (the notebook's case) every leaf covers an interval of x,
+  so the forest's total path length is a step function with a breakpoint
+  per split; it is built once per forest and a point is scored with one
+  binary search instead of a walk down every tree;
+* otherwise chunks are scored in worker processes when ``n_jobs > 1``; the
+  workers are started once and reused by every call until ``close()``.
+  Each forest version is written once to a temporary file that a worker
+  loads the first time it sees a chunk tagged with it, so ``slide`` does
+  not restart the pool;
+* ``slide`` grows new trees on recent data and drops the same number of the
+  oldest trees, so a live series is tracked without refitting the forest.
+
+Scores follow scikit-learn: ``score_samples`` is minus the anomaly score
+2 ** (-E[h(x)] / c(max_samples)), ``decision_function`` subtracts ``offset_``
+and negative values (``predict`` == -1) are outliers.
+"""
+import math
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+N_ESTIMATORS = 500
+MAX_SAMPLES = 256
+# Points per vectorized scoring chunk (the node array is trees x chunk)
+CHUNK_SIZE = 8192
+
+
+def _average_path(n):
+    """c(n): average path length of an unsuccessful BST search over n points."""
+    n = np.asarray(n, dtype=np.float64)
+    out = np.zeros_like(n)
+    big = n > 2
+    out[n == 2] = 1.0
+    out[big] = 2.0 * (np.log(n[big] - 1.0) + np.euler_gamma) - 2.0 * (n[big] - 1.0) / n[big]
+    return out
+
+
+class StreamingIsolationForest:
+    """
+    Isolation Forest on (n,) or (n, d) data with flat-array trees.
+
+    Args:
+        n_estimators (int): Number of trees. Defaults to 500 as in the notebook.
+        max_samples (int or float): Points per tree; a float is a fraction of
+            the fitted data. Defaults to 256.
+        contamination (float or 'auto'): Outlier fraction used for
+            ``offset_``; ``'auto'`` uses scikit-learn's fixed -0.5.
+        max_features (float): Fraction of features each tree may split on.
+        n_jobs (int): Worker processes for fitting and scoring.
+        seed (int, optional): Random seed.
+    """
+
+    def __init__(self, n_estimators=N_ESTIMATORS, max_samples=MAX_SAMPLES, contamination="auto",
+                 max_features=1.0, n_jobs=1, seed=None):
+        self.n_estimators = n_estimators
+        self.max_samples = max_samples
+        self.contamination = contamination
+        self.max_features = max_features
+        self.n_jobs = n_jobs
+        self.rng = np.random.default_rng(seed)
+        self.trees = []          # oldest first
+        self.offset_ = -0.5
+        self._packed = None
+        self._steps = None        # step function of 1-D forests, see _leaf_steps
+        self._generation = 0      # bumped by every _pack
+        self._forest_file = None  # (generation, path) of the forest written for the workers
+        self._tmpdir = None       # (path, finalizer) of the worker forest directory
+        self._grow_pool = None    # stateless workers for growing trees
+        self._score_pool = None   # workers caching the latest forest they loaded
+
+    # --- Fitting ---
+    def fit(self, X):
+        X = _as_2d(X)
+        self._samples = self._sample_size(len(X))
+        self._features = X.shape[1]
+        self.trees = self._grow_trees(X, self.n_estimators)
+        self._pack()
+        self._set_offset(X)
+        return self
+
+    def slide(self, X, n_trees):
+        """
+        Replaces the ``n_trees`` oldest trees with trees grown on ``X``.
+
+        ``X`` is the recent window of the series; the rest of the forest and
+        the tree sample size are kept. With ``contamination`` set, ``offset_``
+        is recalibrated on ``X``.
+        """
+        X = _as_2d(X)
+        n_trees = min(n_trees, self.n_estimators)
+        self.trees = self.trees[n_trees:] + self._grow_trees(X, n_trees)
+        self._pack()
+        self._set_offset(X)
+        return self
+
+    def _sample_size(self, n):
+        if isinstance(self.max_samples, float):
+            return max(2, int(self.max_samples * n))
+        return min(self.max_samples, n)
+
+    def _grow_trees(self, X, count):
+        size = min(self._samples, len(X))
+        n_features = X.shape[1]
+        k = max(1, int(round(self.max_features * n_features)))
+        seeds = self.rng.integers(0, 2**63 - 1, count)
+        tasks = [(X[self.rng.choice(len(X), size, replace=False)],
+                  self.rng.choice(n_features, k, replace=False), s) for s in seeds]
+        if self.n_jobs > 1 and count > 1:
+            if self._grow_pool is None:
+                self._grow_pool = ProcessPoolExecutor(max_workers=self.n_jobs)
+            return list(self._grow_pool.map(_grow_task, tasks, chunksize=max(1, count // (4 * self.n_jobs))))
+        return [_grow_task(t) for t in tasks]
+
+    def _set_offset(self, X):
+        if self.contamination == "auto":
+            self.offset_ = -0.5
+        else:
+            self.offset_ = float(np.percentile(self.score_samples(X), 100 * self.contamination))
+
+    def _pack(self):
+        """Concatenates all trees into flat arrays with global node indices."""
+        sizes = [len(t[0]) for t in self.trees]
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int32)
+        feature = np.concatenate([t[0] for t in self.trees])
+        threshold = np.concatenate([t[1] for t in self.trees])
+        child = np.concatenate([t[2] + s for t, s in zip(self.trees, starts)])
+        value = np.concatenate([t[3] for t in self.trees])
+        depth = max(t[4] for t in self.trees)
+        norm = _average_path(self._samples)
+        self._packed = (feature, threshold, child, value, starts, depth, float(norm))
+        self._steps = _leaf_steps(self._packed) if self._features == 1 else None
+        self._generation += 1
+
+    def _worker_forest(self):
+        """Path of the current forest for the scoring workers, written once per version."""
+        if self._forest_file is not None and self._forest_file[0] == self._generation:
+            return self._forest_file[1]
+        if self._tmpdir is None:
+            path = tempfile.mkdtemp(prefix="iforest-")
+            self._tmpdir = (path, weakref.finalize(self, shutil.rmtree, path, True))
+        path = os.path.join(self._tmpdir[0], f"forest-{self._generation}.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(self._packed, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Calls are synchronous, so no queued chunk still refers to the old file
+        if self._forest_file is not None:
+            os.remove(self._forest_file[1])
+        self._forest_file = (self._generation, path)
+        return path
+
+    def close(self):
+        """Shuts down the worker processes; they are restarted when needed."""
+        for name in ("_score_pool", "_grow_pool"):
+            pool = getattr(self, name)
+            if pool is not None:
+                pool.shutdown()
+                setattr(self, name, None)
+        if self._tmpdir is not None:
+            self._tmpdir[1]()
+            self._tmpdir = self._forest_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Scoring ---
+    def score_samples(self, X):
+        """Minus the anomaly score of every row, as scikit-learn."""
+        X = _as_2d(X)
+        if self._steps is not None:
+            return _score_steps(self._steps, X[:, 0], len(self.trees), self._packed[6])
+        chunks = [X[i:i + CHUNK_SIZE] for i in range(0, len(X), CHUNK_SIZE)]
+        # Small batches are scored in-process; pool round trips would dominate
+        if self.n_jobs > 1 and len(chunks) > 1:
+            if self._score_pool is None:
+                self._score_pool = ProcessPoolExecutor(max_workers=self.n_jobs)
+            path = self._worker_forest()
+            parts = list(self._score_pool.map(_score_chunk, [(path, c) for c in chunks]))
+        else:
+            parts = [_score(self._packed, c) for c in chunks]
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    def evaluate(self, X):
+        """
+        Decision scores and labels from a single pass over the trees.
+
+        Returns:
+            tuple: (decision_function values, labels with -1 for outliers).
+        """
+        decision = self.score_samples(X) - self.offset_
+        return decision, np.where(decision < 0, -1, 1)
+
+    def decision_function(self, X):
+        return self.evaluate(X)[0]
+
+    def predict(self, X):
+        return self.evaluate(X)[1]
+
+
+# --- Trees ---
+def _grow_task(task):
+    X, features, seed = task
+    return _grow_tree(X, features, np.random.default_rng(seed))
+
+
+def _grow_tree(X, features, rng):
+    """
+    Grows one isolation tree on the sample ``X``.
+
+    The two children of a split are stored next to each other, so a point
+    moves to ``child[node] + (x >= threshold[node])``. Leaves point to
+    themselves with an infinite threshold and hold depth + c(leaf size) as
+    ``value``; internal nodes hold 0.
+
+    Returns:
+        tuple: (feature, threshold, child, value, depth) node arrays.
+    """
+    max_depth = int(math.ceil(math.log2(max(len(X), 2))))
+    feature, threshold, child, value = [0], [np.inf], [0], [0.0]
+    stack = [(np.arange(len(X)), 0, 0)]
+    deepest = 0
+    while stack:
+        idx, depth, node = stack.pop()
+        x = X[idx][:, features]
+        lo, hi = x.min(axis=0), x.max(axis=0)
+        splittable = np.flatnonzero(hi > lo)
+        if depth >= max_depth or len(idx) <= 1 or len(splittable) == 0:
+            child[node] = node
+            value[node] = depth + float(_average_path(len(idx)))
+            deepest = max(deepest, depth)
+            continue
+        j = rng.choice(splittable)
+        t = rng.uniform(lo[j], hi[j])
+        first = len(feature)
+        feature[node], threshold[node], child[node] = int(features[j]), t, first
+        feature += [0, 0]
+        threshold += [np.inf, np.inf]
+        child += [0, 0]
+        value += [0.0, 0.0]
+        goes_right = x[:, j] >= t
+        stack.append((idx[~goes_right], depth + 1, first))
+        stack.append((idx[goes_right], depth + 1, first + 1))
+    return (np.array(feature, dtype=np.int32), np.array(threshold), np.array(child, dtype=np.int32),
+            np.array(value), deepest)
+
+
+def _score(packed, X):
+    """Vectorized traversal of every tree for a chunk of points."""
+    feature, threshold, child, value, starts, depth, norm = packed
+    # (trees, points) current node of every point in every tree
+    node = np.repeat(starts[:, None], len(X), axis=1)
+    rows = np.arange(len(X))
+    for _ in range(depth):
+        x = X[:, 0] if X.shape[1] == 1 else X[rows, feature[node]]
+        node = child[node] + (x >= threshold[node])
+    mean_path = value[node].mean(axis=0)
+    return _path_score(mean_path, norm)
+
+
+def _path_score(mean_path, norm):
+    return -np.power(2.0, -mean_path / norm) if norm > 0 else -np.full(len(mean_path), 0.5)
+
+
+def _leaf_steps(packed):
+    """
+    Total leaf value over all trees as a step function of x, for 1-D forests.
+
+    With one feature every node covers an interval [lo, hi) of x (the left
+    child of a split at t gets [lo, t), the right one [t, hi)). Each leaf
+    adds its value on its interval, so the sum only changes at the leaf
+    bounds, i.e. at the split thresholds.
+
+    Returns:
+        tuple: (sorted breakpoints, total below the first one, total from
+               each breakpoint on).
+    """
+    feature, threshold, child, value, starts, depth, norm = packed
+    lo = np.full(len(child), -np.inf)
+    hi = np.full(len(child), np.inf)
+    is_leaf = child == np.arange(len(child))
+    parent = np.flatnonzero(~is_leaf)
+    left = child[parent]
+    # Children come after their parent; one pass per level fixes that level
+    for _ in range(depth):
+        lo[left], hi[left] = lo[parent], threshold[parent]
+        lo[left + 1], hi[left + 1] = threshold[parent], hi[parent]
+    lo, hi, v = lo[is_leaf], hi[is_leaf], value[is_leaf]
+    starts_at, ends_at = np.isfinite(lo), np.isfinite(hi)
+    points = np.concatenate([lo[starts_at], hi[ends_at]])
+    jumps = np.concatenate([v[starts_at], -v[ends_at]])
+    order = np.argsort(points, kind="stable")
+    base = float(v[~starts_at].sum())
+    return points[order], base, base + np.cumsum(jumps[order])
+
+
+def _score_steps(steps, x, n_trees, norm):
+    """Scores 1-D points with the step function of ``_leaf_steps``."""
+    points, base, totals = steps
+    # x >= threshold goes right, so a point on a breakpoint is past it
+    k = np.searchsorted(points, x, side="right")
+    total = np.where(k > 0, totals[np.maximum(k - 1, 0)], base)
+    return _path_score(total / n_trees, norm)
+
+
+# (path, forest) last loaded by this worker process
+_FOREST = (None, None)
+
+
+def _score_chunk(task):
+    global _FOREST
+    path, X = task
+    if _FOREST[0] != path:
+        with open(path, "rb") as f:
+            _FOREST = (path, pickle.load(f))
+    return _score(_FOREST[1], X)
+
+
+def _as_2d(X):
+    X = np.asarray(X, dtype=np.float64)
+    return X[:, None] if X.ndim == 1 else X
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "nyc_taxi.csv"
+    values = np.loadtxt(path, delimiter=",", skiprows=1, usecols=1)
+    forest = StreamingIsolationForest(contamination=0.0005, max_features=0.8, seed=0).fit(values)
+    decision, labels = forest.evaluate(values)
+    for i in np.flatnonzero(labels == -1):
+        print(f"{i},{values[i]:g},{decision[i]:.4f}")
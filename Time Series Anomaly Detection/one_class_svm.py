@@ -0,0 +1,218 @@
+"""
+One-Class SVM with a kernel approximation and mini-batch SGD training.
+
+``One Class SVM.ipynb`` fits an exact RBF ``OneClassSVM(nu=0.95)``, whose
+kernel matrix makes training O(n^2) to O(n^3). Here the RBF kernel
+exp(-gamma * |x - y|^2) is replaced by an explicit feature map z(x) of fixed
+size, either
+
+* ``"rff"``: random Fourier features, sqrt(2 / D) * cos(W x + b), or
+* ``"nystroem"``: K(x, landmarks) @ K(landmarks, landmarks)^(-1/2),
+
+and a linear one-class SVM is trained on z(x) by SGD on the primal
+
+    min  1/2 |w|^2 - rho + 1 / nu * mean(max(0, rho - w . z(x)))
+
+one mini-batch at a time, so training is linear in the number of points and
+``partial_fit`` can consume a stream. ``fit`` finishes by setting rho to the
+nu-quantile of the training scores, its exact minimizer for the learned w;
+``partial_fit`` does the same after every call on a reservoir sample of the
+stream. Small ``nu`` only lets a few points per batch move w, so those need
+more epochs than the notebook's nu = 0.95.
+
+After ``fit``, ``decision_function`` uses libsvm's scale for the fitted data
+(the dual coefficients of ``sklearn.svm.OneClassSVM`` sum to nu * n), i.e.
+nu * len(X) * (w . z - rho), so thresholds chosen on the notebook's scores,
+such as ``< -3000``, keep their meaning. The scale is fixed at that value
+while streaming; a model trained only with ``partial_fit`` returns unscaled
+scores. Negative values are outliers, as in scikit-learn.
+"""
+import sys
+
+import numpy as np
+
+NU = 0.95
+N_COMPONENTS = 256
+BATCH_SIZE = 256
+# Stream points kept (reservoir sampling) to recalibrate rho in partial_fit
+RESERVOIR_SIZE = 4096
+
+
+class ApproxOneClassSVM:
+    """
+    RBF One-Class SVM via random Fourier / Nystroem features and SGD.
+
+    Args:
+        nu (float): Upper bound on the outlier fraction. Defaults to 0.95 as in
+            the notebook.
+        gamma (float or 'scale'): RBF width. ``'scale'`` uses
+            1 / (n_features * X.var()) of the first batch, like scikit-learn.
+        kernel_approx (str): ``'rff'`` or ``'nystroem'``.
+        n_components (int): Size of the feature map. Defaults to 256.
+        batch_size (int): SGD mini-batch size. Defaults to 256.
+        eta0 (float): Initial learning rate, decayed as eta0 / sqrt(t).
+            Defaults to 1.
+        seed (int, optional): Seed for the feature map and shuffling.
+    """
+
+    def __init__(self, nu=NU, gamma="scale", kernel_approx="rff", n_components=N_COMPONENTS,
+                 batch_size=BATCH_SIZE, eta0=1.0, seed=None):
+        if kernel_approx not in ("rff", "nystroem"):
+            raise ValueError("kernel_approx must be 'rff' or 'nystroem'")
+        self.nu = nu
+        self.gamma = gamma
+        self.kernel_approx = kernel_approx
+        self.n_components = n_components
+        self.batch_size = batch_size
+        self.eta0 = eta0
+        self.rng = np.random.default_rng(seed)
+        self.coef_ = None
+        self.offset_ = 0.0          # rho
+        self.scale_ = None          # libsvm score scale, set by fit
+        self.n_samples_seen_ = 0
+        self._steps = 0
+        self._reservoir = None
+
+    # --- Feature map ---
+    def _init_map(self, X):
+        d = X.shape[1]
+        gamma = self.gamma
+        if gamma == "scale":
+            var = X.var()
+            gamma = 1.0 / (d * var) if var > 0 else 1.0
+        self.gamma_ = float(gamma)
+        if self.kernel_approx == "rff":
+            self._W = self.rng.normal(0.0, np.sqrt(2 * self.gamma_), (d, self.n_components))
+            self._b = self.rng.uniform(0.0, 2 * np.pi, self.n_components)
+        else:
+            m = min(self.n_components, len(X))
+            self._landmarks = X[self.rng.choice(len(X), m, replace=False)]
+            # K_mm^(-1/2) via eigendecomposition, dropping near-null directions
+            vals, vecs = np.linalg.eigh(self._rbf(self._landmarks))
+            keep = vals > 1e-10 * vals.max()
+            self._normalizer = vecs[:, keep] / np.sqrt(vals[keep])
+        self.coef_ = np.zeros(self._feature_count())
+
+    def _feature_count(self):
+        return self.n_components if self.kernel_approx == "rff" else self._normalizer.shape[1]
+
+    def _rbf(self, X):
+        sq = (np.sum(X**2, axis=1)[:, None] + np.sum(self._landmarks**2, axis=1)
+              - 2 * X @ self._landmarks.T)
+        return np.exp(-self.gamma_ * np.maximum(sq, 0.0))
+
+    def transform(self, X):
+        """Maps inputs of shape (n,) or (n, d) to the approximate feature space."""
+        X = _as_2d(X)
+        if self.kernel_approx == "rff":
+            return np.sqrt(2.0 / self.n_components) * np.cos(X @ self._W + self._b)
+        return self._rbf(X) @ self._normalizer
+
+    # --- Training ---
+    def partial_fit(self, X):
+        """
+        One SGD step per mini-batch of ``X``, in order.
+
+        The first call fixes the feature map (and ``gamma='scale'``) from
+        its data, so it should be a representative batch. Afterwards rho is
+        set to the nu-quantile of the scores of a reservoir sample of
+        everything seen so far.
+        """
+        X = _as_2d(X)
+        if self.coef_ is None:
+            self._init_map(X)
+        for start in range(0, len(X), self.batch_size):
+            self._step(self.transform(X[start:start + self.batch_size]))
+        self._sample(X)
+        self.n_samples_seen_ += len(X)
+        self._calibrate(self._reservoir)
+        return self
+
+    def _sample(self, X):
+        """Reservoir-samples the rows of ``X`` (algorithm R, vectorized)."""
+        if self._reservoir is None:
+            self._reservoir = np.empty((0, X.shape[1]))
+        room = RESERVOIR_SIZE - len(self._reservoir)
+        if room > 0:
+            self._reservoir = np.concatenate([self._reservoir, X[:room]])
+            X = X[room:]
+        if len(X):
+            seen = self.n_samples_seen_ + max(room, 0) + np.arange(len(X))
+            slot = self.rng.integers(0, seen + 1)
+            keep = slot < RESERVOIR_SIZE
+            self._reservoir[slot[keep]] = X[keep]
+
+    def _calibrate(self, X):
+        """Sets rho to the nu-quantile of w . z over ``X``, its minimizer for the current w."""
+        self.offset_ = float(np.quantile(self.score_samples(X) + self.offset_, self.nu))
+
+    def fit(self, X, epochs=5):
+        """
+        Trains from scratch for ``epochs`` shuffled passes over ``X``.
+
+        Memory stays at one mini-batch of features; ``nu * len(X)`` becomes the
+        score scale, as for an exact fit on ``X``.
+        """
+        X = _as_2d(X)
+        self.coef_ = None
+        self._steps = 0
+        self.offset_ = 0.0
+        sample = X[self.rng.choice(len(X), min(len(X), 65536), replace=False)]
+        self._init_map(sample)
+        for _ in range(epochs):
+            order = self.rng.permutation(len(X))
+            for start in range(0, len(X), self.batch_size):
+                self._step(self.transform(X[np.sort(order[start:start + self.batch_size])]))
+        self.n_samples_seen_ = len(X)
+        self.scale_ = self.nu * len(X)
+        self._reservoir = X[np.sort(self.rng.choice(len(X), min(len(X), RESERVOIR_SIZE), replace=False))]
+        # rho minimizing the objective for the final w; a sample is enough
+        # for long series
+        if len(X) > 1_000_000:
+            X = X[np.sort(self.rng.choice(len(X), 1_000_000, replace=False))]
+        self._calibrate(X)
+        return self
+
+    def _step(self, Z):
+        self._steps += 1
+        eta = self.eta0 / np.sqrt(self._steps)
+        margin_violated = Z @ self.coef_ < self.offset_
+        frac = margin_violated.mean()
+        # Gradient of the objective multiplied by nu, which keeps the step
+        # sizes independent of nu
+        grad_w = self.nu * self.coef_ - Z[margin_violated].sum(axis=0) / len(Z)
+        grad_rho = frac - self.nu
+        self.coef_ -= eta * grad_w
+        self.offset_ -= eta * grad_rho
+
+    # --- Scoring ---
+    def score_samples(self, X, chunk_size=65536):
+        """Unscaled w . z(x) - rho for every row, computed in chunks."""
+        X = _as_2d(X)
+        out = np.empty(len(X))
+        for start in range(0, len(X), chunk_size):
+            Z = self.transform(X[start:start + chunk_size])
+            out[start:start + len(Z)] = Z @ self.coef_ - self.offset_
+        return out
+
+    def decision_function(self, X):
+        """Signed score on the fitted data's libsvm scale; negative for outliers."""
+        return (self.scale_ or 1.0) * self.score_samples(X)
+
+    def predict(self, X):
+        """-1 for outliers, 1 for inliers, as scikit-learn."""
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+
+def _as_2d(X):
+    X = np.asarray(X, dtype=np.float64)
+    return X[:, None] if X.ndim == 1 else X
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "nyc_taxi.csv"
+    values = np.loadtxt(path, delimiter=",", skiprows=1, usecols=1)
+    model = ApproxOneClassSVM(seed=0).fit(values)
+    scores = model.decision_function(values)
+    for i in np.flatnonzero(scores < -3000):
+        print(f"{i},{values[i]:g},{scores[i]:.1f}")
@@ -0,0 +1,162 @@
+"""
+Streaming robust z-score detector.
+
+Streaming version of the windowed robust z-score from ``Z Score.ipynb``:
+instead of cutting the series into fixed 1300-row blocks and recomputing the
+median and MAD of every block, a trailing window of the last ``window_size``
+points is kept in sorted order and every new point is scored as it arrives.
+
+    z = 0.6745 * (x - median) / MAD
+
+Memory is constant in the window size. Locating the insert and evict
+positions, the median and the MAD are all binary searches over the sorted
+buffer (O(log w)); the insert itself is a single memmove in the list.
+"""
+import bisect
+import csv
+import math
+import sys
+from collections import deque
+
+# Thresholds used in Z Score.ipynb
+UPPER_THRESHOLD = 2.0
+LOWER_THRESHOLD = -2.5
+WINDOW_SIZE = 1300
+
+
+class RollingRobustZScore:
+    """
+    Sliding-window robust z-score over a stream of values.
+
+    Args:
+        window_size (int): Number of most recent points the median/MAD use.
+        upper (float): z above this is flagged as an anomaly.
+        lower (float): z below this is flagged as an anomaly.
+        min_periods (int, optional): Points needed before scores are produced;
+            earlier points score NaN. Defaults to ``window_size // 10``.
+    """
+
+    def __init__(self, window_size=WINDOW_SIZE, upper=UPPER_THRESHOLD,
+                 lower=LOWER_THRESHOLD, min_periods=None):
+        if window_size < 2:
+            raise ValueError("window_size must be at least 2")
+        self.window_size = window_size
+        self.upper = upper
+        self.lower = lower
+        self.min_periods = max(2, window_size // 10) if min_periods is None else min_periods
+        self._window = deque()   # arrival order, for eviction
+        self._sorted = []        # same values, sorted
+
+    def __len__(self):
+        return len(self._window)
+
+    def update(self, value):
+        """
+        Adds one point to the window and returns its robust z-score.
+
+        Returns:
+            float: The z-score, NaN while fewer than ``min_periods`` points have
+                   been seen. A zero MAD gives 0 for the median itself and
+                   +/-inf for anything else.
+        """
+        value = float(value)
+        if len(self._window) == self.window_size:
+            old = self._window.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+        self._window.append(value)
+        bisect.insort(self._sorted, value)
+
+        if len(self._window) < self.min_periods:
+            return math.nan
+        median = self.median()
+        mad = self.mad(median)
+        if mad == 0:
+            return 0.0 if value == median else math.copysign(math.inf, value - median)
+        return 0.6745 * (value - median) / mad
+
+    def is_anomaly(self, z):
+        return z > self.upper or z < self.lower
+
+    def process(self, value):
+        """Returns ``(z, is_anomaly)`` for one new point."""
+        z = self.update(value)
+        return z, self.is_anomaly(z)
+
+    def score(self, values):
+        """Scores an iterable of values in order; returns a list of z-scores."""
+        return [self.update(v) for v in values]
+
+    # --- Order statistics on the sorted buffer ---
+    def median(self):
+        s = self._sorted
+        n = len(s)
+        if n % 2:
+            return s[n // 2]
+        return (s[n // 2 - 1] + s[n // 2]) / 2
+
+    def mad(self, median=None):
+        """
+        Median absolute deviation of the current window.
+
+        The deviations left of the median, read outward, and right of it, read
+        outward, are two already-sorted sequences, so the k-th smallest
+        deviation is a selection from two sorted arrays (binary search) and no
+        deviation array is ever built.
+        """
+        if median is None:
+            median = self.median()
+        n = len(self._sorted)
+        if n % 2:
+            return self._kth_deviation(n // 2, median)
+        return (self._kth_deviation(n // 2 - 1, median) + self._kth_deviation(n // 2, median)) / 2
+
+    def _kth_deviation(self, k, median):
+        s = self._sorted
+        p = bisect.bisect_left(s, median)
+        n_left, n_right = p, len(s) - p
+
+        def left(i):   # i-th smallest deviation left of the median
+            return median - s[p - 1 - i]
+
+        def right(j):  # j-th smallest deviation right of the median
+            return s[p + j] - median
+
+        # Take i from the left sequence and k + 1 - i from the right one
+        lo, hi = max(0, k + 1 - n_right), min(k + 1, n_left)
+        while lo < hi:
+            i = (lo + hi) // 2
+            j = k + 1 - i
+            if j > 0 and i < n_left and right(j - 1) > left(i):
+                lo = i + 1
+            else:
+                hi = i
+        i = lo
+        j = k + 1 - i
+        candidates = []
+        if i > 0:
+            candidates.append(left(i - 1))
+        if j > 0:
+            candidates.append(right(j - 1))
+        return max(candidates)
+
+
+def stream_csv(path, detector, column="value"):
+    """
+    Scores a ``nyc_taxi.csv``-style file row by row without loading it.
+
+    Yields:
+        tuple: (timestamp, value, z, is_anomaly) for every row.
+    """
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            value = float(row[column])
+            z, flagged = detector.process(value)
+            yield row.get("timestamp"), value, z, flagged
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "nyc_taxi.csv"
+    detector = RollingRobustZScore()
+    for timestamp, value, z, flagged in stream_csv(path, detector):
+        if flagged:
+            print(f"{timestamp},{value:g},{z:.3f}")
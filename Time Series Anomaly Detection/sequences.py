@@ -0,0 +1,123 @@
+"""
+Zero-copy sequence windows for the LSTM detector.
+
+``create_sequences`` in ``LSTM.ipynb`` appends every ``data[i:i + seq_length]``
+slice to a list and stacks them, so the (N, seq_length, 1) training tensor
+holds seq_length copies of the series. Here the windows are a strided view
+of the series itself (``numpy.lib.stride_tricks.sliding_window_view``), and
+batches are only materialized ``batch_size`` windows at a time:
+
+    X, y = sliding_windows(train_data, 20)           # views, no copy
+    model.fit(lstm_batches(train_data, 20, 64, epochs=50),
+              steps_per_epoch=batch_count(len(train_data), 20, 64), epochs=50)
+    y_pred = predict_windows(model, test_data, 20)
+
+The input may be a NumPy array or a ``np.load(..., mmap_mode='r')`` memory
+map, in which case only the rows of the current batch are ever read.
+"""
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+BATCH_SIZE = 64
+
+
+def _as_series(data):
+    """(N,) or (N, F) data as (N, F) without copying."""
+    data = np.asarray(data)
+    return data[:, None] if data.ndim == 1 else data
+
+
+def sliding_windows(data, seq_length):
+    """
+    Read-only windows over ``data`` and the value following each window.
+
+    Same windows and targets as ``create_sequences(data, seq_length)`` and
+    ``data[seq_length:]`` in the notebook, but both are views.
+
+    Args:
+        data (array-like): Series of shape (N,) or (N, F).
+        seq_length (int): Window length.
+
+    Returns:
+        tuple: (X (N - seq_length, seq_length, F), y (N - seq_length, F)).
+
+    Raises:
+        ValueError: If the series is not longer than ``seq_length``.
+    """
+    data = _as_series(data)
+    if len(data) <= seq_length:
+        raise ValueError("Series must be longer than seq_length")
+    # (N - L + 1, F, L) -> (N - L + 1, L, F); the last window has no target
+    windows = np.moveaxis(sliding_window_view(data, seq_length, axis=0), -1, 1)
+    return windows[:-1], data[seq_length:]
+
+
+def create_sequences(data, seq_length):
+    """Drop-in replacement for the notebook function, returning a view."""
+    return sliding_windows(data, seq_length)[0]
+
+
+def batch_count(n, seq_length, batch_size=BATCH_SIZE):
+    """Number of batches per pass over a series of length ``n``."""
+    return math.ceil(max(0, n - seq_length) / batch_size)
+
+
+def window_batches(data, seq_length, batch_size=BATCH_SIZE, shuffle=False, seed=None):
+    """
+    Yields one pass of ``(X_batch, y_batch)`` over the windows of ``data``.
+
+    Without shuffling the batches are contiguous slices of the window view and
+    are copied into a C-contiguous block only when yielded; with shuffling
+    each batch gathers its windows by index. Either way at most ``batch_size``
+    windows exist as real memory at any time.
+
+    Args:
+        data (array-like): Series of shape (N,) or (N, F).
+        seq_length (int): Window length.
+        batch_size (int, optional): Windows per batch. Defaults to 64.
+        shuffle (bool, optional): Visit the windows in random order.
+        seed (int, optional): Seed for the shuffle order.
+
+    Yields:
+        tuple: (X (B, seq_length, F) float32, y (B, F) float32).
+    """
+    X, y = sliding_windows(data, seq_length)
+    n = len(X)
+    if shuffle:
+        order = np.random.default_rng(seed).permutation(n)
+        for start in range(0, n, batch_size):
+            idx = np.sort(order[start:start + batch_size])
+            yield X[idx].astype(np.float32), y[idx].astype(np.float32)
+    else:
+        for start in range(0, n, batch_size):
+            stop = start + batch_size
+            yield (np.ascontiguousarray(X[start:stop], dtype=np.float32),
+                   np.ascontiguousarray(y[start:stop], dtype=np.float32))
+
+
+def lstm_batches(data, seq_length, batch_size=BATCH_SIZE, epochs=1, shuffle=True, seed=None):
+    """
+    Generator for ``model.fit`` that repeats ``window_batches`` for ``epochs``.
+
+    Pass ``steps_per_epoch=batch_count(len(data), seq_length, batch_size)``
+    together with it so Keras knows where an epoch ends.
+    """
+    for epoch in range(epochs):
+        yield from window_batches(data, seq_length, batch_size, shuffle,
+                                  None if seed is None else seed + epoch)
+
+
+def predict_windows(model, data, seq_length, batch_size=1024):
+    """
+    Runs ``model.predict_on_batch`` over every window of ``data`` in order.
+
+    Only the predictions, one row per window, are accumulated.
+
+    Returns:
+        np.ndarray: Predictions of shape (N - seq_length, outputs).
+    """
+    out = [np.asarray(model.predict_on_batch(X))
+           for X, _ in window_batches(data, seq_length, batch_size)]
+    return np.concatenate(out) if out else np.empty((0, 1), dtype=np.float32)
@@ -0,0 +1,32 @@
+import numpy as np
+
+from cusum import CusumDetector, detect_changes
+
+
+def _step(seed=0, n=3000, shift=5.0):
+    rng = np.random.default_rng(seed)
+    return np.concatenate([rng.normal(0, 1, n), rng.normal(shift, 1, n)])
+
+
+def test_step_change_gives_one_alarm():
+    x = _step()
+    indices, directions = detect_changes(x, h=10.0)
+    assert len(indices) == 1
+    assert 3000 <= indices[0] < 3020
+    assert directions[0] == 1
+
+
+def test_alarms_do_not_run_on_after_a_shift():
+    # Before the baseline was reset, every point after the shift alarmed again
+    x = _step()
+    indices, _ = detect_changes(x)
+    assert np.sum(indices >= 3000) < 20
+
+
+def test_update_many_matches_update():
+    x = np.concatenate([_step(1), _step(2, shift=-4.0)])
+    detector = CusumDetector()
+    expected = [(i, a) for i, v in enumerate(x) if (a := detector.update(v))]
+    for chunk_size in (7, 1000, len(x)):
+        indices, directions = detect_changes(x, chunk_size=chunk_size)
+        assert list(zip(indices.tolist(), directions.tolist())) == expected
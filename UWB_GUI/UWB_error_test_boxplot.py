@@ -1,7 +1,11 @@
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 import random
 
+from robust_solver import least_squares_batch, robust_trilateration_batch
+from site_config import get_site
+
 # Trilateration function
 def trilateration(p1, d1, p2, d2, p3, d3):
     """
@@ -41,16 +45,12 @@ def trilateration(p1, d1, p2, d2, p3, d3):
     y = (A * F - C * D) / denominator
     return np.array([x, y])
 
-# Anchors
-anchors = [
-    np.array([-4.5, 0]),    # A1
-    np.array([-1.5, -3]),   # A2
-    np.array([1.5, 0])      # A3
-]
-
 # True object position
 true_pos = np.array([0, 2])
 
+# The three site anchors closest to the object
+anchors = list(get_site().nearest_anchors(true_pos, 3))
+
 # Compute true distances from anchors to object
 true_distances = [np.linalg.norm(true_pos - a) for a in anchors]
 
@@ -104,26 +104,96 @@ def simulate_error(case, trials=1000):
             continue
     return errors
 
-# Run simulations
-errors_one = simulate_error(case=1)
-errors_two = simulate_error(case=2)
-errors_three = simulate_error(case=3)
-
-# Check if results are populated
-if not errors_one or not errors_two or not errors_three:
-    print("One or more error lists are empty. Check for issues.")
-else:
-    print("Simulation completed.")
-
-# Plotting
-plt.figure(figsize=(12, 6))
-plt.boxplot([errors_one, errors_two, errors_three],
-            tick_labels=["1 Anchor Wrong", "2 Anchors Wrong", "3 Anchors Wrong"],
-            patch_artist=True,
-            boxprops=dict(facecolor="lightblue"),
-            medianprops=dict(color="red", linewidth=2))
-plt.title("Trilateration Error with Increasing Distance Measurement Noise")
-plt.ylabel("Position Estimation Error (m)")
-plt.grid(True, linestyle='--', alpha=0.6)
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+def simulate_error_batch(case, trials=100000, n_anchors=6, seed=None):
+    """
+    Vectorized robust-vs-plain comparison for one noise application case.
+
+    Uses the ``n_anchors`` site anchors closest to ``true_pos``. In every trial
+    ``case`` randomly chosen anchors get a positive bias drawn uniformly from
+    [0, 5] m, as in ``simulate_error``. All trials are solved at once, both with
+    plain least squares over every anchor and with the consensus solver.
+
+    Args:
+        case (int): Number of biased anchors (1, 2 or 3).
+        trials (int, optional): Number of simulated fixes. Defaults to 100000.
+        n_anchors (int, optional): Anchors ranged per fix. Defaults to 6.
+        seed (int, optional): Seed for the random generator.
+
+    Returns:
+        tuple: (plain errors, robust errors) as 1-D arrays in meters; fixes that
+               could not be solved are dropped.
+    """
+    rng = np.random.default_rng(seed)
+    used = get_site().nearest_anchors(true_pos, n_anchors)
+
+    distances = np.tile(np.linalg.norm(used - true_pos, axis=1), (trials, 1))
+    # Pick `case` distinct anchors per trial via a random permutation
+    wrong = np.argsort(rng.random((trials, n_anchors)), axis=1)[:, :case]
+    np.add.at(distances, (np.arange(trials)[:, None], wrong), rng.uniform(0, 5, (trials, case)))
+
+    plain, _ = least_squares_batch(used, distances)
+    robust, _ = robust_trilateration_batch(used, distances)
+    plain_err = np.linalg.norm(plain - true_pos, axis=1)
+    robust_err = np.linalg.norm(robust - true_pos, axis=1)
+    return plain_err[np.isfinite(plain_err)], robust_err[np.isfinite(robust_err)]
+
+def plot_robust_comparison(trials, n_anchors):
+    """
+    Box plot of plain vs robust solving for 1, 2 and 3 biased anchors.
+    """
+    data, labels = [], []
+    for case in [1, 2, 3]:
+        plain_err, robust_err = simulate_error_batch(case, trials, n_anchors)
+        data += [plain_err, robust_err]
+        labels += [f"{case} Wrong - Plain", f"{case} Wrong - Robust"]
+        print(f"Case {case}: median plain {np.median(plain_err):.2f} m, "
+              f"median robust {np.median(robust_err):.2f} m")
+
+    plt.figure(figsize=(12, 6))
+    plt.boxplot(data, tick_labels=labels, patch_artist=True,
+                boxprops=dict(facecolor="lightblue"),
+                medianprops=dict(color="red", linewidth=2))
+    plt.title(f"Plain vs Robust Solving, {n_anchors} Anchors, {trials} Trials per Case")
+    plt.ylabel("Position Estimation Error (m)")
+    plt.grid(True, linestyle='--', alpha=0.6)
+    plt.tight_layout()
+    plt.show()
+
+def plot_plain_cases():
+    # Run simulations
+    errors_one = simulate_error(case=1)
+    errors_two = simulate_error(case=2)
+    errors_three = simulate_error(case=3)
+
+    # Check if results are populated
+    if not errors_one or not errors_two or not errors_three:
+        print("One or more error lists are empty. Check for issues.")
+    else:
+        print("Simulation completed.")
+
+    # Plotting
+    plt.figure(figsize=(12, 6))
+    plt.boxplot([errors_one, errors_two, errors_three],
+                tick_labels=["1 Anchor Wrong", "2 Anchors Wrong", "3 Anchors Wrong"],
+                patch_artist=True,
+                boxprops=dict(facecolor="lightblue"),
+                medianprops=dict(color="red", linewidth=2))
+    plt.title("Trilateration Error with Increasing Distance Measurement Noise")
+    plt.ylabel("Position Estimation Error (m)")
+    plt.grid(True, linestyle='--', alpha=0.6)
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trilateration error box plots")
+    parser.add_argument("--robust", action="store_true",
+                        help="compare plain and robust solving over site anchors")
+    parser.add_argument("--trials", type=int, default=100000,
+                        help="trials per case for --robust (default: 100000)")
+    parser.add_argument("--anchors", type=int, default=6,
+                        help="anchors ranged per fix for --robust (default: 6)")
+    args = parser.parse_args()
+    if args.robust:
+        plot_robust_comparison(args.trials, args.anchors)
+    else:
+        plot_plain_cases()
\ No newline at end of file
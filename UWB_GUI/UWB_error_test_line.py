@@ -2,6 +2,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import random
 
+from site_config import get_site
+
 def trilateration(p1, d1, p2, d2, p3, d3):
     """
     Calculates the position of a point using trilateration.
@@ -40,15 +42,11 @@ def trilateration(p1, d1, p2, d2, p3, d3):
     y = (A * F - C * D) / denominator
     return np.array([x, y])
 
-# Anchors
-anchors = [
-    np.array([-4.5, 0]),    # A1
-    np.array([-1.5, -3]),   # A2
-    np.array([1.5, 0])      # A3
-]
-
 # True object position
 true_pos = np.array([0, 2])
+
+# The three site anchors closest to the object
+anchors = list(get_site().nearest_anchors(true_pos, 3))
 true_distances = [np.linalg.norm(true_pos - a) for a in anchors]
 
 def simulate_errors(noise_levels, case, trials=100):
@@ -110,24 +108,32 @@ def simulate_errors(noise_levels, case, trials=100):
 
     return mean_errors
 
-# Noise levels from 0 to 5 meters
-noise_levels = np.linspace(0, 5, 11)
-
-# Run simulations
-errors_1 = simulate_errors(noise_levels, case=1)
-errors_2 = simulate_errors(noise_levels, case=2)
-errors_3 = simulate_errors(noise_levels, case=3)
-
-# Plotting
-plt.figure(figsize=(10, 6))
-plt.plot(noise_levels, errors_1, marker='o', label="1 Anchor Wrong")
-plt.plot(noise_levels, errors_2, marker='s', label="2 Anchors Wrong")
-plt.plot(noise_levels, errors_3, marker='^', label="3 Anchors Wrong")
-
-plt.title("Trilateration Error vs. Distance Noise Level")
-plt.xlabel("Max Distance Noise (m)")
-plt.ylabel("Mean Position Error (m)")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+def main():
+    """
+    Runs the three error cases over all noise levels and plots mean errors.
+    """
+    # Noise levels from 0 to 5 meters
+    noise_levels = np.linspace(0, 5, 11)
+
+    # Run simulations
+    errors_1 = simulate_errors(noise_levels, case=1)
+    errors_2 = simulate_errors(noise_levels, case=2)
+    errors_3 = simulate_errors(noise_levels, case=3)
+
+    # Plotting
+    plt.figure(figsize=(10, 6))
+    plt.plot(noise_levels, errors_1, marker='o', label="1 Anchor Wrong")
+    plt.plot(noise_levels, errors_2, marker='s', label="2 Anchors Wrong")
+    plt.plot(noise_levels, errors_3, marker='^', label="3 Anchors Wrong")
+
+    plt.title("Trilateration Error vs. Distance Noise Level")
+    plt.xlabel("Max Distance Noise (m)")
+    plt.ylabel("Mean Position Error (m)")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
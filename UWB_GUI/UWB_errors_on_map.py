@@ -4,12 +4,14 @@ import matplotlib.patches as patches
 import os
 import random
 
+from site_config import get_site
+
 # Output directory
 SAVE_FOLDER = "errors_on_map"
-os.makedirs(SAVE_FOLDER, exist_ok=True)
 
 # Settings
-ANCHORS = [np.array([-4.5, 0]), np.array([-1.5, -3]), np.array([1.5, 0])]
+# The three site anchors closest to the area the true positions are drawn from
+ANCHORS = list(get_site().nearest_anchors([0, 2], 3))
 NOISE_LEVELS = [0, 1, 2, 3, 4, 5]
 TRIALS_PER_SETTING = 3
 
@@ -63,15 +65,8 @@ def draw_depot(ax):
     Args:
         ax (matplotlib.axes.Axes): The axes object on which to draw the depot.
     """
-    raf_w, raf_h = 3, 20
-    koridor_w = 3
-    num_blocks = 8
-    total_width = num_blocks * raf_w + (num_blocks - 1) * koridor_w
-    start_x = -total_width / 2
-    for i in range(num_blocks):
-        x = start_x + i * (raf_w + koridor_w)
-        for y_off in [-3 - raf_h, 0, 3]:
-            ax.add_patch(plt.Rectangle((x, y_off), raf_w, raf_h, color='gray'))
+    for x, y, w, h in get_site().depot_rectangles():
+        ax.add_patch(plt.Rectangle((x, y), w, h, color='gray'))
 
 # Simulation & Plotting
 def simulate_and_plot(case, noise_level, trial_index, TRUE_POS):
@@ -160,9 +155,19 @@ def simulate_and_plot(case, noise_level, trial_index, TRUE_POS):
     except Exception as e:
         print(f"[ERROR] {e}")
 
-# Main Loop
-for case in [1, 2, 3]:
-    for noise in NOISE_LEVELS:
-        for trial in range(TRIALS_PER_SETTING):
-            TRUE_POS = np.array([random.uniform(-1.5,1.5),random.choice(range(0,10))])
-            simulate_and_plot(case, noise, trial, TRUE_POS)
+def main():
+    """
+    Renders every case / noise level / trial combination into SAVE_FOLDER.
+    """
+    os.makedirs(SAVE_FOLDER, exist_ok=True)
+
+    # Main Loop
+    for case in [1, 2, 3]:
+        for noise in NOISE_LEVELS:
+            for trial in range(TRIALS_PER_SETTING):
+                TRUE_POS = np.array([random.uniform(-1.5,1.5),random.choice(range(0,10))])
+                simulate_and_plot(case, noise, trial, TRUE_POS)
+
+
+if __name__ == "__main__":
+    main()
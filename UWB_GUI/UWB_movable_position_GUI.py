@@ -5,21 +5,16 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.patches as patches
 import numpy as np
 
-# Fixed anchor positions
-"""
-anchors = [
-    [-16.5, 0], [-10.5, 0], [-4.5, 0], [1.5, 0], [7.5, 0], [13.5, 0],
-    [-13.5, -3], [-7.5, -3], [-1.5, -3], [4.5, -3], [10.5, -3], [16.5, -3]
-]
+from coverage import OVERLAY_COLORS, get_coverage
+from site_config import get_site
+from zones import nearest_corridor
 
-"""
-
-anchors = [
-    [-15, 0], [-9, 0], [-3, 0], [3, 0], [9, 0], [15, 0],
-    [-15, -3], [-9, -3], [-3, -3], [3, -3], [9, -3], [15, -3]
-]
+# Anchor positions, range limit and depot geometry come from the shared site config
+site = get_site()
 
 # --- Globals ---
+root, fig, ax = None, None, None
+anchor_scatter = None
 star_pos = [0.0, 0.0]
 circles = []
 text_labels = []
@@ -28,52 +23,20 @@ star_label = None
 selected_star = False
 corridor_line = None
 corridor_text = None
+anchor_texts = []
+depot_patches = []
+coverage_image = None
 
 
 # --- Draw depot layout ---
 def draw_depot(ax):
-    raf_w, raf_h = 3, 20
-    koridor_w = 3
-    num_blocks = 8
-    total_width = num_blocks * raf_w + (num_blocks - 1) * koridor_w
-    start_x = -total_width / 2
-    for i in range(num_blocks):
-        x = start_x + i * (raf_w + koridor_w)
-        for y_off in [-3 - raf_h, 0, 3]:
-            ax.add_patch(plt.Rectangle((x, y_off), raf_w, raf_h, color='gray', alpha=1.0))
-
-# --- GUI Setup ---
-root = tk.Tk()
-root.title("Draggable Star - Closest Anchors Visualization")
-
-frame = ttk.Frame(root)
-frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-control_frame = ttk.Frame(root)
-control_frame.pack(side=tk.RIGHT, fill=tk.Y)
-
-fig, ax = plt.subplots(figsize=(12, 6))
-ax.set_aspect('equal')
-ax.set_xlim(-25, 25)
-ax.set_ylim(-25, 10)
-ax.grid(True)
-ax.set_title("Anchor Layout with Draggable Star")
-
-# Draw depot background
-draw_depot(ax)
-
-canvas = FigureCanvasTkAgg(fig, master=frame)
-canvas.draw()
-canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-# --- Plot anchors ---
-anchor_scatter = ax.scatter([a[0] for a in anchors], [a[1] for a in anchors], c='blue', s=100)
-for i, (x, y) in enumerate(anchors):
-    ax.text(x + 0.3, y + 0.3, f"A{i+1}", fontsize=9, color='blue')
-
-# --- Initial Star ---
-star = ax.plot([star_pos[0]], [star_pos[1]], 'r*', markersize=15)[0]
-star_label = ax.text(star_pos[0] + 0.5, star_pos[1] + 0.5, f"({star_pos[0]:.2f}, {star_pos[1]:.2f})", color='black')
+    return [ax.add_patch(plt.Rectangle((x, y), w, h, color='gray', alpha=1.0))
+            for x, y, w, h in site.depot_rectangles()]
+
+# --- Anchor labels ---
+def draw_anchor_labels():
+    return [ax.text(x + 0.3, y + 0.3, f"A{i+1}", fontsize=9, color='blue')
+            for i, (x, y) in enumerate(site.anchors)]
 
 # --- Functions ---
 def update_circles():
@@ -93,25 +56,12 @@ def update_circles():
     circles.clear()
     text_labels.clear()
 
-    # Step 1: Compute distances
-    distances = [np.linalg.norm(np.array(anchor) - np.array(star_pos)) for anchor in anchors]
-
-    # Step 2: Filter anchors within 10m
-    within_10m = [(i, d) for i, d in enumerate(distances) if d <= 10]
+    # Step 1-3: Closest 3 anchors within range (10m by default), from the coverage raster
+    anchors = site.anchors
+    closest_valid = get_coverage(site).anchors_in_range(star_pos, 3)
 
-    # Step 3: Sort by distance and take top 3
-    closest_valid = sorted(within_10m, key=lambda x: x[1])[:3]
-
-    # Step 4: Color by number of selected anchors
-    count = len(closest_valid)
-    if count == 3:
-        circle_color = 'green'
-    elif count == 2:
-        circle_color = 'yellow'
-    elif count == 1:
-        circle_color = 'red'
-    else:
-        circle_color = None  # No circles if nothing is close enough
+    # Step 4: Color by number of selected anchors, as the coverage overlay
+    circle_color = OVERLAY_COLORS[min(len(closest_valid), len(OVERLAY_COLORS) - 1)]
 
     # Step 5: Draw
     for i, d in closest_valid:
@@ -127,8 +77,7 @@ def update_circles():
     star_label = ax.text(star_pos[0] + 0.5, star_pos[1] + 0.5, f"({star_pos[0]:.2f}, {star_pos[1]:.2f})", color='red')
 
     # Corridor line (to y=0 or y=-3)
-    y_ref_lines = [0, -3]
-    closest_y = min(y_ref_lines, key=lambda y: abs(star_pos[1] - y))
+    closest_y = float(nearest_corridor(star_pos, site.corridor_lines)[0][0])
     corridor_line = ax.plot([star_pos[0], star_pos[0]], [star_pos[1], closest_y], linestyle='--', color='red')[0]
     mid_y = (star_pos[1] + closest_y) / 2
     corridor_text = ax.text(star_pos[0] + 0.5, mid_y, f"{abs(star_pos[1] - closest_y):.2f} m", color='black', fontsize=12)
@@ -155,12 +104,78 @@ def on_motion(event):
     star.set_data([star_pos[0]], [star_pos[1]])
     update_circles()
 
-# --- Bind mouse events ---
-fig.canvas.mpl_connect("button_press_event", on_press)
-fig.canvas.mpl_connect("button_release_event", on_release)
-fig.canvas.mpl_connect("motion_notify_event", on_motion)
+def on_site_change(site, changed):
+    global depot_patches, anchor_texts, coverage_image
+    if "depot" in changed:
+        for p in depot_patches:
+            p.remove()
+        depot_patches = draw_depot(ax)
+    if "anchors" in changed:
+        for t in anchor_texts:
+            t.remove()
+        anchor_scatter.set_offsets(site.anchor_array())
+        anchor_texts = draw_anchor_labels()
+    if changed & {"anchors", "range_limit"}:
+        coverage_image.remove()
+        coverage_image = get_coverage(site).draw(ax)
+    update_circles()
+
+def check_site():
+    site.reload_if_changed()
+    root.after(1000, check_site)
+
+def main():
+    """
+    Builds the draggable-star window and starts the Tk event loop.
+    """
+    global root, fig, ax, star, star_label, anchor_scatter, anchor_texts, depot_patches, coverage_image
+
+    # --- GUI Setup ---
+    root = tk.Tk()
+    root.title("Draggable Star - Closest Anchors Visualization")
+
+    frame = ttk.Frame(root)
+    frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    control_frame = ttk.Frame(root)
+    control_frame.pack(side=tk.RIGHT, fill=tk.Y)
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.set_aspect('equal')
+    ax.set_xlim(-25, 25)
+    ax.set_ylim(-25, 10)
+    ax.grid(True)
+    ax.set_title("Anchor Layout with Draggable Star")
+
+    # Draw coverage overlay and depot background
+    coverage_image = get_coverage(site).draw(ax)
+    depot_patches = draw_depot(ax)
+
+    canvas = FigureCanvasTkAgg(fig, master=frame)
+    canvas.draw()
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    # --- Plot anchors ---
+    anchor_scatter = ax.scatter(site.anchor_array()[:, 0], site.anchor_array()[:, 1], c='blue', s=100)
+    anchor_texts = draw_anchor_labels()
+
+    # --- Initial Star ---
+    star = ax.plot([star_pos[0]], [star_pos[1]], 'r*', markersize=15)[0]
+    star_label = ax.text(star_pos[0] + 0.5, star_pos[1] + 0.5, f"({star_pos[0]:.2f}, {star_pos[1]:.2f})", color='black')
+
+    site.subscribe(on_site_change)
+
+    # --- Bind mouse events ---
+    fig.canvas.mpl_connect("button_press_event", on_press)
+    fig.canvas.mpl_connect("button_release_event", on_release)
+    fig.canvas.mpl_connect("motion_notify_event", on_motion)
+
+    # --- Initial update ---
+    update_circles()
+    check_site()
+
+    root.mainloop()
 
-# --- Initial update ---
-update_circles()
 
-root.mainloop()
+if __name__ == "__main__":
+    main()
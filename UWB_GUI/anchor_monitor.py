@@ -0,0 +1,244 @@
+import threading
+
+import numpy as np
+
+from robust_solver import least_squares_position, robust_trilateration
+from site_config import get_site
+
+# EWMA weight of a new residual in the per-anchor bias estimate.
+DEFAULT_ALPHA = 0.05
+# |z| of the bias estimate above which an anchor is flagged, and below which
+# a quarantined anchor counts towards release.
+FLAG_Z = 4.0
+RELEASE_Z = 2.0
+# Residuals an anchor needs before it can be flagged.
+MIN_SAMPLES = 20
+# Consecutive flagged / clear frames before quarantining / releasing.
+QUARANTINE_AFTER = 10
+RELEASE_AFTER = 50
+# Floor of the range noise estimate in meters.
+MIN_SIGMA = 0.05
+# Wall-clock budget of the consensus fix per frame in seconds.
+FIX_BUDGET = 0.002
+# Per-anchor state arrays, indexed by anchor id.
+_STATE = ("count", "bias", "z", "flagged", "quarantined", "_flag_streak", "_clear_streak")
+
+
+class AnchorMonitor:
+    """
+    Per-anchor streaming detector for biased (NLOS) or faulty ranges.
+
+    Every frame with at least 4 ranges is solved with the consensus solver
+    (quarantined anchors left out), and each anchor's range residual
+    ``distance - |fix - anchor|`` is folded into an EWMA bias estimate. The
+    bias is turned into a z-score against the frame-wide noise level (an EWMA
+    of 1.4826 * median |residual|, so a few bad anchors do not inflate it).
+
+    All per-anchor state lives in NumPy arrays indexed by anchor id, so an
+    update is a handful of vectorized operations over the anchors in the
+    frame, independent of how many frames have been seen. The monitor
+    subscribes to its site: when anchors are moved, added or removed, their
+    state starts over against the new layout.
+
+    Args:
+        site (SiteConfig, optional): Anchor positions. Defaults to the shared site.
+        alpha (float, optional): EWMA weight of new residuals.
+        quarantine (bool, optional): Whether flagged anchors are quarantined
+            (dropped from solving) or only flagged.
+    """
+
+    def __init__(self, site=None, alpha=DEFAULT_ALPHA, quarantine=True, capacity=64):
+        self.site = site or get_site()
+        self.alpha = alpha
+        self.quarantine = quarantine
+        self.sigma = None
+        self.frames = 0
+        self._lock = threading.Lock()
+        self._allocate(capacity)
+        self.anchors = self.site.anchor_array()
+        # Std of an EWMA of unit-variance white noise
+        self._ewma_std = np.sqrt(alpha / (2 - alpha))
+        self.site.subscribe(self._on_site_change)
+
+    def _allocate(self, capacity):
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.bias = np.zeros(capacity)
+        self.z = np.zeros(capacity)
+        self.flagged = np.zeros(capacity, dtype=bool)
+        self.quarantined = np.zeros(capacity, dtype=bool)
+        self._flag_streak = np.zeros(capacity, dtype=np.int32)
+        self._clear_streak = np.zeros(capacity, dtype=np.int32)
+
+    def _ensure(self, anchor_id):
+        """Grows the state arrays (doubling) so ``anchor_id`` is a valid index."""
+        capacity = len(self.count)
+        if anchor_id < capacity:
+            return
+        new = max(anchor_id + 1, 2 * capacity)
+        for name in _STATE:
+            old = getattr(self, name)
+            grown = np.zeros(new, dtype=old.dtype)
+            grown[:capacity] = old
+            setattr(self, name, grown)
+
+    def _on_site_change(self, site, changed):
+        """Takes the new anchors and resets the state of every anchor that changed."""
+        if "anchors" not in changed:
+            return
+        new = site.anchor_array()
+        with self._lock:
+            old = self.anchors
+            n = min(len(old), len(new))
+            moved = np.flatnonzero(np.any(old[:n] != new[:n], axis=1))
+            # Ids past the shorter layout were added or removed
+            reset = np.concatenate([moved, np.arange(n, max(len(old), len(new)))])
+            reset = reset[reset < len(self.count)]
+            for name in _STATE:
+                getattr(self, name)[reset] = 0
+            self.anchors = new
+
+    # --- Updates ---
+    def update(self, ids, distances):
+        """
+        Folds one frame of ranges into the per-anchor state.
+
+        Args:
+            ids (array-like): Anchor ids of the ranges.
+            distances (array-like): Measured distances in meters.
+
+        Returns:
+            np.ndarray: Residual per range (NaN where none could be computed),
+                        or None if the frame could not be solved.
+        """
+        ids = np.asarray(ids, dtype=np.intp)
+        distances = np.asarray(distances, dtype=np.float64)
+        with self._lock:
+            anchors = self.anchors
+            known = (ids >= 0) & (ids < len(anchors))
+            if known.sum() < 4:
+                return None   # three ranges always fit exactly, nothing to compare
+
+            self._ensure(int(ids[known].max()))
+            k_ids, k_dist = ids[known], distances[known]
+            use = ~self.quarantined[k_ids]
+            try:
+                if use.sum() >= 4:
+                    pos, inliers = robust_trilateration(anchors[k_ids[use]], k_dist[use], budget=FIX_BUDGET)
+                elif use.sum() == 3:
+                    pos = least_squares_position(anchors[k_ids[use]], k_dist[use])
+                    inliers = np.ones(3, dtype=bool)
+                else:
+                    return None
+            except ValueError:
+                return None
+            if not _trusted_fix(anchors[k_ids[use]], inliers):
+                return None
+
+            # Quarantined anchors still get residuals so they can be released
+            r = k_dist - np.linalg.norm(anchors[k_ids] - pos, axis=1)
+            if use.sum() >= 4:   # an exact 3-anchor fit says nothing about the noise
+                frame_sigma = 1.4826 * np.median(np.abs(r[use]))
+                self.sigma = frame_sigma if self.sigma is None else self.sigma + self.alpha * (frame_sigma - self.sigma)
+            sigma = max(self.sigma or 0.0, MIN_SIGMA)
+
+            self.count[k_ids] += 1
+            self.bias[k_ids] += self.alpha * (r - self.bias[k_ids])
+            z = self.bias[k_ids] / (sigma * self._ewma_std)
+            self.z[k_ids] = z
+            flagged = (self.count[k_ids] >= MIN_SAMPLES) & (np.abs(z) > FLAG_Z)
+            self.flagged[k_ids] = flagged
+            self._flag_streak[k_ids] = np.where(flagged, self._flag_streak[k_ids] + 1, 0)
+            self._clear_streak[k_ids] = np.where(np.abs(z) < RELEASE_Z, self._clear_streak[k_ids] + 1, 0)
+            if self.quarantine:
+                q = self.quarantined[k_ids]
+                q |= self._flag_streak[k_ids] >= QUARANTINE_AFTER
+                q &= self._clear_streak[k_ids] < RELEASE_AFTER
+                self.quarantined[k_ids] = q
+            self.frames += 1
+
+        residuals = np.full(len(ids), np.nan)
+        residuals[known] = r
+        return residuals
+
+    def process(self, distances):
+        """
+        Runs a relay ``distances`` list through the detector.
+
+        Every item gets a ``flagged`` field. Items of quarantined anchors are
+        removed from the returned list.
+
+        Args:
+            distances (list): ``[{"anchor_id": int, "distance": float}, ...]``.
+
+        Returns:
+            tuple: (list of items to serve, list of quarantined anchor ids in
+                   this frame).
+        """
+        ids = [item["anchor_id"] for item in distances]
+        self.update(ids, [item["distance"] for item in distances])
+        kept, dropped = [], []
+        with self._lock:
+            for item, i in zip(distances, ids):
+                inside = 0 <= i < len(self.count)
+                if inside and self.quarantined[i]:
+                    dropped.append(i)
+                    continue
+                kept.append({**item, "flagged": bool(inside and self.flagged[i])})
+        return kept, dropped
+
+    # --- Reporting ---
+    def health(self):
+        """
+        Per-anchor detector state for every anchor that has been ranged.
+
+        Returns:
+            dict: ``{"frames", "sigma", "anchors": {id: {...}}}``.
+        """
+        with self._lock:
+            seen = np.flatnonzero(self.count)
+            return {
+                "frames": self.frames,
+                "sigma": self.sigma,
+                "anchors": {
+                    int(i): {
+                        "samples": int(self.count[i]),
+                        "bias": round(float(self.bias[i]), 4),
+                        "z": round(float(self.z[i]), 2),
+                        "flagged": bool(self.flagged[i]),
+                        "quarantined": bool(self.quarantined[i]),
+                    }
+                    for i in seen
+                },
+            }
+
+    def quarantined_ids(self):
+        with self._lock:
+            return [int(i) for i in np.flatnonzero(self.quarantined)]
+
+
+def usable_ranges(items):
+    """
+    Drops ranges the relay marked as ``flagged``, if at least 3 remain.
+
+    Quarantined anchors are already removed by the relay; this lets solvers
+    also skip anchors that are only flagged (or a relay running without
+    quarantine) without losing the fix altogether.
+    """
+    clean = [item for item in items if not item.get("flagged")]
+    return clean if len(clean) >= 3 else list(items)
+
+
+def _trusted_fix(anchors, inliers):
+    """
+    Whether residuals against a fix can be blamed on individual anchors.
+
+    The consensus must be a strict majority of at least 3 anchors, and they
+    must not all lie on one line: rows of collinear anchors (like the rack
+    lines of the default site) cannot tell a position from its mirror image,
+    so one biased range there can move the fix and every residual with it.
+    """
+    n_in = int(inliers.sum())
+    if n_in < 3 or 2 * n_in <= len(inliers):
+        return False
+    spread = anchors[inliers] - anchors[inliers].mean(axis=0)
+    return np.linalg.matrix_rank(spread, tol=1e-6) == 2
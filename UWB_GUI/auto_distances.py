@@ -5,17 +5,22 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.patches as patches
 import numpy as np
 import threading
-import requests
 import time
 
+from anchor_monitor import usable_ranges
+from robust_solver import robust_trilateration
+from site_config import get_site
+from trajectory import TrajectoryStore
+
+# Relay server the distances are polled from (see test_server_uwb.py)
+SERVER_URL = "http://172.20.10.2:5000/get"  # Flask sunucu IP'si buraya
+
 # --- Anchor Setup ---
-anchors = [
-    [-16.5, 0], [-10.5, 0], [-4.5, 0], [1.5, 0], [7.5, 0], [13.5, 0],
-    [-13.5, -3], [-7.5, -3], [-1.5, -3], [4.5, -3], [10.5, -3], [16.5, -3]
-]
+# Anchors, corridor lines and depot geometry come from the shared site config
+site = get_site()
 
 # --- Globals ---
-fig, ax = None, None
+root, fig, ax = None, None, None
 star = None
 star_label = None
 circles = []
@@ -23,7 +28,12 @@ text_labels = []
 corridor_line = None
 corridor_text = None
 received_label = None
+anchor_scatter = None
+depot_patches = []
 star_pos = [0.0, 0.0]
+trail_line = None
+trajectories = TrajectoryStore()
+MAX_TRAIL_POINTS = 600
 
 # --- Trilateration Function ---
 def trilateration_3anchors(p1, d1, p2, d2, p3, d3):
@@ -44,7 +54,7 @@ def trilateration_3anchors(p1, d1, p2, d2, p3, d3):
     return x, y
 
 # --- GUI Functions ---
-def update_plot(est_pos, used_indices, used_distances):
+def update_plot(est_pos, used_indices, used_distances, tag_id=0):
     global circles, text_labels, star_label, corridor_line, corridor_text
 
     for c in circles:
@@ -63,8 +73,8 @@ def update_plot(est_pos, used_indices, used_distances):
 
     colors = ['red', 'yellow', 'purple']
     for i, (idx, d) in enumerate(zip(used_indices, used_distances)):
-        anchor = anchors[idx]
-        circle = patches.Circle(anchor, radius=d, fill=True, color=colors[i], alpha=0.3, linestyle='--')
+        anchor = site.anchors[idx]
+        circle = patches.Circle(anchor, radius=d, fill=True, color=colors[i % len(colors)], alpha=0.3, linestyle='--')
         ax.add_patch(circle)
         circles.append(circle)
 
@@ -72,9 +82,11 @@ def update_plot(est_pos, used_indices, used_distances):
         text_labels.append(label)
 
     star.set_data([est_pos[0]], [est_pos[1]])
+    trajectories.append(tag_id, est_pos)
+    trail_line.set_data(*trajectories.trail(tag_id, MAX_TRAIL_POINTS).T)
     star_label = ax.text(est_pos[0] + 0.5, est_pos[1] + 0.5, f"({est_pos[0]:.2f}, {est_pos[1]:.2f})", color='red')
 
-    y_ref_lines = [0, -3]
+    y_ref_lines = site.corridor_lines
     closest_y = min(y_ref_lines, key=lambda y: abs(est_pos[1] - y))
     corridor_line = ax.plot([est_pos[0], est_pos[0]], [est_pos[1], closest_y], linestyle='--', color='red')[0]
     mid_y = (est_pos[1] + closest_y) / 2
@@ -84,42 +96,56 @@ def update_plot(est_pos, used_indices, used_distances):
 
 # --- Depot Drawing ---
 def draw_depot(ax):
-    raf_w, raf_h = 3, 20
-    koridor_w = 3
-    num_blocks = 8
-    total_width = num_blocks * raf_w + (num_blocks - 1) * koridor_w
-    start_x = -total_width / 2
-    for i in range(num_blocks):
-        x = start_x + i * (raf_w + koridor_w)
-        for y_off in [-3 - raf_h, 0, 3]:
-            ax.add_patch(plt.Rectangle((x, y_off), raf_w, raf_h, color='gray', alpha=1.0))
+    return [ax.add_patch(plt.Rectangle((x, y), w, h, color='gray', alpha=1.0))
+            for x, y, w, h in site.depot_rectangles()]
+
+# --- Site Reload ---
+def on_site_change(site, changed):
+    global depot_patches
+    if "depot" in changed:
+        for p in depot_patches:
+            p.remove()
+        depot_patches = draw_depot(ax)
+    if "anchors" in changed:
+        anchor_scatter.set_offsets(site.anchor_array())
+    fig.canvas.draw_idle()
 
 # --- Server Polling (DISTANCE DATA) ---
 def poll_distances():
+    import requests  # Only the live tracker needs HTTP
+
     while True:
         try:
+            site.reload_if_changed()
             # Flask sunucudan veri çek
-            response = requests.get("http://172.20.10.2:5000/get")  # Flask sunucu IP'si buraya
+            response = requests.get(SERVER_URL)
             if response.status_code == 200:
                 data = response.json()
-                distance_data = data.get("distances", [])
+                # Quarantined anchors are already dropped by the relay
+                distance_data = usable_ranges(data.get("distances", []))
 
-                if len(distance_data) != 3:
-                    raise ValueError("Beklenen 3 mesafe verisi yok")
+                if len(distance_data) < 3:
+                    raise ValueError("En az 3 mesafe verisi gerekli")
 
                 used_ids = [item['anchor_id'] for item in distance_data]
                 used_distances = [item['distance'] for item in distance_data]
-
-                p1, d1 = anchors[used_ids[0]], used_distances[0]
-                p2, d2 = anchors[used_ids[1]], used_distances[1]
-                p3, d3 = anchors[used_ids[2]], used_distances[2]
-
-                est_pos = trilateration_3anchors(p1, d1, p2, d2, p3, d3)
-                update_plot(est_pos, used_ids, used_distances)
-
-                received_label.config(
-                    text=f"Distances: {used_distances[0]:.2f}, {used_distances[1]:.2f}, {used_distances[2]:.2f}"
-                )
+                received_text = ", ".join(f"{d:.2f}" for d in used_distances)
+
+                if len(distance_data) == 3:
+                    anchors = site.anchors
+                    p1, d1 = anchors[used_ids[0]], used_distances[0]
+                    p2, d2 = anchors[used_ids[1]], used_distances[1]
+                    p3, d3 = anchors[used_ids[2]], used_distances[2]
+                    est_pos = trilateration_3anchors(p1, d1, p2, d2, p3, d3)
+                else:
+                    # More than 3 ranges: consensus fix, biased (NLOS) anchors are dropped
+                    est_pos, inliers = robust_trilateration(site.anchor_array()[used_ids], used_distances)
+                    used_ids = [i for i, ok in zip(used_ids, inliers) if ok]
+                    used_distances = [d for d, ok in zip(used_distances, inliers) if ok]
+
+                update_plot(est_pos, used_ids, used_distances, data.get("tag_id", 0))
+
+                received_label.config(text=f"Distances: {received_text}")
             else:
                 print(f"Sunucu hatası: {response.status_code}")
 
@@ -127,34 +153,52 @@ def poll_distances():
             print("Veri alma hatası:", e)
         time.sleep(0.5)
 
-# --- GUI Setup ---
-root = tk.Tk()
-root.title("UWB Simulation - Distance to Anchors")
+def main(server_url=None):
+    """
+    Builds the live tracking window and starts polling the relay server.
+
+    Args:
+        server_url (str, optional): URL of the relay's ``/get`` endpoint.
+                                    Defaults to ``SERVER_URL``.
+    """
+    global SERVER_URL, root, fig, ax, star, trail_line, anchor_scatter, depot_patches, received_label
+    if server_url:
+        SERVER_URL = server_url
+
+    # --- GUI Setup ---
+    root = tk.Tk()
+    root.title("UWB Simulation - Distance to Anchors")
+
+    frame = ttk.Frame(root)
+    frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    control_frame = ttk.Frame(root)
+    control_frame.pack(side=tk.RIGHT, fill=tk.Y)
+
+    fig, ax = plt.subplots(figsize=(20, 12))
+    ax.set_aspect('equal')
+    ax.set_xlim(-20, 20)
+    ax.set_ylim(-20, 20)
+    ax.grid(True)
+    ax.set_title("Anchor Layout")
 
-frame = ttk.Frame(root)
-frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-control_frame = ttk.Frame(root)
-control_frame.pack(side=tk.RIGHT, fill=tk.Y)
+    depot_patches = draw_depot(ax)
 
-fig, ax = plt.subplots(figsize=(20, 12))
-ax.set_aspect('equal')
-ax.set_xlim(-20, 20)
-ax.set_ylim(-20, 20)
-ax.grid(True)
-ax.set_title("Anchor Layout")
+    anchor_scatter = ax.scatter(site.anchor_array()[:, 0], site.anchor_array()[:, 1], s=100, color='green')
+    site.subscribe(on_site_change)
+    trail_line, = ax.plot([], [], '-', color='red', alpha=0.4, linewidth=1)
+    star, = ax.plot(star_pos[0], star_pos[1], 'r*', markersize=12)
 
-draw_depot(ax)
+    canvas = FigureCanvasTkAgg(fig, master=frame)
+    canvas.draw()
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-ax.scatter([a[0] for a in anchors], [a[1] for a in anchors], s=100, color='green')
-star, = ax.plot(star_pos[0], star_pos[1], 'r*', markersize=12)
+    received_label = ttk.Label(control_frame, text="Distances: (?)")
+    received_label.pack(pady=5)
 
-canvas = FigureCanvasTkAgg(fig, master=frame)
-canvas.draw()
-canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    threading.Thread(target=poll_distances, daemon=True).start()
 
-received_label = ttk.Label(control_frame, text="Distances: (?)")
-received_label.pack(pady=5)
+    root.mainloop()
 
-threading.Thread(target=poll_distances, daemon=True).start()
 
-root.mainloop()
+if __name__ == "__main__":
+    main()
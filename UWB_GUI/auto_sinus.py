@@ -8,15 +8,18 @@ import threading
 import time
 import math
 
+from coverage import OVERLAY_COLORS, get_coverage
+from site_config import get_site
+from zones import nearest_corridor
+from trajectory import TrajectoryBuffer
+
 # --- Anchor setup ---
-anchors = [
-    [-16.5, 0], [-10.5, 0], [-4.5, 0], [1.5, 0], [7.5, 0], [13.5, 0],
-    [-13.5, -3], [-7.5, -3], [-1.5, -3], [4.5, -3], [10.5, -3], [16.5, -3]
-]
+# Anchors, range limit and depot geometry come from the shared site config
+site = get_site()
 
 # --- Globals ---
 star_pos = [0.0, 0.0]
-fig, ax = None, None
+root, fig, ax = None, None, None
 star = None
 star_label = None
 circles = []
@@ -24,6 +27,11 @@ text_labels = []
 corridor_line = None
 corridor_text = None
 received_label = None
+anchor_scatter = None
+depot_patches = []
+trail_line = None
+trajectory = TrajectoryBuffer()
+MAX_TRAIL_POINTS = 600
 
 # --- GUI Functions ---
 def update_circles():
@@ -43,19 +51,11 @@ def update_circles():
     circles.clear()
     text_labels.clear()
 
-    distances = [np.linalg.norm(np.array(anchor) - np.array(star_pos)) for anchor in anchors]
-    within_10m = [(i, d) for i, d in enumerate(distances) if d <= 10.0]
-    closest_valid = sorted(within_10m, key=lambda x: x[1])[:3]
+    anchors = site.anchors
+    closest_valid = get_coverage(site).anchors_in_range(star_pos, 3)
 
-    count = len(closest_valid)
-    if count == 3:
-        circle_color = 'purple'
-    elif count == 2:
-        circle_color = 'yellow'
-    elif count == 1:
-        circle_color = 'red'
-    else:
-        circle_color = None
+    # Same colors as the coverage overlay
+    circle_color = OVERLAY_COLORS[min(len(closest_valid), len(OVERLAY_COLORS) - 1)]
 
     for i, d in closest_valid:
         anchor = anchors[i]
@@ -69,8 +69,9 @@ def update_circles():
     star_label = ax.text(star_pos[0] + 0.5, star_pos[1] + 0.5,
                          f"({star_pos[0]:.2f}, {star_pos[1]:.2f})", color='red')
 
-    y_ref_lines = [0, -3]
-    closest_y = min(y_ref_lines, key=lambda y: abs(star_pos[1] - y))
+    trail_line.set_data(*trajectory.trail(MAX_TRAIL_POINTS).T)
+
+    closest_y = float(nearest_corridor(star_pos, site.corridor_lines)[0][0])
     corridor_line = ax.plot([star_pos[0], star_pos[0]], [star_pos[1], closest_y], linestyle='--', color='red')[0]
     mid_y = (star_pos[1] + closest_y) / 2
     corridor_text = ax.text(star_pos[0] + 0.5, mid_y, f"{abs(star_pos[1] - closest_y):.2f} m", color='red', fontsize=9)
@@ -79,26 +80,34 @@ def update_circles():
 
 # --- Depot drawing ---
 def draw_depot(ax):
-    raf_w, raf_h = 3, 20
-    koridor_w = 3
-    num_blocks = 8
-    total_width = num_blocks * raf_w + (num_blocks - 1) * koridor_w
-    start_x = -total_width / 2
-    for i in range(num_blocks):
-        x = start_x + i * (raf_w + koridor_w)
-        for y_off in [-3 - raf_h, 0, 3]:
-            ax.add_patch(plt.Rectangle((x, y_off), raf_w, raf_h, color='gray', alpha=1.0))
+    return [ax.add_patch(plt.Rectangle((x, y), w, h, color='gray', alpha=1.0))
+            for x, y, w, h in site.depot_rectangles()]
+
+# --- Site reload ---
+def on_site_change(site, changed):
+    global depot_patches
+    if "depot" in changed:
+        for p in depot_patches:
+            p.remove()
+        depot_patches = draw_depot(ax)
+    if "anchors" in changed:
+        anchor_scatter.set_offsets(site.anchor_array())
 
 # --- Server polling simulation (sine wave movement) ---
 def poll_server():
     t = 0
+    last_check = time.time()
     while True:
         try:
+            if time.time() - last_check > 1.0:
+                site.reload_if_changed()
+                last_check = time.time()
             x = 15 * math.sin(t)
             y = 10 * math.cos(t)
             star_pos[0] = x
             star_pos[1] = y
             star.set_data([x], [y])
+            trajectory.append(star_pos)
             update_circles()
             received_label.config(text=f"Received Position: ({x:.2f}, {y:.2f})")
             t += 0.01
@@ -106,37 +115,49 @@ def poll_server():
             print("Simulation error:", e)
         time.sleep(0.01)
 
-# --- GUI Setup ---
-root = tk.Tk()
-root.title("UWB Simulation - Pattern Movement")
+def main():
+    """
+    Builds the simulation window and starts the sine-path movement thread.
+    """
+    global root, fig, ax, star, trail_line, anchor_scatter, depot_patches, received_label
+
+    # --- GUI Setup ---
+    root = tk.Tk()
+    root.title("UWB Simulation - Pattern Movement")
+
+    frame = ttk.Frame(root)
+    frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    control_frame = ttk.Frame(root)
+    control_frame.pack(side=tk.RIGHT, fill=tk.Y)
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.set_aspect('equal')
+    ax.set_xlim(-20, 20)
+    ax.set_ylim(-20, 20)
+    ax.grid(True)
+    ax.set_title("Anchor Layout")
 
-frame = ttk.Frame(root)
-frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-control_frame = ttk.Frame(root)
-control_frame.pack(side=tk.RIGHT, fill=tk.Y)
+    # Draw depot
+    depot_patches = draw_depot(ax)
 
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.set_aspect('equal')
-ax.set_xlim(-20, 20)
-ax.set_ylim(-20, 20)
-ax.grid(True)
-ax.set_title("Anchor Layout")
+    # Plot anchors and initial star
+    anchor_scatter = ax.scatter(site.anchor_array()[:, 0], site.anchor_array()[:, 1], s=100, color='green')
+    site.subscribe(on_site_change)
+    trail_line, = ax.plot([], [], '-', color='red', alpha=0.4, linewidth=1)
+    star, = ax.plot(star_pos[0], star_pos[1], 'r*', markersize=12)
 
-# Draw depot
-draw_depot(ax)
+    canvas = FigureCanvasTkAgg(fig, master=frame)
+    canvas.draw()
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-# Plot anchors and initial star
-ax.scatter([a[0] for a in anchors], [a[1] for a in anchors], s=100, color='green')
-star, = ax.plot(star_pos[0], star_pos[1], 'r*', markersize=12)
+    received_label = ttk.Label(control_frame, text="Received Position: (?)")
+    received_label.pack(pady=5)
 
-canvas = FigureCanvasTkAgg(fig, master=frame)
-canvas.draw()
-canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    # Start polling thread
+    threading.Thread(target=poll_server, daemon=True).start()
 
-received_label = ttk.Label(control_frame, text="Received Position: (?)")
-received_label.pack(pady=5)
+    root.mainloop()
 
-# Start polling thread
-threading.Thread(target=poll_server, daemon=True).start()
 
-root.mainloop()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import numpy as np
+
+from site_config import get_site
+
+# Default raster cell size in meters.
+RESOLUTION = 0.25
+# Colors by number of anchors in range (0, 1, 2, 3+), shared by this overlay and
+# the range circles of the live GUIs so both views agree.
+OVERLAY_COLORS = (None, "red", "yellow", "green")
+
+
+class CoverageRaster:
+    """
+    Precomputed anchor coverage of the floor.
+
+    The bounding box of the anchors, grown by the range limit, is cut into
+    square cells. Every cell stores the anchors whose range circle reaches
+    any part of the cell (closest first) and the number of anchors in range
+    of its centre. Anything outside the box is out of range of every anchor.
+
+    A lookup is one index computation plus an exact distance check of the
+    few candidates of one cell, independent of the number of anchors, and
+    gives the same answer as checking every anchor.
+
+    Args:
+        site (SiteConfig): Anchor positions and range limit.
+        resolution (float, optional): Cell size in meters.
+    """
+
+    def __init__(self, site, resolution=RESOLUTION):
+        self.resolution = resolution
+        self.range_limit = site.range_limit
+        self.anchors = site.anchor_array()
+        lo = self.anchors.min(axis=0) - self.range_limit
+        hi = self.anchors.max(axis=0) + self.range_limit
+        self.shape = tuple(int(v) for v in np.ceil((hi - lo) / resolution)[::-1])   # (rows, cols)
+        self.origin = lo
+        self.extent = (lo[0], lo[0] + self.shape[1] * resolution, lo[1], lo[1] + self.shape[0] * resolution)
+
+        ys = lo[1] + (np.arange(self.shape[0]) + 0.5) * resolution
+        xs = lo[0] + (np.arange(self.shape[1]) + 0.5) * resolution
+        centers = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+        d = np.linalg.norm(centers[:, None, :] - self.anchors[None], axis=2)
+        self.counts = (d <= self.range_limit).sum(axis=1).astype(np.int16).reshape(self.shape)
+
+        # A circle reaches a cell if it reaches within half a diagonal of its centre
+        reach = d <= self.range_limit + resolution / np.sqrt(2)
+        width = max(int(reach.sum(axis=1).max()), 1)
+        order = np.argsort(np.where(reach, d, np.inf), axis=1)[:, :width]
+        self.candidates = np.where(np.take_along_axis(reach, order, axis=1), order, -1)
+        self.candidates = self.candidates.astype(np.int16).reshape(self.shape + (width,))
+
+    def cell(self, pos):
+        """Returns the (row, col) of ``pos``, or None outside the raster."""
+        col, row = np.floor((np.asarray(pos, dtype=np.float64) - self.origin) / self.resolution).astype(int)
+        if 0 <= row < self.shape[0] and 0 <= col < self.shape[1]:
+            return row, col
+        return None
+
+    def anchors_in_range(self, pos, limit=None):
+        """
+        Anchors within the range limit of ``pos``, closest first.
+
+        Args:
+            pos (array-like): (x, y) position.
+            limit (int, optional): Return at most this many anchors.
+
+        Returns:
+            list: ``[(anchor index, distance), ...]``.
+        """
+        cell = self.cell(pos)
+        if cell is None:
+            return []
+        ids = self.candidates[cell]
+        ids = ids[ids >= 0]
+        d = np.linalg.norm(self.anchors[ids] - np.asarray(pos, dtype=np.float64), axis=1)
+        keep = np.argsort(d)[:limit]
+        return [(int(ids[k]), float(d[k])) for k in keep if d[k] <= self.range_limit]
+
+    def count_at(self, points):
+        """
+        Number of anchors in range of the cell of every point.
+
+        Args:
+            points (array-like): (n, 2) positions.
+
+        Returns:
+            np.ndarray: (n,) counts, 0 outside the raster.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        col, row = np.floor((points - self.origin) / self.resolution).astype(int).T
+        inside = (row >= 0) & (row < self.shape[0]) & (col >= 0) & (col < self.shape[1])
+        out = np.zeros(len(points), dtype=np.int16)
+        out[inside] = self.counts[row[inside], col[inside]]
+        return out
+
+    def overlay_rgba(self, colors=OVERLAY_COLORS, alpha=0.25):
+        """
+        Renders the counts as an RGBA image (rows bottom to top).
+
+        Args:
+            colors (tuple, optional): Color per count 0, 1, 2, ...; the last one
+                is used for higher counts and None is transparent.
+            alpha (float, optional): Opacity of the colored cells.
+
+        Returns:
+            np.ndarray: (rows, cols, 4) float image for ``imshow(origin='lower')``.
+        """
+        from matplotlib.colors import to_rgba  # Only needed for rendering
+        palette = np.array([(0, 0, 0, 0) if c is None else to_rgba(c, alpha) for c in colors])
+        return palette[np.minimum(self.counts, len(colors) - 1)]
+
+    def draw(self, ax, colors=OVERLAY_COLORS, alpha=0.25):
+        """Draws the coverage overlay below everything else on ``ax``."""
+        return ax.imshow(self.overlay_rgba(colors, alpha), origin="lower", extent=self.extent,
+                         interpolation="nearest", zorder=0)
+
+
+def get_coverage(site=None, resolution=RESOLUTION):
+    """
+    Returns the coverage raster of the site, built on first use.
+
+    The raster is cached on the site and rebuilt only after the anchors or
+    the range limit change.
+    """
+    site = site or get_site()
+    return site.derived(f"coverage:{resolution}", lambda s: CoverageRaster(s, resolution),
+                        depends=("anchors", "range_limit"))
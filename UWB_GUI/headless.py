@@ -0,0 +1,137 @@
+import json
+import sys
+
+import numpy as np
+
+from anchor_monitor import usable_ranges
+from robust_solver import least_squares_position, robust_trilateration
+from site_config import get_site
+from zones import ZoneTracker
+
+
+def write_frames(frames, out=None):
+    """
+    Writes frames as JSON lines to ``out`` (a path) or stdout.
+
+    Returns:
+        int: Number of frames written.
+    """
+    f = open(out, "w", encoding="utf-8") if out else sys.stdout
+    count = 0
+    try:
+        for frame in frames:
+            f.write(json.dumps(frame, separators=(",", ":")) + "\n")
+            count += 1
+    finally:
+        if out:
+            f.close()
+    return count
+
+
+# --- Replay ---
+def read_frames(path):
+    """Yields frames from a JSON-lines replay file ('-' reads stdin)."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def solve_frame(frame, site=None):
+    """
+    Computes the position for one range frame.
+
+    Ranges flagged by the relay's anchor monitor are skipped while at least
+    three remain. Three ranges are solved directly; more than three go through
+    the robust consensus solver so biased anchors are dropped.
+
+    Returns:
+        tuple: (position np.ndarray [x, y], inlier mask np.ndarray of bool).
+
+    Raises:
+        ValueError: If the frame has fewer than 3 ranges or anchors are aligned.
+    """
+    site = site or get_site()
+    items = usable_ranges(frame.get("distances", []))
+    ids = [item["anchor_id"] for item in items]
+    dists = np.array([item["distance"] for item in items], dtype=np.float64)
+    anchors = site.anchor_array()[ids]
+    if len(ids) == 3:
+        return least_squares_position(anchors, dists), np.ones(3, dtype=bool)
+    return robust_trilateration(anchors, dists)
+
+
+def replay(path, out=None):
+    """
+    Solves every frame of a replay file and writes ``t,tag_id,x,y,inliers`` CSV.
+
+    Frames that cannot be solved are reported on stderr and skipped.
+
+    Returns:
+        int: Number of frames solved.
+    """
+    f = open(out, "w", encoding="utf-8") if out else sys.stdout
+    solved = 0
+    try:
+        f.write("t,tag_id,x,y,inliers\n")
+        for n, frame in enumerate(read_frames(path)):
+            try:
+                pos, inliers = solve_frame(frame)
+            except (ValueError, KeyError, IndexError) as e:
+                print(f"Frame {n}: {e}", file=sys.stderr)
+                continue
+            f.write(f"{frame.get('t', n)},{frame.get('tag_id', 0)},{pos[0]:.4f},{pos[1]:.4f},{int(inliers.sum())}\n")
+            solved += 1
+    finally:
+        if out:
+            f.close()
+    return solved
+
+
+def zone_events(path, out=None):
+    """
+    Solves a replay file and writes zone enter/leave events as JSON lines.
+
+    Consecutive frames with the same ``t`` (one per tag, as written by the
+    multi-tag simulator) are assigned to zones in one vectorized update.
+
+    Returns:
+        int: Number of events written.
+    """
+    tracker = ZoneTracker()
+    f = open(out, "w", encoding="utf-8") if out else sys.stdout
+    count = 0
+    batch_t, tags, points = None, [], []
+
+    def flush():
+        nonlocal count
+        if tags:
+            for event in tracker.update(tags, points, batch_t)[1]:
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+                count += 1
+        tags.clear()
+        points.clear()
+
+    try:
+        for n, frame in enumerate(read_frames(path)):
+            try:
+                pos, _ = solve_frame(frame)
+            except (ValueError, KeyError, IndexError) as e:
+                print(f"Frame {n}: {e}", file=sys.stderr)
+                continue
+            t = frame.get("t", n)
+            if t != batch_t or frame.get("tag_id", 0) in tags:
+                flush()
+                batch_t = t
+            tags.append(frame.get("tag_id", 0))
+            points.append(pos)
+        flush()
+    finally:
+        if out:
+            f.close()
+    return count
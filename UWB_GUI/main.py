@@ -1,20 +1,164 @@
-import uwb3anchorstest # Assuming your GUI code is in uwb3anchorstest.py
+import argparse
 
-def main():
+# Heavy modules (tkinter, matplotlib, numpy, requests, flask) are imported
+# inside the subcommand handlers, so headless commands never load the GUI stack.
+
+
+def run_manager(args):
     """
     Launches the UWB Trilateration Anchor Manager GUI application.
     """
-    # The GUI initialization and main loop are contained within the uwb3anchorstest.py
-    # script's 'if __name__ == "__main__":' block (or a main() function it calls).
-    # By importing it, and assuming it has the __name__ == "__main__" guard,
-    # the GUI will start when this script is run.
-
-    # If uwb3anchorstest.py has a 'main()' function for its GUI, call it directly:
+    import uwb3anchorstest
     uwb3anchorstest.main()
 
-    # If uwb3anchorstest.py runs its GUI directly without a main() function,
-    # simply importing it is enough:
-    # (No explicit function call needed here if the GUI starts at the top level of the module)
+
+def run_live(args):
+    """
+    Launches the live tracker that polls the relay server for distances.
+    """
+    import auto_distances
+    auto_distances.main(args.server)
+
+
+def run_sinus(args):
+    """
+    Launches the sine-path movement simulation GUI.
+    """
+    import auto_sinus
+    auto_sinus.main()
+
+
+def run_movable(args):
+    """
+    Launches the draggable-star coverage GUI.
+    """
+    import UWB_movable_position_GUI
+    UWB_movable_position_GUI.main()
+
+
+def run_simulate(args):
+    """
+    Writes simulated range frames as JSON lines, or streams them into a relay.
+    """
+    import headless
+    import tag_simulator
+    frames = tag_simulator.frames(
+        max_anchors=args.max_anchors, duration=args.duration, rate=args.rate, tags=args.tags,
+        path=args.path, noise=args.noise, dropout=args.dropout, case=args.case, seed=args.seed)
+    if args.post:
+        sent, rate = tag_simulator.post_frames(frames, args.post)
+        print(f"Sent {sent} frames ({rate:.0f} frames/s)")
+    else:
+        headless.write_frames(frames, args.out)
+
+
+def run_replay(args):
+    """
+    Solves a JSON-lines range recording and writes positions as CSV.
+    """
+    import headless
+    headless.replay(args.file, args.out)
+
+
+def run_place(args):
+    """
+    Optimizes anchor positions by simulated error and writes a site config.
+    """
+    import placement
+    placement.main(args.out, args.anchors, args.mount, args.budget, args.jobs, args.noise, args.case, args.seed)
+
+
+def run_zones(args):
+    """
+    Solves a JSON-lines range recording and writes zone enter/leave events.
+    """
+    import headless
+    headless.zone_events(args.file, args.out)
+
+
+def run_serve(args):
+    """
+    Starts the Flask relay that receives and serves distance data.
+    """
+    import test_server_uwb
+    test_server_uwb.main(args.host, args.port, not args.no_quarantine)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="uwb", description="UWB positioning tools")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("manager", help="anchor manager GUI (default)")
+    p.set_defaults(func=run_manager)
+
+    p = sub.add_parser("live", help="live tracker polling the relay server")
+    p.add_argument("--server", help="relay /get URL (default: auto_distances.SERVER_URL)")
+    p.set_defaults(func=run_live)
+
+    p = sub.add_parser("sinus", help="sine-path movement simulation GUI")
+    p.set_defaults(func=run_sinus)
+
+    p = sub.add_parser("movable", help="draggable-star coverage GUI")
+    p.set_defaults(func=run_movable)
+
+    p = sub.add_parser("simulate", help="write simulated range frames (headless)")
+    p.add_argument("--duration", type=float, default=60.0, help="simulated seconds (default: 60)")
+    p.add_argument("--rate", type=float, default=100.0, help="frames per second (default: 100)")
+    p.add_argument("--max-anchors", type=int, default=None, help="ranges per frame (default: all in range)")
+    p.add_argument("--tags", type=int, default=1, help="simulated tags per time step (default: 1)")
+    p.add_argument("--path", choices=("sine", "waypoints"), default="sine",
+                   help="sine path of the GUI simulation or random walks along the aisles (default: sine)")
+    p.add_argument("--noise", type=float, default=0.0, help="range noise std in meters (default: 0)")
+    p.add_argument("--dropout", type=float, default=0.0, help="probability of losing an in-range reading")
+    p.add_argument("--case", type=int, choices=(0, 1, 2, 3), default=0,
+                   help="anchors per frame with a 0-5 m bias, as in the error tests (default: 0)")
+    p.add_argument("--seed", type=int, default=None, help="random seed")
+    p.add_argument("--post", metavar="URL", help="stream frames to a relay /send URL instead of writing them")
+    p.add_argument("-o", "--out", help="output file (default: stdout)")
+    p.set_defaults(func=run_simulate)
+
+    p = sub.add_parser("replay", help="solve a recorded range file (headless)")
+    p.add_argument("file", help="JSON-lines frames, '-' for stdin")
+    p.add_argument("-o", "--out", help="output CSV (default: stdout)")
+    p.set_defaults(func=run_replay)
+
+    p = sub.add_parser("zones", help="zone enter/leave events of a recorded range file (headless)")
+    p.add_argument("file", help="JSON-lines frames, '-' for stdin")
+    p.add_argument("-o", "--out", help="output JSON lines (default: stdout)")
+    p.set_defaults(func=run_zones)
+
+    p = sub.add_parser("place", help="optimize anchor positions and write a site config (headless)")
+    p.add_argument("-o", "--out", required=True, help="site config JSON to write")
+    p.add_argument("--anchors", type=int, default=None, help="anchors to place (default: as in the current site)")
+    p.add_argument("--mount", choices=("rack_ends", "aisle_lines", "both"), default="both",
+                   help="allowed mounting points (default: both)")
+    p.add_argument("--budget", type=float, default=60.0, help="search time in seconds (default: 60)")
+    p.add_argument("--jobs", type=int, default=1, help="worker processes (default: 1)")
+    p.add_argument("--noise", type=float, default=0.1, help="simulated range noise std in meters (default: 0.1)")
+    p.add_argument("--case", type=int, choices=(0, 1, 2, 3), default=0,
+                   help="biased anchors per fix, as in the error tests (default: 0)")
+    p.add_argument("--seed", type=int, default=None, help="random seed of the search")
+    p.set_defaults(func=run_place)
+
+    p = sub.add_parser("serve", help="run the distance relay server (headless)")
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=5000)
+    p.add_argument("--no-quarantine", action="store_true", help="only flag biased anchors, keep serving their ranges")
+    p.set_defaults(func=run_serve)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Command-line entry point for the UWB tools.
+
+    Without a subcommand the Anchor Manager GUI is started, as before.
+    """
+    args = build_parser().parse_args(argv)
+    func = getattr(args, "func", run_manager)
+    func(args)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,289 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from robust_solver import least_squares_batch
+from site_config import get_site
+from tag_simulator import range_batch
+
+# Error charged per uncovered floor point in the objective (no fix: fewer
+# than 3 anchors in range, or all of them on one line); estimates are
+# clipped to it as well.
+UNCOVERED_ERROR = 10.0
+# Weight of the worst covered floor point against the mean error in the objective.
+WORST_WEIGHT = 0.1
+# Spacing of candidate mounting points along the corridor lines in meters.
+LINE_SPACING = 1.5
+MOUNTS = ("rack_ends", "aisle_lines", "both")
+
+
+# --- Candidates and floor ---
+def mount_points(site=None, mount="both", spacing=LINE_SPACING):
+    """
+    Positions where an anchor may be mounted.
+
+    Args:
+        site (SiteConfig, optional): Site whose depot is used.
+        mount (str, optional): ``'rack_ends'`` (corners of the rack ends),
+            ``'aisle_lines'`` (points along the corridor lines) or ``'both'``.
+        spacing (float, optional): Spacing of the corridor line points.
+
+    Returns:
+        np.ndarray: (m, 2) unique candidate positions.
+
+    Raises:
+        ValueError: If ``mount`` is unknown.
+    """
+    if mount not in MOUNTS:
+        raise ValueError(f"Unknown mount: {mount}")
+    site = site or get_site()
+    rects = site.depot_rectangles()
+    points = []
+    if mount in ("rack_ends", "both"):
+        x, y, w, h = rects.T
+        points += [np.stack([x, y], axis=1), np.stack([x + w, y], axis=1),
+                   np.stack([x, y + h], axis=1), np.stack([x + w, y + h], axis=1)]
+    if mount in ("aisle_lines", "both"):
+        xs = np.arange(rects[:, 0].min(), (rects[:, 0] + rects[:, 2]).max() + 1e-9, spacing)
+        points += [np.stack([xs, np.full(len(xs), float(y))], axis=1) for y in site.corridor_lines]
+    return np.unique(np.round(np.concatenate(points), 6), axis=0)
+
+
+def floor_points(site=None, resolution=1.0):
+    """
+    Grid of walkable points over the depot: its bounding box minus the racks.
+
+    Returns:
+        np.ndarray: (p, 2) cell centres outside every rack.
+    """
+    site = site or get_site()
+    rects = site.depot_rectangles()
+    lo = rects[:, :2].min(axis=0)
+    hi = (rects[:, :2] + rects[:, 2:]).max(axis=0)
+    xs = np.arange(lo[0] + resolution / 2, hi[0], resolution)
+    ys = np.arange(lo[1] + resolution / 2, hi[1], resolution)
+    grid = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+    x, y, w, h = (r[None] for r in rects.T)
+    in_rack = ((grid[:, :1] > x) & (grid[:, :1] < x + w) & (grid[:, 1:] > y) & (grid[:, 1:] < y + h)).any(axis=1)
+    return grid[~in_rack]
+
+
+# --- Evaluation ---
+class PlacementProblem:
+    """
+    Simulated positioning error of anchor layouts over the depot floor.
+
+    Every layout is scored on the same floor points with the same random
+    draws (``trials`` noisy range sets per point, seeded), so differences
+    between layouts are not drowned in simulation noise. Ranges follow
+    ``tag_simulator.range_batch`` (range limit, Gaussian noise and the
+    error-test bias cases) and are solved by vectorized least squares.
+
+    Args:
+        site (SiteConfig, optional): Site to optimize. Defaults to the shared site.
+        resolution (float, optional): Floor grid spacing in meters.
+        trials (int, optional): Noisy range sets per floor point.
+        noise (float, optional): Range noise std in meters.
+        case (int, optional): Biased anchors per fix, as in the error tests.
+        seed (int, optional): Seed of the shared random draws.
+    """
+
+    def __init__(self, site=None, resolution=1.0, trials=4, noise=0.1, case=0, seed=0):
+        self.site = site or get_site()
+        self.range_limit = self.site.range_limit
+        self.points = np.repeat(floor_points(self.site, resolution), trials, axis=0)
+        self.trials = trials
+        self.noise = noise
+        self.case = case
+        self.seed = seed
+
+    def errors(self, anchors):
+        """
+        Positioning error of every floor point for one layout.
+
+        Returns:
+            tuple: ((p,) mean error in meters over the trials with a fix, NaN
+                   where no trial has one; (p,) fraction of trials with a fix).
+        """
+        anchors = np.asarray(anchors, dtype=np.float64)
+        rng = np.random.default_rng(self.seed)
+        d = range_batch(self.points, anchors, self.range_limit, rng, self.noise, 0.0, self.case)
+        mask = ~np.isnan(d)
+        pos, ok = least_squares_batch(anchors, np.nan_to_num(d), mask)
+        err = np.zeros(len(self.points))
+        err[ok] = np.minimum(np.linalg.norm(pos[ok] - self.points[ok], axis=1), UNCOVERED_ERROR)
+        fixes = ok.reshape(-1, self.trials).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = err.reshape(-1, self.trials).sum(axis=1) / fixes
+        return np.where(fixes > 0, mean, np.nan), fixes / self.trials
+
+    def score(self, anchors):
+        """
+        Scores one layout.
+
+        Errors are taken over covered floor points only, so the worst case
+        is not pinned at ``UNCOVERED_ERROR`` when part of the floor cannot be
+        covered; missing fixes enter the objective through the coverage term
+        ``(1 - coverage) * UNCOVERED_ERROR``.
+
+        Returns:
+            tuple: (objective, mean error, worst point error, coverage), the
+                   errors over covered points in meters and coverage as the
+                   fraction of floor fixes that could be solved.
+        """
+        err, fixed = self.errors(anchors)
+        coverage = float(fixed.mean())
+        covered = err[~np.isnan(err)]
+        if len(covered) == 0:
+            return UNCOVERED_ERROR * (1 + WORST_WEIGHT), UNCOVERED_ERROR, UNCOVERED_ERROR, 0.0
+        mean, worst = float(covered.mean()), float(covered.max())
+        objective = coverage * mean + (1 - coverage) * UNCOVERED_ERROR + WORST_WEIGHT * worst
+        return objective, mean, worst, coverage
+
+
+_PROBLEM = None
+
+
+def _set_problem(problem, candidates):
+    global _PROBLEM
+    _PROBLEM = (problem, candidates)
+
+
+def _score_layouts(layouts):
+    problem, candidates = _PROBLEM
+    return [problem.score(candidates[layout]) for layout in layouts]
+
+
+# --- Search ---
+def optimize(problem, candidates, n_anchors, budget=60.0, batch=32, n_jobs=1, start=None, seed=None,
+             verbose=False):
+    """
+    Searches anchor layouts on the candidate mounting points.
+
+    Batched stochastic hill climbing: every round ``batch`` neighbours of the
+    best layout are scored (one or two anchors moved, mostly to nearby
+    candidates, sometimes anywhere) in ``n_jobs`` worker processes and the
+    best one is kept if it improves the objective. The search stops when the
+    wall-clock ``budget`` is used up.
+
+    Args:
+        problem (PlacementProblem): Error model.
+        candidates (np.ndarray): (m, 2) mounting points.
+        n_anchors (int): Anchors to place.
+        budget (float, optional): Seconds to search.
+        batch (int, optional): Layouts scored per round.
+        n_jobs (int, optional): Worker processes.
+        start (np.ndarray, optional): (n_anchors, 2) initial layout, snapped to
+            the nearest candidates. Defaults to a random layout.
+        seed (int, optional): Seed of the search.
+        verbose (bool, optional): Print every improvement.
+
+    Returns:
+        tuple: ((n_anchors, 2) best layout, its (objective, mean, worst, coverage), rounds).
+
+    Raises:
+        ValueError: If there are fewer candidates than anchors.
+    """
+    m = len(candidates)
+    if m < n_anchors:
+        raise ValueError(f"Only {m} mounting points for {n_anchors} anchors")
+    rng = np.random.default_rng(seed)
+    deadline = time.monotonic() + budget
+    if start is None:
+        best = rng.choice(m, n_anchors, replace=False)
+    else:
+        best = _snap(np.asarray(start, dtype=np.float64), candidates)
+        if len(best) < n_anchors:
+            extra = rng.choice(np.setdiff1d(np.arange(m), best), n_anchors - len(best), replace=False)
+            best = np.concatenate([best, extra])
+    # Ten nearest other candidates of every candidate, for local moves
+    gap = np.linalg.norm(candidates[:, None] - candidates[None], axis=2)
+    near = np.argsort(gap, axis=1)[:, 1:11]
+
+    pool = ProcessPoolExecutor(n_jobs, initializer=_set_problem, initargs=(problem, candidates)) if n_jobs > 1 else None
+    _set_problem(problem, candidates)
+    try:
+        best_score = _score_layouts([best])[0]
+        rounds = 0
+        while time.monotonic() < deadline:
+            layouts = [_neighbour(best, near, m, rng) for _ in range(batch)]
+            if pool:
+                chunks = np.array_split(np.arange(batch), n_jobs)
+                scores = [s for part in pool.map(_score_layouts, [[layouts[i] for i in c] for c in chunks]) for s in part]
+            else:
+                scores = _score_layouts(layouts)
+            rounds += 1
+            k = int(np.argmin([s[0] for s in scores]))
+            if scores[k][0] < best_score[0]:
+                best, best_score = layouts[k], scores[k]
+                if verbose:
+                    print(f"round {rounds}: {_describe(best_score)}")
+    finally:
+        if pool:
+            pool.shutdown()
+    return candidates[best], best_score, rounds
+
+
+def _describe(score):
+    return f"coverage {100 * score[3]:.1f}%, mean {score[1]:.3f} m, worst {score[2]:.3f} m (covered points)"
+
+
+def _neighbour(layout, near, m, rng):
+    new = layout.copy()
+    for slot in rng.choice(len(layout), rng.integers(1, 3), replace=False):
+        target = rng.choice(near[new[slot]]) if rng.random() < 0.8 else rng.integers(m)
+        if target not in new:
+            new[slot] = target
+    return new
+
+
+def _snap(anchors, candidates):
+    """Indices of the nearest distinct candidates of ``anchors``, in order."""
+    taken = []
+    for a in anchors:
+        for i in np.argsort(np.linalg.norm(candidates - a, axis=1)):
+            if i not in taken:
+                taken.append(int(i))
+                break
+    return np.array(taken, dtype=np.intp)
+
+
+# --- Output ---
+def write_site(anchors, path, site=None):
+    """
+    Writes a copy of the site config with the given anchors.
+
+    The file is written next to ``path`` and renamed over it, so a tracker
+    watching the site never reads a half-written file.
+    """
+    site = site or get_site()
+    data = site.as_dict()
+    data["anchors"] = [[round(float(x), 3), round(float(y), 3)] for x, y in anchors]
+    # One anchor per line, like the shipped site_config.json
+    anchors = ",\n    ".join(json.dumps(a) for a in data.pop("anchors"))
+    rest = "".join(f',\n  "{key}": {json.dumps(value)}' for key, value in data.items())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f'{{\n  "anchors": [\n    {anchors}\n  ]{rest}\n}}\n')
+    os.replace(tmp, path)
+
+
+def main(out, n_anchors=None, mount="both", budget=60.0, n_jobs=1, noise=0.1, case=0, seed=None):
+    """
+    Optimizes the anchors of the shared site and writes the result to ``out``.
+    """
+    site = get_site()
+    n_anchors = n_anchors or len(site.anchors)
+    problem = PlacementProblem(site, noise=noise, case=case)
+    candidates = mount_points(site, mount)
+    current = problem.score(site.anchor_array())
+    print(f"Current layout: {_describe(current)}")
+    start = site.anchor_array() if n_anchors == len(site.anchors) else None
+    anchors, score, rounds = optimize(problem, candidates, n_anchors, budget, n_jobs=n_jobs, start=start,
+                                      seed=seed, verbose=True)
+    print(f"Best of {rounds} rounds: {_describe(score)}")
+    write_site(anchors, out, site)
+    return anchors
@@ -0,0 +1,270 @@
+import time
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+# Default inlier threshold on |range residual| in meters.
+DEFAULT_THRESHOLD = 0.5
+# Default wall-clock budget per fix in seconds.
+DEFAULT_BUDGET = 0.005
+# Subsets evaluated per vectorized step before the budget is checked again.
+CHUNK_SIZE = 256
+
+
+@lru_cache(maxsize=32)
+def anchor_triplets(n_anchors, max_subsets=4096, seed=0):
+    """
+    Returns the anchor index triplets a robust fix is computed from.
+
+    All C(n, 3) triplets are used when they fit in ``max_subsets``; otherwise a
+    fixed random sample is drawn. The result is cached per anchor count, so the
+    per-fix cost is only the vectorized solve.
+
+    Args:
+        n_anchors (int): Number of anchors with a range in the fix.
+        max_subsets (int, optional): Upper bound on triplets. Defaults to 4096.
+        seed (int, optional): Seed of the sample used for large anchor counts.
+
+    Returns:
+        np.ndarray: Read-only (S, 3) integer array of anchor indices.
+    """
+    all_count = n_anchors * (n_anchors - 1) * (n_anchors - 2) // 6
+    if all_count <= max_subsets:
+        subsets = np.array(list(combinations(range(n_anchors), 3)), dtype=np.intp).reshape(-1, 3)
+    else:
+        rng = np.random.default_rng(seed)
+        subsets = np.sort(np.array([rng.choice(n_anchors, 3, replace=False)
+                                    for _ in range(max_subsets)]), axis=1)
+        subsets = np.unique(subsets, axis=0)
+    subsets.setflags(write=False)
+    return subsets
+
+
+# --- Vectorized solvers ---
+def trilateration_batch(p1, d1, p2, d2, p3, d3):
+    """
+    Vectorized three-anchor trilateration.
+
+    Same closed form as ``trilateration`` in the test scripts, evaluated for
+    any number of anchor triplets / range sets at once.
+
+    Args:
+        p1, p2, p3 (np.ndarray): Anchor coordinates, shape (..., 2).
+        d1, d2, d3 (np.ndarray): Measured distances, shape (...).
+
+    Returns:
+        tuple: (positions (..., 2), valid (...)) where ``valid`` is False for
+               aligned anchors, whose position is NaN.
+    """
+    x1, y1 = p1[..., 0], p1[..., 1]
+    x2, y2 = p2[..., 0], p2[..., 1]
+    x3, y3 = p3[..., 0], p3[..., 1]
+    A = 2 * (x2 - x1)
+    B = 2 * (y2 - y1)
+    C = d1**2 - d2**2 - x1**2 + x2**2 - y1**2 + y2**2
+    D = 2 * (x3 - x1)
+    E = 2 * (y3 - y1)
+    F = d1**2 - d3**2 - x1**2 + x3**2 - y1**2 + y3**2
+    denominator = A * E - B * D
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = (C * E - B * F) / denominator
+        y = (A * F - C * D) / denominator
+    valid = np.broadcast_to(np.abs(denominator) > 1e-9, x.shape)
+    pos = np.stack([x, y], axis=-1)
+    pos[~valid] = np.nan
+    return pos, valid
+
+
+def least_squares_position(anchors, distances, mask=None):
+    """
+    Linear least-squares position from all (or the masked) anchors.
+
+    Subtracts the first anchor's circle equation from the others, which turns
+    the problem into an over-determined linear system.
+
+    Args:
+        anchors (np.ndarray): Anchor coordinates, shape (n, 2).
+        distances (np.ndarray): Measured distances, shape (n,).
+        mask (np.ndarray, optional): Boolean (n,) selection of anchors to use.
+
+    Returns:
+        np.ndarray: The estimated position [x, y].
+
+    Raises:
+        ValueError: If fewer than 3 anchors are selected or they are aligned.
+    """
+    anchors = np.asarray(anchors, dtype=np.float64)
+    distances = np.asarray(distances, dtype=np.float64)
+    if mask is not None:
+        anchors, distances = anchors[mask], distances[mask]
+    if len(anchors) < 3:
+        raise ValueError("Need at least 3 anchors")
+    ref, d_ref = anchors[0], distances[0]
+    A = 2 * (anchors[1:] - ref)
+    b = (d_ref**2 - distances[1:]**2
+         + np.sum(anchors[1:]**2, axis=1) - np.sum(ref**2))
+    pos, _, rank, _ = np.linalg.lstsq(A, b, rcond=None)
+    if rank < 2:
+        raise ValueError("Anchors are aligned")
+    return pos
+
+
+def robust_trilateration(anchors, distances, threshold=DEFAULT_THRESHOLD,
+                         budget=DEFAULT_BUDGET, max_subsets=4096):
+    """
+    Consensus (RANSAC-style) position fix that rejects biased ranges.
+
+    Every anchor triplet is solved in one vectorized pass, each candidate is
+    scored by how many anchors agree with it (|range residual| < threshold,
+    ties broken by the truncated residual sum), and the best candidate is
+    refined by least squares over its inliers. Triplets are processed in
+    chunks and evaluation stops once ``budget`` seconds have elapsed, so the
+    cost per fix stays bounded for large anchor counts.
+
+    Args:
+        anchors (array-like): Anchor coordinates, shape (n, 2), n >= 3.
+        distances (array-like): Measured distances, shape (n,).
+        threshold (float, optional): Inlier residual threshold in meters.
+        budget (float, optional): Wall-clock budget in seconds; None disables it.
+        max_subsets (int, optional): Upper bound on the number of triplets.
+
+    Returns:
+        tuple: (position np.ndarray [x, y], inlier mask np.ndarray of bool).
+
+    Raises:
+        ValueError: If fewer than 3 anchors are given or all triplets are aligned.
+    """
+    anchors = np.asarray(anchors, dtype=np.float64)
+    distances = np.asarray(distances, dtype=np.float64)
+    n = len(anchors)
+    if n < 3:
+        raise ValueError("Need at least 3 anchors")
+    if n == 3:
+        return least_squares_position(anchors, distances), np.ones(3, dtype=bool)
+
+    subsets = anchor_triplets(n, max_subsets)
+    deadline = None if budget is None else time.perf_counter() + budget
+    best_score, best_pos = None, None
+
+    for start in range(0, len(subsets), CHUNK_SIZE):
+        idx = subsets[start:start + CHUNK_SIZE]
+        pos, valid = trilateration_batch(anchors[idx[:, 0]], distances[idx[:, 0]],
+                                         anchors[idx[:, 1]], distances[idx[:, 1]],
+                                         anchors[idx[:, 2]], distances[idx[:, 2]])
+        if valid.any():
+            pos = pos[valid]
+            # (S, n) residuals of every candidate against every anchor
+            residuals = np.abs(np.linalg.norm(pos[:, None, :] - anchors[None], axis=2) - distances)
+            inliers = residuals < threshold
+            counts = inliers.sum(axis=1)
+            cost = np.minimum(residuals, threshold).sum(axis=1)
+            i = np.lexsort((cost, -counts))[0]
+            score = (counts[i], -cost[i])
+            if best_score is None or score > best_score:
+                best_score, best_pos = score, pos[i]
+        if deadline is not None and best_pos is not None and time.perf_counter() > deadline:
+            break
+
+    if best_pos is None:
+        raise ValueError("Anchors are aligned")
+
+    pos, mask = _refine(anchors, best_pos[None], distances[None], threshold)
+    return pos[0], mask[0]
+
+
+def robust_trilateration_batch(anchors, distances, threshold=DEFAULT_THRESHOLD,
+                               max_subsets=4096, chunk_fixes=512):
+    """
+    ``robust_trilateration`` for many fixes against the same anchors.
+
+    All fixes and all triplets are evaluated together in (fixes, subsets,
+    anchors) blocks, which is what the error-test scripts use to compare
+    robust and plain solving over large numbers of trials.
+
+    Args:
+        anchors (array-like): Anchor coordinates, shape (n, 2), n >= 3.
+        distances (array-like): Measured distances, shape (F, n).
+        threshold (float, optional): Inlier residual threshold in meters.
+        max_subsets (int, optional): Upper bound on the number of triplets.
+        chunk_fixes (int, optional): Fixes processed per block to bound memory.
+
+    Returns:
+        tuple: (positions (F, 2), inlier masks (F, n)). Fixes for which every
+               triplet is aligned get NaN positions.
+    """
+    anchors = np.asarray(anchors, dtype=np.float64)
+    distances = np.atleast_2d(np.asarray(distances, dtype=np.float64))
+    n = anchors.shape[0]
+    if n < 3:
+        raise ValueError("Need at least 3 anchors")
+    idx = anchor_triplets(n, max_subsets)
+    positions = np.full((len(distances), 2), np.nan)
+    masks = np.zeros(distances.shape, dtype=bool)
+
+    for start in range(0, len(distances), chunk_fixes):
+        d = distances[start:start + chunk_fixes]
+        # (F, S, 2) candidates for every fix and triplet
+        pos, valid = trilateration_batch(anchors[idx[:, 0]], d[:, idx[:, 0]],
+                                         anchors[idx[:, 1]], d[:, idx[:, 1]],
+                                         anchors[idx[:, 2]], d[:, idx[:, 2]])
+        residuals = np.abs(np.linalg.norm(pos[:, :, None, :] - anchors, axis=3) - d[:, None, :])
+        counts = np.where(valid, (residuals < threshold).sum(axis=2), -1)
+        cost = np.minimum(np.nan_to_num(residuals, nan=threshold), threshold).sum(axis=2)
+        # Highest inlier count first, lowest truncated cost as tie-break
+        best = np.argmax(counts * (n * threshold + 1.0) - cost, axis=1)
+        best_pos = pos[np.arange(len(d)), best]
+        positions[start:start + len(d)], masks[start:start + len(d)] = _refine(anchors, best_pos, d, threshold)
+    return positions, masks
+
+
+def least_squares_batch(anchors, distances, mask=None):
+    """
+    Vectorized linear least-squares positions for many fixes.
+
+    Subtracting the (masked) mean of the circle equations removes the
+    quadratic term, leaving a 2x2 normal system per fix that is solved for
+    all fixes at once.
+
+    Args:
+        anchors (np.ndarray): Anchor coordinates, shape (n, 2).
+        distances (np.ndarray): Measured distances, shape (F, n).
+        mask (np.ndarray, optional): Boolean (F, n) anchors to use per fix.
+
+    Returns:
+        tuple: (positions (F, 2), ok (F,)) where ``ok`` is False for fixes with
+               fewer than 3 usable anchors or aligned anchors (position NaN).
+    """
+    anchors = np.asarray(anchors, dtype=np.float64)
+    distances = np.atleast_2d(np.asarray(distances, dtype=np.float64))
+    w = np.ones(distances.shape) if mask is None else mask.astype(np.float64)
+    n_in = w.sum(axis=1)
+    safe_n = np.maximum(n_in, 1)[:, None]
+    p_mean = (w @ anchors) / safe_n
+    c = distances**2 - np.sum(anchors**2, axis=1)
+    c_mean = (w * c).sum(axis=1, keepdims=True) / safe_n
+    dp = anchors[None] - p_mean[:, None, :]           # (F, n, 2)
+    dc = c - c_mean                                   # (F, n)
+    M = np.einsum('fn,fni,fnj->fij', w, dp, dp)
+    rhs = -0.5 * np.einsum('fn,fni,fn->fi', w, dp, dc)
+    det = M[:, 0, 0] * M[:, 1, 1] - M[:, 0, 1] * M[:, 1, 0]
+    ok = (n_in >= 3) & (np.abs(det) > 1e-9)
+    positions = np.full((len(distances), 2), np.nan)
+    if ok.any():
+        positions[ok] = np.linalg.solve(M[ok], rhs[ok][..., None])[..., 0]
+    return positions, ok
+
+
+def _refine(anchors, positions, distances, threshold):
+    """
+    Least-squares refinement of candidate fixes over their inlier anchors.
+
+    Fixes with fewer than 3 inliers, or aligned inliers, keep their
+    candidate position.
+    """
+    mask = np.abs(np.linalg.norm(positions[:, None, :] - anchors, axis=2) - distances) < threshold
+    refined, ok = least_squares_batch(anchors, distances, mask)
+    refined[~ok] = positions[~ok]
+    if ok.any():
+        mask[ok] = np.abs(np.linalg.norm(refined[ok][:, None, :] - anchors, axis=2) - distances[ok]) < threshold
+    return refined, mask
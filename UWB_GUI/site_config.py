@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+# Site file shipped next to the scripts; override with the UWB_SITE_CONFIG variable.
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_config.json")
+ENV_VAR = "UWB_SITE_CONFIG"
+
+SECTIONS = ("anchors", "range_limit", "corridor_lines", "depot")
+
+
+# --- Loading ---
+def load_file(path):
+    """
+    Parses a site description from a JSON or YAML file.
+
+    Args:
+        path (str): Path to a ``.json``, ``.yaml`` or ``.yml`` file.
+
+    Returns:
+        dict: The validated site description.
+
+    Raises:
+        ValueError: If a required section is missing or anchors are malformed.
+        ImportError: If a YAML file is given and PyYAML is not installed.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # Only needed for YAML sites
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    missing = [key for key in SECTIONS if key not in data]
+    if missing:
+        raise ValueError(f"Site config is missing: {', '.join(missing)}")
+    anchors = data["anchors"]
+    if len(anchors) < 3 or any(len(a) != 2 for a in anchors):
+        raise ValueError("Site config needs at least 3 anchors given as [x, y]")
+    data["anchors"] = [[float(x), float(y)] for x, y in anchors]
+    return data
+
+
+class SiteConfig:
+    """
+    Shared anchor and depot description with hot reloading.
+
+    Values derived from the site (anchor arrays, solver matrices, background
+    rasters) are registered through ``derived`` together with the sections they
+    depend on. When the file changes on disk only the caches whose sections
+    actually changed are dropped; they are rebuilt lazily on next access.
+    Listeners registered with ``subscribe`` are called after every reload with
+    the set of changed section names.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get(ENV_VAR, DEFAULT_PATH)
+        self.version = 0
+        self._data = {}
+        self._mtime = None
+        self._cache = {}   # name -> (depends, value)
+        self._listeners = []
+        self._lock = threading.RLock()
+        self.reload()
+
+    # --- Sections ---
+    @property
+    def anchors(self):
+        return self._data["anchors"]
+
+    @property
+    def range_limit(self):
+        return float(self._data["range_limit"])
+
+    @property
+    def corridor_lines(self):
+        return self._data["corridor_lines"]
+
+    @property
+    def depot(self):
+        return self._data["depot"]
+
+    def as_dict(self):
+        return json.loads(json.dumps(self._data))
+
+    # --- Derived caches ---
+    def derived(self, name, builder, depends=SECTIONS):
+        """
+        Returns a cached value computed from the site, building it if needed.
+
+        Args:
+            name (str): Cache key.
+            builder (callable): Called as ``builder(site)`` to build the value.
+            depends (tuple, optional): Sections the value is computed from.
+                Defaults to every section.
+
+        Returns:
+            The cached value.
+        """
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry is None:
+                entry = self._cache[name] = (tuple(depends), builder(self))
+            return entry[1]
+
+    def anchor_array(self):
+        """Returns the anchors as a read-only (n, 2) float array."""
+        return self.derived("anchor_array", _build_anchor_array, depends=("anchors",))
+
+    def nearest_anchors(self, pos, count=3):
+        """
+        Returns the ``count`` anchors closest to ``pos`` as a (count, 2) array,
+        closest first.
+        """
+        anchors = self.anchor_array()
+        order = np.argsort(np.linalg.norm(anchors - np.asarray(pos, dtype=np.float64), axis=1), kind="stable")
+        return anchors[order[:count]]
+
+    def depot_rectangles(self):
+        """Returns the rack footprints as an (m, 4) array of (x, y, w, h)."""
+        return self.derived("depot_rectangles", _build_depot_rectangles, depends=("depot",))
+
+    # --- Reloading ---
+    def subscribe(self, callback):
+        """Registers ``callback(site, changed_sections)`` to run after a reload."""
+        self._listeners.append(callback)
+
+    def reload(self):
+        """
+        Re-reads the site file and invalidates caches of changed sections.
+
+        Returns:
+            set: Names of the sections whose values changed.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        data = load_file(self.path)
+        with self._lock:
+            changed = {key for key in SECTIONS if self._data.get(key) != data[key]}
+            self._data = data
+            self._mtime = mtime
+            if changed:
+                self.version += 1
+                self._cache = {name: entry for name, entry in self._cache.items()
+                               if not changed.intersection(entry[0])}
+        if changed and self.version > 1:
+            for callback in self._listeners:
+                callback(self, changed)
+        return changed
+
+    def reload_if_changed(self):
+        """
+        Reloads the site if the file's modification time changed.
+
+        A file that fails to parse is reported and the previous site is kept,
+        so a half-saved edit never takes the tracker down.
+
+        Returns:
+            set: Names of the sections that changed (empty if nothing did).
+        """
+        try:
+            if os.stat(self.path).st_mtime_ns == self._mtime:
+                return set()
+            return self.reload()
+        except (OSError, ValueError) as e:
+            print("Site config reload error:", e)
+            return set()
+
+    def watch(self, interval=1.0):
+        """Starts a daemon thread that calls ``reload_if_changed`` periodically."""
+        stop = threading.Event()
+
+        def _loop():
+            while not stop.wait(interval):
+                self.reload_if_changed()
+
+        threading.Thread(target=_loop, daemon=True).start()
+        return stop
+
+
+# --- Builders ---
+def _build_anchor_array(site):
+    arr = np.array(site.anchors, dtype=np.float64)
+    arr.setflags(write=False)
+    return arr
+
+
+def _build_depot_rectangles(site):
+    depot = site.depot
+    raf_w, raf_h = depot["rack_width"], depot["rack_depth"]
+    koridor_w = depot["aisle_width"]
+    num_blocks = depot["num_blocks"]
+    total_width = num_blocks * raf_w + (num_blocks - 1) * koridor_w
+    start_x = -total_width / 2
+    rects = [(start_x + i * (raf_w + koridor_w), y_off, raf_w, raf_h)
+             for i in range(num_blocks) for y_off in depot["row_offsets"]]
+    arr = np.array(rects, dtype=np.float64).reshape(-1, 4)
+    arr.setflags(write=False)
+    return arr
+
+
+_shared = None
+
+
+def get_site():
+    """Returns the process-wide SiteConfig, loading it on first use."""
+    global _shared
+    if _shared is None:
+        _shared = SiteConfig()
+    return _shared
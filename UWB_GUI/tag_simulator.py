@@ -0,0 +1,227 @@
+import json
+import time
+
+import numpy as np
+
+from site_config import get_site
+
+# Bias range of the one/two/three-anchor cases in the error-test scripts.
+CASE_BIAS_MAX = 5.0
+# Default walking speed along aisle waypoints in m/s.
+DEFAULT_SPEED = 1.4
+PATHS = ("sine", "waypoints")
+
+
+# --- Trajectories ---
+def sine_positions(t, tags, phase_step=None):
+    """
+    Positions on the ``auto_sinus.py`` path (15*sin(t), 10*cos(t)).
+
+    Tag k is shifted by ``k * phase_step`` radians; by default the tags are
+    spread evenly over the loop.
+
+    Args:
+        t (float): Simulated time in seconds.
+        tags (int): Number of tags.
+        phase_step (float, optional): Phase offset between consecutive tags.
+
+    Returns:
+        np.ndarray: (tags, 2) positions.
+    """
+    if phase_step is None:
+        phase_step = 2 * np.pi / tags
+    angle = t + phase_step * np.arange(tags)
+    return np.stack([15 * np.sin(angle), 10 * np.cos(angle)], axis=1)
+
+
+def aisle_graph(site=None):
+    """
+    Aisle centre lines of the site's depot.
+
+    Returns:
+        tuple: (aisle x positions (k,), cross-aisle y, (y_min, y_max) of the aisles).
+    """
+    site = site or get_site()
+    depot = site.depot
+    rack_w, aisle_w = depot["rack_width"], depot["aisle_width"]
+    num_blocks = depot["num_blocks"]
+    total_width = num_blocks * rack_w + (num_blocks - 1) * aisle_w
+    start_x = -total_width / 2
+    aisle_x = start_x + rack_w + aisle_w / 2 + np.arange(num_blocks - 1) * (rack_w + aisle_w)
+    cross_y = float(np.mean(site.corridor_lines))
+    offsets = depot["row_offsets"]
+    y_range = (min(offsets), max(offsets) + depot["rack_depth"])
+    return aisle_x, cross_y, y_range
+
+
+class WaypointPaths:
+    """
+    Random-waypoint walks along the depot aisles for many tags at once.
+
+    Each leg goes from a point in one aisle to the cross aisle, along it to
+    another aisle and up or down that aisle to a random point. Every tag's
+    route is a polyline of precomputed waypoints walked at its own speed, so
+    positions at any time are one vectorized interpolation.
+
+    Args:
+        tags (int): Number of tags.
+        legs (int, optional): Aisle-to-aisle legs per route; routes loop.
+        speed (float, optional): Mean walking speed in m/s.
+        site (SiteConfig, optional): Site whose depot defines the aisles.
+        rng (np.random.Generator, optional): Random generator.
+    """
+
+    def __init__(self, tags, legs=16, speed=DEFAULT_SPEED, site=None, rng=None):
+        rng = rng or np.random.default_rng()
+        aisle_x, cross_y, (y_min, y_max) = aisle_graph(site)
+        aisle = rng.integers(0, len(aisle_x), (tags, legs + 1))
+        y = rng.uniform(y_min, y_max, (tags, legs + 1))
+        x = aisle_x[aisle]
+        # Waypoints per leg: aisle point -> cross aisle (same x) -> cross aisle (next x)
+        pts = np.empty((tags, 3 * legs + 1, 2))
+        pts[:, 0:-1:3, 0], pts[:, 0:-1:3, 1] = x[:, :-1], y[:, :-1]
+        pts[:, 1::3, 0], pts[:, 1::3, 1] = x[:, :-1], cross_y
+        pts[:, 2::3, 0], pts[:, 2::3, 1] = x[:, 1:], cross_y
+        pts[:, -1, 0], pts[:, -1, 1] = x[:, -1], y[:, -1]
+        self.points = pts
+        seg = np.linalg.norm(np.diff(pts, axis=1), axis=2)
+        self.cumulative = np.concatenate([np.zeros((tags, 1)), np.cumsum(seg, axis=1)], axis=1)
+        self.speed = speed * rng.uniform(0.7, 1.3, tags)
+
+    def positions(self, t):
+        """Returns (tags, 2) positions at simulated time ``t``."""
+        total = self.cumulative[:, -1]
+        s = np.mod(self.speed * t, np.where(total > 0, total, 1.0))
+        # Segment index: number of waypoints already passed
+        k = np.clip((self.cumulative <= s[:, None]).sum(axis=1) - 1, 0, self.points.shape[1] - 2)
+        rows = np.arange(len(s))
+        start, end = self.points[rows, k], self.points[rows, k + 1]
+        length = self.cumulative[rows, k + 1] - self.cumulative[rows, k]
+        frac = np.where(length > 0, (s - self.cumulative[rows, k]) / np.where(length > 0, length, 1.0), 0.0)
+        return start + frac[:, None] * (end - start)
+
+
+# --- Ranging ---
+def range_batch(positions, anchors, range_limit, rng, noise=0.0, dropout=0.0, case=0,
+                biased_anchors=(), bias=0.0):
+    """
+    Simulated ranges from every tag to every anchor.
+
+    Args:
+        positions (np.ndarray): (T, 2) tag positions.
+        anchors (np.ndarray): (n, 2) anchor positions.
+        range_limit (float): Ranges beyond this are dropped.
+        rng (np.random.Generator): Random generator.
+        noise (float, optional): Std of Gaussian range noise in meters.
+        dropout (float, optional): Probability that an in-range reading is lost.
+        case (int, optional): Number of in-range anchors per tag that get a
+            positive bias drawn from [0, 5] m, as in the error-test scripts.
+        biased_anchors (iterable, optional): Anchor ids with a constant bias
+            (a persistent NLOS anchor).
+        bias (float, optional): That constant bias in meters.
+
+    Returns:
+        np.ndarray: (T, n) distances with NaN for missing ranges.
+    """
+    true = np.linalg.norm(positions[:, None, :] - anchors[None], axis=2)
+    valid = true <= range_limit
+    if dropout > 0:
+        valid &= rng.random(true.shape) >= dropout
+    d = true + rng.normal(0.0, noise, true.shape) if noise > 0 else true.copy()
+    if case > 0:
+        # Random order of the available anchors per tag; bias the first `case`
+        keys = np.where(valid, rng.random(true.shape), np.inf)
+        wrong = np.argsort(keys, axis=1)[:, :case]
+        rows = np.arange(len(d))[:, None]
+        d[rows, wrong] += np.where(valid[rows, wrong], rng.uniform(0, CASE_BIAS_MAX, wrong.shape), 0.0)
+    biased = list(biased_anchors)
+    if biased and bias:
+        d[:, biased] += bias
+    d[~valid] = np.nan
+    return d
+
+
+def generate(duration=60.0, rate=100.0, tags=1, path="sine", noise=0.0, dropout=0.0, case=0,
+             biased_anchors=(), bias=0.0, speed=DEFAULT_SPEED, seed=None, site=None):
+    """
+    Generates range batches for many tags, one batch per time step.
+
+    Args:
+        duration (float, optional): Simulated seconds.
+        rate (float, optional): Steps per simulated second.
+        tags (int, optional): Number of tags.
+        path (str, optional): ``'sine'`` or ``'waypoints'``.
+        noise, dropout, case, biased_anchors, bias: See ``range_batch``.
+        speed (float, optional): Mean speed of waypoint walks in m/s.
+        seed (int, optional): Random seed.
+        site (SiteConfig, optional): Site to use. Defaults to the shared site.
+
+    Yields:
+        tuple: (t, distances (tags, n_anchors) with NaN for missing ranges).
+
+    Raises:
+        ValueError: If ``path`` is unknown.
+    """
+    if path not in PATHS:
+        raise ValueError(f"Unknown path: {path}")
+    site = site or get_site()
+    rng = np.random.default_rng(seed)
+    anchors = site.anchor_array()
+    walks = WaypointPaths(tags, speed=speed, site=site, rng=rng) if path == "waypoints" else None
+    for t in np.arange(0.0, duration, 1.0 / rate):
+        pos = walks.positions(t) if walks else sine_positions(t, tags, 0.0 if tags == 1 else None)
+        yield t, range_batch(pos, anchors, site.range_limit, rng, noise, dropout, case, biased_anchors, bias)
+
+
+def batch_frames(t, distances, max_anchors=None):
+    """
+    Converts one range batch into relay frames, one per tag.
+
+    Ranges are listed closest first, as the tracker expects.
+
+    Yields:
+        dict: ``{"t", "tag_id", "distances": [{"anchor_id", "distance"}, ...]}``.
+    """
+    order = np.argsort(np.where(np.isnan(distances), np.inf, distances), axis=1)
+    counts = np.sum(~np.isnan(distances), axis=1)
+    if max_anchors is not None:
+        counts = np.minimum(counts, max_anchors)
+    t = round(float(t), 6)
+    for tag, (row, k) in enumerate(zip(order, counts)):
+        ids = row[:k]
+        yield {
+            "t": t,
+            "tag_id": tag,
+            "distances": [{"anchor_id": int(i), "distance": round(float(distances[tag, i]), 4)} for i in ids],
+        }
+
+
+def frames(max_anchors=None, **kwargs):
+    """``generate`` flattened into relay frames; keyword arguments as ``generate``."""
+    for t, distances in generate(**kwargs):
+        yield from batch_frames(t, distances, max_anchors)
+
+
+# --- Output ---
+def post_frames(frame_iter, url, session=None):
+    """
+    Streams frames into the relay's ``/send`` endpoint as fast as it accepts them.
+
+    Returns:
+        tuple: (frames sent, frames per second).
+    """
+    import requests  # Only needed when posting to a relay
+    session = session or requests.Session()
+    sent, failed = 0, 0
+    start = time.perf_counter()
+    for frame in frame_iter:
+        response = session.post(url, data=json.dumps(frame, separators=(",", ":")),
+                                headers={"Content-Type": "application/json"})
+        if response.status_code == 200:
+            sent += 1
+        else:
+            failed += 1
+    elapsed = time.perf_counter() - start
+    if failed:
+        print(f"{failed} frames rejected by {url}")
+    return sent, sent / elapsed if elapsed > 0 else 0.0
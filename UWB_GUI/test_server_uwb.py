@@ -1,17 +1,25 @@
 from flask import Flask, request, jsonify
 from threading import Lock
 
+from anchor_monitor import AnchorMonitor
+from site_config import get_site
+
 app = Flask(__name__)
 latest_data = []
+latest_quarantined = []
 lock = Lock()
+# Per-anchor bias detector; flags ranges and drops quarantined anchors
+monitor = AnchorMonitor()
 
 @app.route('/send', methods=['POST'])
 def receive_data():
-    global latest_data
+    global latest_data, latest_quarantined
     try:
         data = request.get_json()
+        distances, quarantined = monitor.process(data.get("distances", []))
         with lock:
-            latest_data = data.get("distances", [])
+            latest_data = distances
+            latest_quarantined = quarantined
         return jsonify({"status": "success"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
@@ -19,9 +27,19 @@ def receive_data():
 @app.route('/get', methods=['GET'])
 def send_latest():
     with lock:
-        return jsonify({"distances": latest_data})
+        return jsonify({"distances": latest_data, "quarantined": latest_quarantined})
+
+@app.route('/health', methods=['GET'])
+def anchor_health():
+    return jsonify(monitor.health())
+
+def main(host='0.0.0.0', port=5000, quarantine=True):
+    monitor.quarantine = quarantine
+    # Follow site_config.json edits like the GUIs; the monitor resets moved anchors
+    get_site().watch()
+    app.run(host=host, port=port)
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    main()
 
 
@@ -0,0 +1,241 @@
+import time
+
+import numpy as np
+
+# Default history length: one hour of fixes at 100 Hz.
+DEFAULT_CAPACITY = 360_000
+# Default upper bound on the number of vertices drawn for a trail.
+DEFAULT_TRAIL_POINTS = 600
+
+
+# --- Decimation ---
+def decimate_minmax(xy, max_points=DEFAULT_TRAIL_POINTS):
+    """
+    Reduces a polyline to at most ``max_points`` vertices by min/max bucketing.
+
+    The interior of the path is split into equal-sized buckets and, for each
+    bucket, only the points holding the minimum and maximum x and y are kept.
+    The first and last points are always preserved, so the extent and shape of
+    the trail survive even when hours of fixes are collapsed.
+
+    Args:
+        xy (np.ndarray): Array of shape (n, 2) with points in chronological order.
+        max_points (int, optional): Upper bound on returned vertices. Defaults to 600.
+
+    Returns:
+        np.ndarray: The decimated (m, 2) array, m <= max(max_points, 6).
+    """
+    n = len(xy)
+    if n <= max_points:
+        return xy
+    interior = xy[1:n - 1]
+    n_buckets = max(1, (max_points - 2) // 4)
+    bucket_len = -(-len(interior) // n_buckets)
+    full = (len(interior) // bucket_len) * bucket_len
+
+    # Vectorized argmin/argmax over the evenly divisible part of the path
+    buckets = interior[:full].reshape(-1, bucket_len, 2)
+    offsets = np.arange(len(buckets))[:, None] * bucket_len
+    picks = np.concatenate([
+        buckets.argmin(axis=1) + offsets,
+        buckets.argmax(axis=1) + offsets,
+    ], axis=1).ravel()
+
+    # The remainder forms one more (shorter) bucket
+    if full < len(interior):
+        rest = interior[full:]
+        picks = np.concatenate([picks, rest.argmin(axis=0) + full, rest.argmax(axis=0) + full])
+
+    keep = np.unique(picks) + 1
+    return np.concatenate([xy[:1], xy[keep], xy[n - 1:]])
+
+
+def decimate_rdp(xy, epsilon):
+    """
+    Simplifies a polyline with the Ramer-Douglas-Peucker algorithm.
+
+    Uses an explicit stack instead of recursion so long paths cannot hit the
+    recursion limit; the distance of every point in a segment is computed in a
+    single vectorized step.
+
+    Args:
+        xy (np.ndarray): Array of shape (n, 2) with points in chronological order.
+        epsilon (float): Maximum allowed perpendicular deviation in meters.
+
+    Returns:
+        np.ndarray: The simplified (m, 2) array.
+    """
+    n = len(xy)
+    if n < 3:
+        return xy
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        seg = xy[end] - xy[start]
+        rel = xy[start + 1:end] - xy[start]
+        seg_len = np.hypot(seg[0], seg[1])
+        if seg_len == 0:
+            dists = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dists = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / seg_len
+        i = int(dists.argmax())
+        if dists[i] > epsilon:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return xy[keep]
+
+
+# --- Circular trajectory storage ---
+class TrajectoryBuffer:
+    """
+    Fixed-capacity ring buffer of timestamped (x, y) fixes for a single tag.
+
+    Storage is preallocated once, so appending never reallocates and memory
+    stays constant no matter how long the tracker runs; once full, the oldest
+    fixes are overwritten.
+
+    The decimated trail is cached: it is rebuilt from the whole history only
+    once every ``max_points // 2`` appends, and in between the new fixes are
+    added to the cached trail as they are. Drawing a trail every frame thus
+    costs O(max_points) amortized, not O(capacity).
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self._xy = np.empty((capacity, 2), dtype=np.float64)
+        self._t = np.empty(capacity, dtype=np.float64)
+        self._head = 0   # next write index
+        self._size = 0
+        self._appended = 0   # fixes stored since creation, for trail caching
+        self._trail = None   # (max_points, epsilon, appended at build, decimated history)
+
+    def __len__(self):
+        return self._size
+
+    def append(self, pos, t=None):
+        """
+        Stores one fix, overwriting the oldest one when the buffer is full.
+
+        Args:
+            pos (sequence): The (x, y) position.
+            t (float, optional): Timestamp in seconds. Defaults to ``time.time()``.
+        """
+        self._xy[self._head] = pos[0], pos[1]
+        self._t[self._head] = time.time() if t is None else t
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self._appended += 1
+
+    def extend(self, xy, t):
+        """
+        Stores a block of fixes at once.
+
+        Args:
+            xy (np.ndarray): Array of shape (n, 2).
+            t (np.ndarray): Array of n timestamps.
+        """
+        xy = np.asarray(xy, dtype=np.float64)[-self.capacity:]
+        t = np.asarray(t, dtype=np.float64)[-self.capacity:]
+        n = len(xy)
+        idx = (self._head + np.arange(n)) % self.capacity
+        self._xy[idx] = xy
+        self._t[idx] = t
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+        self._appended += n
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+        self._trail = None
+
+    def positions(self):
+        """Returns the stored fixes as an (n, 2) array, oldest first."""
+        if self._size < self.capacity:
+            return self._xy[:self._size]
+        return np.concatenate([self._xy[self._head:], self._xy[:self._head]])
+
+    def timestamps(self):
+        """Returns the stored timestamps, oldest first."""
+        if self._size < self.capacity:
+            return self._t[:self._size]
+        return np.concatenate([self._t[self._head:], self._t[:self._head]])
+
+    def recent(self, n):
+        """Returns the ``n`` most recent fixes as an (n, 2) array, oldest first."""
+        n = min(n, self._size)
+        idx = (self._head - n + np.arange(n)) % self.capacity
+        return self._xy[idx]
+
+    def last(self):
+        """Returns the most recent fix, or None when the buffer is empty."""
+        if self._size == 0:
+            return None
+        return self._xy[(self._head - 1) % self.capacity]
+
+    def trail(self, max_points=DEFAULT_TRAIL_POINTS, epsilon=None):
+        """
+        Returns a decimated copy of the history suitable for drawing.
+
+        Args:
+            max_points (int, optional): Vertex budget for the polyline.
+            epsilon (float, optional): If given, the path is first simplified
+                with Ramer-Douglas-Peucker at this tolerance before bucketing.
+
+        Returns:
+            np.ndarray: An (m, 2) array with m bounded by ``max_points``.
+        """
+        if self._size <= max_points:
+            xy = self.positions()
+            return xy if epsilon is None else decimate_rdp(xy, epsilon)
+        # Half of the budget for the decimated history, half for fixes since
+        refresh = max(1, max_points // 2)
+        cached = self._trail
+        if cached is not None and cached[:2] == (max_points, epsilon):
+            new = self._appended - cached[2]
+            if new < refresh:
+                return np.concatenate([cached[3], self.recent(new)]) if new else cached[3]
+        xy = self.positions()
+        if epsilon is not None:
+            xy = decimate_rdp(xy, epsilon)
+        history = decimate_minmax(xy, max(max_points - refresh, 6))
+        self._trail = (max_points, epsilon, self._appended, history)
+        return history
+
+
+class TrajectoryStore:
+    """
+    Per-tag collection of TrajectoryBuffer objects, allocated on first use.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._buffers = {}
+
+    def __contains__(self, tag_id):
+        return tag_id in self._buffers
+
+    def __iter__(self):
+        return iter(self._buffers)
+
+    def buffer(self, tag_id):
+        buf = self._buffers.get(tag_id)
+        if buf is None:
+            buf = self._buffers[tag_id] = TrajectoryBuffer(self.capacity)
+        return buf
+
+    def append(self, tag_id, pos, t=None):
+        self.buffer(tag_id).append(pos, t)
+
+    def trail(self, tag_id, max_points=DEFAULT_TRAIL_POINTS, epsilon=None):
+        if tag_id not in self._buffers:
+            return np.empty((0, 2))
+        return self._buffers[tag_id].trail(max_points, epsilon)
@@ -6,6 +6,9 @@ import matplotlib.patches as patches
 import math
 import random
 
+from site_config import get_site
+from zones import nearest_corridor
+
 # --- Global state ---
 # List of anchor coordinates. Each anchor is a list [x, y].
 anchors = [[6, 7.5], [9, -3], [5, 7.5]]
@@ -29,10 +32,23 @@ star = None
 star_label = None
 # Index of the currently selected anchor for dragging.
 selected_index = None
+# Latest (index, x, y) drag position not yet applied to the plot.
+pending_drag = None
+# Tk `after` job id of the scheduled drag update, None when nothing is scheduled.
+drag_job = None
+# Minimum interval between drag updates in milliseconds (~60 Hz display refresh).
+DRAG_INTERVAL_MS = 16
 # Matplotlib plot object for the dashed line indicating distance to a reference line.
 dashed_line = None
 # Matplotlib Text object for the label of the distance to a reference line.
 distance_text = None
+# Tkinter root window, control frame and result label (created in main()).
+root = None
+control_frame = None
+result_label = None
+# Matplotlib figure, axes and anchor scatter plot (created in main()).
+fig, ax = None, None
+sc = None
 
 # --- Trilateration ---
 def trilateration_3anchors(p1, d1, p2, d2, p3, d3):
@@ -85,18 +101,11 @@ def draw_depot(ax):
     Args:
         ax (matplotlib.axes.Axes): The axes object on which to draw the depot layout.
     """
-    raf_w, raf_h = 3, 20
-    koridor_w = 3
-    num_blocks = 8
-    total_width = num_blocks * raf_w + (num_blocks - 1) * koridor_w
-    start_x = -total_width / 2
-    for i in range(num_blocks):
-        x = start_x + i * (raf_w + koridor_w)
-        for y_off in [-3 - raf_h, 0, 3]:
-            ax.add_patch(plt.Rectangle((x, y_off), raf_w, raf_h, color='gray', alpha=1.0))
+    for x, y, w, h in get_site().depot_rectangles():
+        ax.add_patch(plt.Rectangle((x, y), w, h, color='gray', alpha=1.0))
 
 # --- UI Functions ---
-def update_position():
+def update_position(parse_entries=True):
     """
     Updates the estimated position on the plot based on current anchor distances.
 
@@ -104,6 +113,10 @@ def update_position():
     closest anchors, performs trilateration, and updates the star marker, its label,
     and a dashed line indicating distance to a reference line on the plot.
     It also updates the result label in the GUI.
+
+    Args:
+        parse_entries (bool, optional): Re-read every distance entry first. The
+            drag path passes False and solves with the cached `distances`.
     """
     global star, dashed_line, distance_text, star_label
     if len(anchors) < 3:
@@ -111,8 +124,9 @@ def update_position():
         return
     try:
         # Update distances from entry values
-        for i, entry in enumerate(distance_entries):
-            distances[i] = float(entry.get())
+        if parse_entries:
+            for i, entry in enumerate(distance_entries):
+                distances[i] = float(entry.get())
 
         # pick closest 3 distances
         # Sorts indices based on distance values to pick the three closest anchors.
@@ -122,36 +136,28 @@ def update_position():
         p3, d3 = anchors[d_index[2]], distances[d_index[2]]
         pos = trilateration_3anchors(p1, d1, p2, d2, p3, d3)
 
-        # Remove previous estimated position marker and label
-        if star:
-            star.remove()
-        if 'star_label' in globals() and star_label:
-            star_label.remove()
-
-        # Plot new estimated position
-        star = ax.plot(pos[0], pos[1], 'r*', markersize=12)[0]
-
         # Update GUI result label
         result_label.config(text=f"Estimated Position: ({pos[0]:.2f}, {pos[1]:.2f})")
 
-        # Remove old dashed line and label
-        if dashed_line:
-            dashed_line.remove()
-        if distance_text:
-            distance_text.remove()
-
-        # Find closest reference line (x = 0 or x = -3) for visual context
+        # Find the closest corridor line of the site for visual context
         y_star = pos[1]
-        ref_lines = [0, -3]
-        closest_y = min(ref_lines, key=lambda y: abs(y_star - y))
-        distance_to_line = abs(y_star - closest_y)
-
-        # Draw new dashed line and label for distance to reference line
-        dashed_line = ax.plot([pos[0], pos[0]], [y_star, closest_y], linestyle='--', color='red')[0]
+        closest_y, distance_to_line = (float(v[0]) for v in nearest_corridor(pos, get_site().corridor_lines))
         mid_y = (y_star + closest_y) / 2
-        distance_text = ax.text(pos[0] + 0.3, mid_y, f"{distance_to_line:.2f} m", color="black", fontsize=9)
-        # Add label for the estimated position coordinates
-        star_label = ax.text(pos[0] + 0.4, pos[1] + 0.4, f"({pos[0]:.2f}, {pos[1]:.2f})", color="red", fontsize=9)
+
+        if star is None:
+            # First solve: create the marker, dashed line and labels
+            star = ax.plot(pos[0], pos[1], 'r*', markersize=12)[0]
+            dashed_line = ax.plot([pos[0], pos[0]], [y_star, closest_y], linestyle='--', color='red')[0]
+            distance_text = ax.text(pos[0] + 0.3, mid_y, "", color="black", fontsize=9)
+            star_label = ax.text(pos[0] + 0.4, pos[1] + 0.4, "", color="red", fontsize=9)
+
+        # Move the existing artists instead of recreating them
+        star.set_data([pos[0]], [pos[1]])
+        dashed_line.set_data([pos[0], pos[0]], [y_star, closest_y])
+        distance_text.set_position((pos[0] + 0.3, mid_y))
+        distance_text.set_text(f"{distance_to_line:.2f} m")
+        star_label.set_position((pos[0] + 0.4, pos[1] + 0.4))
+        star_label.set_text(f"({pos[0]:.2f}, {pos[1]:.2f})")
 
         # Redraw the canvas to reflect changes
         fig.canvas.draw_idle()
@@ -159,6 +165,8 @@ def update_position():
     except Exception as e:
         # Display any errors encountered during trilateration or distance parsing
         result_label.config(text=str(e))
+        # A drag has already moved the anchor and its circle; keep following the mouse
+        fig.canvas.draw_idle()
 
 
 def redraw_anchors():
@@ -196,7 +204,7 @@ def redraw_anchors():
         entry.insert(0, str(d))
         entry.pack()
         # Bind KeyRelease event to update position automatically when distance changes
-        entry.bind("<KeyRelease>", lambda e: update_position())
+        entry.bind("<KeyRelease>", lambda e, i=i: on_distance_edit(i))
         distance_entries.append(entry)
 
         # Add anchor label (e.g., "A1") to the matplotlib plot
@@ -219,6 +227,63 @@ def redraw_anchors():
     fig.canvas.draw_idle()
 
 
+def update_anchor(i):
+    """
+    Incrementally updates the plot and UI for a single moved or edited anchor.
+
+    Only the anchor's label, coordinate text, distance circle, scatter offset
+    and Tk coordinate label are mutated; no widgets or artists are recreated.
+    Used on the drag path instead of `redraw_anchors`.
+
+    Args:
+        i (int): Index of the anchor to update.
+    """
+    a, d = anchors[i], distances[i]
+    text_labels[i].set_position((a[0] + 0.3, a[1] + 0.3))
+    coord_texts[i].set_position((a[0] + 0.3, a[1] - 0.7))
+    coord_texts[i].set_text(f"({a[0]:.2f}, {a[1]:.2f})")
+    circles[i].set_center(a)
+    circles[i].set_radius(d)
+    offsets = sc.get_offsets()
+    offsets[i] = a
+    sc.set_offsets(offsets)
+    anchor_coord_labels[i].config(text=f"A{i+1} Pos: ({a[0]:.2f}, {a[1]:.2f})")
+
+
+def on_distance_edit(i):
+    """
+    Handles typing in one distance entry: parses only that entry, updates
+    its circle and re-solves from the cached distances.
+    """
+    try:
+        distances[i] = float(distance_entries[i].get())
+    except ValueError as e:
+        result_label.config(text=str(e))
+        return
+    update_anchor(i)
+    update_position(parse_entries=False)
+
+
+def flush_drag():
+    """
+    Applies the most recent pending drag position.
+
+    Motion events only record the latest mouse position; this runs at most
+    once per `DRAG_INTERVAL_MS`, so any number of motion events between two
+    frames costs a single incremental update and solve.
+    """
+    global pending_drag, drag_job
+    drag_job = None
+    if pending_drag is None:
+        return
+    i, x, y = pending_drag
+    pending_drag = None
+    anchors[i][0] = x
+    anchors[i][1] = y
+    update_anchor(i)
+    update_position(parse_entries=False)
+
+
 def add_anchor():
     """
     Adds a new anchor at a random position to the simulation.
@@ -278,8 +343,12 @@ def on_release(event):
 
     Resets `selected_index` to None, indicating no anchor is currently being dragged.
     """
-    global selected_index
+    global selected_index, drag_job
     selected_index = None # Deselect the anchor
+    # Apply the final drag position right away instead of waiting for the timer
+    if drag_job is not None:
+        root.after_cancel(drag_job)
+        flush_drag()
 
 
 def on_motion(event):
@@ -287,66 +356,78 @@ def on_motion(event):
     Event handler for mouse motion on the matplotlib canvas.
 
     If an anchor is currently selected (`selected_index` is not None) and the
-    mouse is moved within the plot axes, the selected anchor's position is
-    updated to the new mouse coordinates, and the plot is redrawn.
+    mouse is moved within the plot axes, the new mouse coordinates are queued
+    and applied by `flush_drag`, coalescing motion events to the display rate.
     """
-    global selected_index
+    global pending_drag, drag_job
     if selected_index is None or event.inaxes != ax:
         return
-    # Update the coordinates of the selected anchor to the current mouse position
-    anchors[selected_index][0] = event.xdata
-    anchors[selected_index][1] = event.ydata
-    redraw_anchors() # Update the plot to show the new anchor position
-    update_position() # Recalculate and update the estimated position
-
-# --- Plot Setup ---
-# Initialize the main Tkinter window
-root = tk.Tk()
-root.title("Anchor Manager GUI")
-
-# Create main frame for matplotlib canvas
-frame = ttk.Frame(root)
-frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-# Create control frame for buttons and labels
-control_frame = ttk.Frame(root)
-control_frame.pack(side=tk.RIGHT, fill=tk.Y)
-
-# Setup matplotlib figure and axes
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.set_aspect('equal') # Ensure equal scaling on x and y axes
-ax.set_xlim(-20, 20)   # Set x-axis limits
-ax.set_ylim(-20, 20)   # Set y-axis limits
-ax.grid(True)          # Display grid
-ax.set_title("Anchor Layout") # Set plot title
-
-# Draw the depot layout on the axes
-draw_depot(ax)
-# Initial scatter plot of anchors
-sc = ax.scatter([a[0] for a in anchors], [a[1] for a in anchors], s=100, c=colors[:len(anchors)])
-
-# Tkinter Label to display estimated position
-result_label = ttk.Label(control_frame, text="Estimated Position: (?)")
-result_label.pack()
-
-# Tkinter Buttons for adding, removing anchors, and finding position
-ttk.Button(control_frame, text="Add Anchor", command=add_anchor).pack(pady=2)
-ttk.Button(control_frame, text="Remove Anchor", command=remove_anchor).pack(pady=2)
-ttk.Button(control_frame, text="Find Position", command=update_position).pack(pady=2)
-
-# Integrate matplotlib figure into Tkinter window
-canvas = FigureCanvasTkAgg(fig, master=frame)
-canvas.draw()
-canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-# Connect mouse events to matplotlib canvas for interactive dragging
-fig.canvas.mpl_connect("button_press_event", on_press)
-fig.canvas.mpl_connect("button_release_event", on_release)
-fig.canvas.mpl_connect("motion_notify_event", on_motion)
-
-# Initial drawing of anchors and update of position
-redraw_anchors()
-update_position() # Call once at start to display initial position
-
-# Start the Tkinter event loop
-root.mainloop()
\ No newline at end of file
+    # Remember only the latest position; earlier unapplied ones are dropped
+    pending_drag = (selected_index, event.xdata, event.ydata)
+    if drag_job is None:
+        drag_job = root.after(DRAG_INTERVAL_MS, flush_drag)
+
+def main():
+    """
+    Builds the Anchor Manager window and starts the Tk event loop.
+
+    This is the entry point used by ``main.py``; the GUI is only created when
+    this function is called, so importing the module has no side effects.
+    """
+    global root, control_frame, result_label, fig, ax, sc
+
+    # --- Plot Setup ---
+    # Initialize the main Tkinter window
+    root = tk.Tk()
+    root.title("Anchor Manager GUI")
+
+    # Create main frame for matplotlib canvas
+    frame = ttk.Frame(root)
+    frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    # Create control frame for buttons and labels
+    control_frame = ttk.Frame(root)
+    control_frame.pack(side=tk.RIGHT, fill=tk.Y)
+
+    # Setup matplotlib figure and axes
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.set_aspect('equal') # Ensure equal scaling on x and y axes
+    ax.set_xlim(-20, 20)   # Set x-axis limits
+    ax.set_ylim(-20, 20)   # Set y-axis limits
+    ax.grid(True)          # Display grid
+    ax.set_title("Anchor Layout") # Set plot title
+
+    # Draw the depot layout on the axes
+    draw_depot(ax)
+    # Initial scatter plot of anchors
+    sc = ax.scatter([a[0] for a in anchors], [a[1] for a in anchors], s=100, c=colors[:len(anchors)])
+
+    # Tkinter Label to display estimated position
+    result_label = ttk.Label(control_frame, text="Estimated Position: (?)")
+    result_label.pack()
+
+    # Tkinter Buttons for adding, removing anchors, and finding position
+    ttk.Button(control_frame, text="Add Anchor", command=add_anchor).pack(pady=2)
+    ttk.Button(control_frame, text="Remove Anchor", command=remove_anchor).pack(pady=2)
+    ttk.Button(control_frame, text="Find Position", command=update_position).pack(pady=2)
+
+    # Integrate matplotlib figure into Tkinter window
+    canvas = FigureCanvasTkAgg(fig, master=frame)
+    canvas.draw()
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    # Connect mouse events to matplotlib canvas for interactive dragging
+    fig.canvas.mpl_connect("button_press_event", on_press)
+    fig.canvas.mpl_connect("button_release_event", on_release)
+    fig.canvas.mpl_connect("motion_notify_event", on_motion)
+
+    # Initial drawing of anchors and update of position
+    redraw_anchors()
+    update_position() # Call once at start to display initial position
+
+    # Start the Tkinter event loop
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import threading
+
+import numpy as np
+
+from site_config import get_site
+
+# Default raster cell size of the zone index in meters.
+RESOLUTION = 0.25
+# Layers tracked for enter/leave events.
+LAYERS = ("zone", "named")
+
+
+def nearest_corridor(points, lines):
+    """
+    Nearest corridor line of every point, by vertical distance.
+
+    Vectorized form of ``min(lines, key=lambda y: abs(p[1] - y))``.
+
+    Args:
+        points (array-like): (n, 2) positions, or a single (x, y).
+        lines (array-like): y of the corridor lines.
+
+    Returns:
+        tuple: (line y (n,), distance to it (n,)).
+    """
+    y = np.asarray(points, dtype=np.float64).reshape(-1, 2)[:, 1]
+    lines = np.asarray(lines, dtype=np.float64)
+    gap = np.abs(y[:, None] - lines[None])
+    k = np.argmin(gap, axis=1)
+    return lines[k], gap[np.arange(len(y)), k]
+
+
+class ZoneEngine:
+    """
+    Spatial index of the depot's aisles, corridor, rack faces and named zones.
+
+    Zones are rectangles: one aisle between every pair of neighbouring rack
+    blocks, the cross corridor between the corridor lines, every rack, and
+    any named zones given as ``{name: (x, y, w, h)}``. They are rasterized
+    once into cell layers (zone, named zone, facing rack), so assigning any
+    number of positions is a single vectorized index lookup.
+
+    Args:
+        site (SiteConfig, optional): Depot layout. Defaults to the shared site.
+        named (dict, optional): Named zones as ``{name: (x, y, w, h)}``; later
+            zones win where they overlap.
+        resolution (float, optional): Raster cell size in meters.
+    """
+
+    def __init__(self, site=None, named=None, resolution=RESOLUTION):
+        self.site = site or get_site()
+        self.resolution = resolution
+        self.lines = np.asarray(self.site.corridor_lines, dtype=np.float64)
+        depot = self.site.depot
+        rects = self.site.depot_rectangles()
+        rack_w, aisle_w = depot["rack_width"], depot["aisle_width"]
+        rows = sorted(depot["row_offsets"])
+        lo = rects[:, :2].min(axis=0)
+        hi = (rects[:, :2] + rects[:, 2:]).max(axis=0)
+
+        # --- Zone table: name, kind, rectangle, centre line ---
+        self.names, self.kinds, self._rects, self._centre = [], [], [], []
+        for i in range(depot["num_blocks"] - 1):
+            x = lo[0] + (i + 1) * rack_w + i * aisle_w
+            self._add(f"A{i + 1}", "aisle", (x, lo[1], aisle_w, hi[1] - lo[1]), x + aisle_w / 2)
+        y0, y1 = self.lines.min(), self.lines.max()
+        self._add("C", "corridor", (lo[0], y0, hi[0] - lo[0], y1 - y0), (y0 + y1) / 2)
+        for k, (x, y, w, h) in enumerate(rects):
+            block = k // len(rows)
+            self._add(f"R{block + 1}-{rows.index(y) + 1}", "rack", (x, y, w, h), x + w / 2)
+        self.rects = np.array(self._rects, dtype=np.float64)
+        self.named_names = list(named or {})
+        self.named_rects = np.array([named[n] for n in self.named_names], dtype=np.float64).reshape(-1, 4)
+
+        # --- Raster layers ---
+        self.origin = lo
+        self.shape = tuple(int(v) for v in np.ceil((hi - lo) / resolution)[::-1])
+        ys = lo[1] + (np.arange(self.shape[0]) + 0.5) * resolution
+        xs = lo[0] + (np.arange(self.shape[1]) + 0.5) * resolution
+        cx, cy = np.meshgrid(xs, ys)
+        # Later zones overwrite earlier ones: the corridor wins where it crosses aisles
+        self.zone = _rasterize(cx, cy, self.rects)
+        self.named = _rasterize(cx, cy, self.named_rects)
+        # Rack a position in an aisle faces: the nearer side's rack at that height
+        self.face = np.full(self.shape, -1, dtype=np.int16)
+        racks = np.flatnonzero(np.array(self.kinds) == "rack")
+        for i in np.flatnonzero(np.array(self.kinds) == "aisle"):
+            x, _, w, _ = self.rects[i]
+            in_aisle = self.zone == i
+            side_x = np.where(cx < x + w / 2, x - resolution / 2, x + w + resolution / 2)
+            face = _rasterize(side_x, cy, self.rects[racks])
+            hit = in_aisle & (face >= 0)
+            self.face[hit] = racks[face[hit]]
+
+    def _add(self, name, kind, rect, centre):
+        self.names.append(name)
+        self.kinds.append(kind)
+        self._rects.append(rect)
+        self._centre.append(centre)
+
+    # --- Assignment ---
+    def assign(self, points):
+        """
+        Zones of many positions at once.
+
+        Args:
+            points (array-like): (n, 2) positions.
+
+        Returns:
+            dict: Arrays of length n:
+                ``zone`` (zone index, -1 outside), ``named`` (named zone index,
+                -1 for none), ``face`` (rack faced from an aisle, -1 otherwise),
+                ``line`` / ``offset`` (nearest corridor line and the distance
+                to it) and ``across`` (signed offset from the aisle or corridor
+                centre line, NaN elsewhere).
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        col, row = np.floor((points - self.origin) / self.resolution).astype(int).T
+        inside = (row >= 0) & (row < self.shape[0]) & (col >= 0) & (col < self.shape[1])
+        r, c = row[inside], col[inside]
+        out = {layer: np.full(len(points), -1, dtype=np.int16) for layer in ("zone", "named", "face")}
+        out["zone"][inside] = self.zone[r, c]
+        out["named"][inside] = self.named[r, c]
+        out["face"][inside] = self.face[r, c]
+        out["line"], out["offset"] = nearest_corridor(points, self.lines)
+
+        zone = out["zone"]
+        kinds = np.array(self.kinds)[np.maximum(zone, 0)]
+        centre = np.array(self._centre)[np.maximum(zone, 0)]
+        out["across"] = np.where((zone >= 0) & (kinds == "aisle"), points[:, 0] - centre,
+                                 np.where((zone >= 0) & (kinds == "corridor"), points[:, 1] - centre, np.nan))
+        return out
+
+    def name(self, index, layer="zone"):
+        """Name of a zone index of ``layer`` ('zone' or 'named'), None for -1."""
+        if index < 0:
+            return None
+        return (self.names if layer == "zone" else self.named_names)[index]
+
+
+class ZoneTracker:
+    """
+    Current zone of every tag, with incremental enter/leave events.
+
+    State is kept in arrays indexed by tag id, so an update for thousands of
+    tags is a vectorized comparison; events are only built for tags whose
+    zone changed.
+
+    Args:
+        engine (ZoneEngine, optional): Zone index. Defaults to one for the shared site.
+    """
+
+    def __init__(self, engine=None, capacity=1024):
+        self.engine = engine or get_engine()
+        self._lock = threading.Lock()
+        self.current = {layer: np.full(capacity, -1, dtype=np.int16) for layer in LAYERS}
+
+    def _ensure(self, tag_id):
+        """Grows the state arrays (doubling) so ``tag_id`` is a valid index."""
+        capacity = len(self.current["zone"])
+        if tag_id < capacity:
+            return
+        new = max(tag_id + 1, 2 * capacity)
+        for layer, old in self.current.items():
+            grown = np.full(new, -1, dtype=old.dtype)
+            grown[:capacity] = old
+            self.current[layer] = grown
+
+    def update(self, tag_ids, points, t=None):
+        """
+        Assigns new positions and returns the zone changes.
+
+        Args:
+            tag_ids (array-like): Integer tag ids (unique within the call).
+            points (array-like): (n, 2) positions of those tags.
+            t (float, optional): Timestamp copied into the events.
+
+        Returns:
+            tuple: (assignment dict from ``ZoneEngine.assign``, list of events
+                   ``{"t", "tag_id", "layer", "zone", "event": "leave"|"enter"}``,
+                   leaves before enters).
+        """
+        tag_ids = np.asarray(tag_ids, dtype=np.intp)
+        found = self.engine.assign(points)
+        events = []
+        if len(tag_ids) == 0:
+            return found, events
+        with self._lock:
+            self._ensure(int(tag_ids.max()))
+            for layer in LAYERS:
+                old, new = self.current[layer][tag_ids], found[layer]
+                changed = np.flatnonzero(old != new)
+                for kind, zones in (("leave", old), ("enter", new)):
+                    for k in changed[zones[changed] >= 0]:
+                        events.append({"t": t, "tag_id": int(tag_ids[k]), "layer": layer,
+                                       "zone": self.engine.name(int(zones[k]), layer), "event": kind})
+                self.current[layer][tag_ids] = new
+        return found, events
+
+    def zone_of(self, tag_id, layer="zone"):
+        """Name of the tag's current zone, None if unknown or outside."""
+        with self._lock:
+            if tag_id >= len(self.current[layer]):
+                return None
+            return self.engine.name(int(self.current[layer][tag_id]), layer)
+
+
+def _rasterize(cx, cy, rects):
+    """Index of the last rectangle containing every cell centre, -1 for none."""
+    out = np.full(cx.shape, -1, dtype=np.int16)
+    for i, (x, y, w, h) in enumerate(rects):
+        out[(cx >= x) & (cx < x + w) & (cy >= y) & (cy < y + h)] = i
+    return out
+
+
+def get_engine(site=None, resolution=RESOLUTION):
+    """
+    Returns the zone engine of the site's depot layout, built on first use.
+
+    The engine is cached on the site and rebuilt only after the depot or the
+    corridor lines change. Engines with named zones are built directly.
+    """
+    site = site or get_site()
+    return site.derived(f"zones:{resolution}", lambda s: ZoneEngine(s, resolution=resolution),
+                        depends=("depot", "corridor_lines"))